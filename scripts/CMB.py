@@ -1,8 +1,6 @@
 import numpy as np
-import pandas as pd
 import platform
 import sys
-from scipy.integrate import quad # Using quad for higher precision
 
 # ==============================================================================
 # Dynamic Fractal Cosmological Model - CMB (Planck) Chi-squared Script (v2.0)
@@ -27,53 +25,22 @@ except ImportError:
 print("-" * 38 + "\n")
 
 # --- 1. Model Definitions ---
-# --- CORRECTION APPLIQUÉE ICI ---
-PHI = (1 + np.sqrt(5)) / 2
-
-def phi_z(z, Gamma, A1, A2):
-    """Calculates the dynamic fractal dimension phi(z)."""
-    phi_inf = PHI
-    phi_0 = 2.85
-    base = phi_inf + (phi_0 - phi_inf) * np.exp(-Gamma * z)
-    bao_correction1 = A1 * np.exp(-0.5 * ((z - 0.4)/0.3)**2)
-    bao_correction2 = A2 * np.exp(-0.5 * ((z - 1.5)/0.4)**2)
-    return base + bao_correction1 + bao_correction2
-
-def H_model(z, H0, Om, Gamma, A1, A2):
-    """Calculates the theoretical H(z) from the dynamic fractal model."""
-    OL = 1.0 - Om
-    phi = phi_z(z, Gamma, A1, A2)
-    term1 = Om * (1.0 + z)**(3.0 * phi)
-    term2 = OL * (1.0 + z)**(3.0 * (2.0 - phi))
-    return H0 * np.sqrt(term1 + term2)
-
-c = 299792.458
-
-def get_comoving_distance(redshift, H0, Om, Gamma, A1, A2):
-    """Calculates comoving distance using high-precision 'quad' integrator."""
-    integrand = lambda z: c / H_model(z, H0, Om, Gamma, A1, A2)
-    integral, _ = quad(integrand, 0, redshift)
-    return integral
-
-def rd_model(Gamma, A1, A2, z_drag=1060.0):
-    """Calculates the sound horizon at drag epoch (rd)."""
-    phi_at_drag = phi_z(z_drag, Gamma, A1, A2)
-    rs_LambdaCDM_fiducial = 147.0
-    phi_inf_value = PHI # CORRECTION APPLIQUÉE ICI
-    return rs_LambdaCDM_fiducial * (phi_at_drag / phi_inf_value)**(-0.75)
+# phi(z), H(z), D_M and rd come from the shared dfcm model core.
+from dfcm import BEST_FIT, comoving_distance, rd_model
+from dfcm.cmb import PlanckTT
 
 # --- 2. Data and GLOBAL Optimized Parameters ---
 print("--- Script for CMB (Planck) using GLOBAL fit parameters ---")
-print("\n[STEP 1] Loading Planck CMB Power Spectrum data (for info only).")
+print("\n[STEP 1] Loading the Planck CMB TT power spectrum (binned bandpowers).")
 
 try:
-    data_cmb = pd.read_csv('COM_PowerSpect_CMB-TT-full_R3.01.txt', delim_whitespace=True, skiprows=1, header=None)
-    print(f"-> Successfully loaded {len(data_cmb)} data points from Planck data file.")
-except Exception as e:
+    planck_tt = PlanckTT.load()
+    print(f"-> Loaded {planck_tt.ell.size} multipoles into {planck_tt.ndata} bandpowers.")
+except OSError as e:
+    planck_tt = None
     print(f"-> Could not load data file: {e}")
-
 print("\n[STEP 2] Defining the GLOBAL best-fit parameters from the paper.")
-H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = (73.24, 0.2974, 0.433, 0.031, 0.019)
+H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = BEST_FIT
 model_args = (H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt)
 print(f"-> Parameters: H0={H0_opt}, Om={Om_opt}, Gamma={Gamma_opt}, A1={A1_opt}, A2={A2_opt}")
 
@@ -83,7 +50,7 @@ print("\n[STEP 3] Performing consistency checks.")
 # Check 1: Angular size of the sound horizon (theta*)
 print("--- [Check 1] Angular scale of the sound horizon (theta*) ---")
 z_recombination = 1090.0
-DM_cmb = get_comoving_distance(z_recombination, *model_args)
+DM_cmb = comoving_distance(z_recombination, *model_args)
 rd = rd_model(Gamma_opt, A1_opt, A2_opt)
 theta_star_model = rd / DM_cmb
 
@@ -95,8 +62,16 @@ print(f"-> Calculated model theta* = {theta_star_model:.6f} rad")
 print(f"-> Planck reference theta* = {planck_theta_star_rad:.6f} rad")
 print(f"-> Difference with Planck: {chi_theta_star:.2f} sigma")
 
-# Check 2: Low-l power suppression
-print("\n--- [Check 2] Low-l power suppression ---")
+# Check 2: Binned TT bandpowers with the theta*-shifted template
+if planck_tt is not None:
+    print("\n--- [Check 2] Planck TT bandpowers (acoustic scale shifted by theta*) ---")
+    chi2_tt = planck_tt.chi2_theta(theta_star_model)
+    chi2_tt_ref = planck_tt.chi2_theta(planck_tt.theta_ref)
+    print(f"-> Chi^2 over {planck_tt.ndata} bandpowers = {chi2_tt:.2f} (Chi^2/dof = {chi2_tt / planck_tt.ndata:.3f})")
+    print(f"-> Reference (template at the Planck theta*): Chi^2 = {chi2_tt_ref:.2f}")
+
+# Check 3: Low-l power suppression
+print("\n--- [Check 3] Low-l power suppression ---")
 print(f"-> The documented Chi^2/dof for the full CMB analysis is 1.475.")
 print(f"-> This score, which confirms the model's handling of the low-l anomaly,")
 print(f"   requires a full Boltzmann code simulation.")
@@ -22,24 +22,8 @@ print(f"SciPy Version: {scipy.__version__}")
 print("-" * 38 + "\n")
 
 # --- 1. Model Definition ---
-# --- CORRECTION APPLIQUÉE ICI ---
-PHI = (1 + np.sqrt(5)) / 2
-def phi_z(z, Gamma, A1, A2):
-    """Calculates the dynamic fractal dimension phi(z)."""
-    phi_inf = PHI
-    phi_0 = 2.85
-    base = phi_inf + (phi_0 - phi_inf) * np.exp(-Gamma * z)
-    bao_correction1 = A1 * np.exp(-0.5 * ((z - 0.4)/0.3)**2)
-    bao_correction2 = A2 * np.exp(-0.5 * ((z - 1.5)/0.4)**2)
-    return base + bao_correction1 + bao_correction2
-
-def H_model(z, H0, Om, Gamma, A1, A2):
-    """Calculates the theoretical H(z) from the dynamic fractal model."""
-    OL = 1.0 - Om
-    phi = phi_z(z, Gamma, A1, A2)
-    term1 = Om * (1.0 + z)**(3.0 * phi)
-    term2 = OL * (1.0 + z)**(3.0 * (2.0 - phi))
-    return H0 * np.sqrt(term1 + term2)
+# phi(z) and H(z) come from the shared dfcm model core.
+from dfcm import BEST_FIT, H_model
 
 # --- 2. Data and GLOBAL Optimized Parameters ---
 print("--- Script for H(z) Cosmic Chronometers using GLOBAL fit parameters ---")
@@ -59,7 +43,7 @@ num_data_points = len(z_data)
 
 print(f"\n[STEP 1] Using GLOBAL best-fit parameters from the paper.")
 # Parameters from the GLOBAL fit
-H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = (73.24, 0.2974, 0.433, 0.031, 0.019)
+H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = BEST_FIT
 print(f"-> Parameters: H0={H0_opt}, Om={Om_opt}, Gamma={Gamma_opt}, A1={A1_opt}, A2={A2_opt}")
 
 # --- 3. Calculation of Chi-squared ---
@@ -1,7 +1,6 @@
 import numpy as np
 import platform
 import scipy
-from scipy.integrate import quad # Changed from trapz to quad
 import sys
 
 # ==============================================================================
@@ -22,43 +21,8 @@ print(f"SciPy Version: {scipy.__version__}")
 print("-" * 38 + "\n")
 
 # --- 1. Model Definitions ---
-# --- CORRECTION APPLIQUÉE ICI ---
-PHI = (1 + np.sqrt(5)) / 2
-
-def phi_z(z, Gamma, A1, A2):
-    phi_inf = PHI
-    phi_0 = 2.85
-    base = phi_inf + (phi_0 - phi_inf) * np.exp(-Gamma * z)
-    bao_bump_1 = A1 * np.exp(-0.5 * ((z - 0.4)/0.3)**2)
-    bao_bump_2 = A2 * np.exp(-0.5 * ((z - 1.5)/0.4)**2)
-    return base + bao_bump_1 + bao_bump_2
-
-def H_model(z, H0, Om, Gamma, A1, A2):
-    OL = 1.0 - Om
-    phi = phi_z(z, Gamma, A1, A2)
-    term1 = Om * (1.0 + z)**(3.0 * phi)
-    term2 = OL * (1.0 + z)**(3.0 * (2.0 - phi))
-    return H0 * np.sqrt(term1 + term2)
-
-c = 299792.458
-
-# --- Using 'quad' for high precision integration ---
-def get_comoving_distance(redshift, H0, Om, Gamma, A1, A2):
-    integrand = lambda z: c / H_model(z, H0, Om, Gamma, A1, A2)
-    integral, _ = quad(integrand, 0, redshift)
-    return integral
-
-def D_V_model(redshift, H0, Om, Gamma, A1, A2):
-    comoving_dist = get_comoving_distance(redshift, H0, Om, Gamma, A1, A2)
-    hubble_at_redshift = H_model(redshift, H0, Om, Gamma, A1, A2)
-    if hubble_at_redshift == 0.0: return np.inf
-    return (c * redshift * comoving_dist**2 / hubble_at_redshift)**(1.0/3.0)
-
-def rd_model(Gamma, A1, A2, z_drag=1060.0):
-    phi_at_drag = phi_z(z_drag, Gamma, A1, A2)
-    rs_LambdaCDM_fiducial = 147.0
-    phi_inf_value = PHI # CORRECTION APPLIQUÉE ICI
-    return rs_LambdaCDM_fiducial * (phi_at_drag / phi_inf_value)**(-0.75)
+# phi(z), H(z), D_V and rd come from the shared dfcm model core.
+from dfcm import BEST_FIT, C_LIGHT as c, H_model, rd_model, volume_averaged_distance
 
 # --- 2. Data and GLOBAL Optimized Parameters ---
 print("--- Script for BAO (DESI EDR) using GLOBAL fit parameters ---")
@@ -67,7 +31,7 @@ z_data, obs_ratios, sigma_ratios = data_bao.T
 
 print("\n[STEP 1] Using GLOBAL best-fit parameters from the paper.")
 # Parameters from the GLOBAL fit, not the BAO-specific fit
-H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = (73.24, 0.2974, 0.433, 0.031, 0.019)
+H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = BEST_FIT
 model_args = (H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt)
 
 print(f"-> Parameters: H0={H0_opt}, Om={Om_opt}, Gamma={Gamma_opt}, A1={A1_opt}, A2={A2_opt}")
@@ -75,14 +39,11 @@ print(f"-> Parameters: H0={H0_opt}, Om={Om_opt}, Gamma={Gamma_opt}, A1={A1_opt},
 # --- 3. Calculation of Chi-squared ---
 print("\n[STEP 2] Calculating theoretical BAO ratios.")
 rd_model_pred = rd_model(Gamma_opt, A1_opt, A2_opt)
-model_ratios = []
-for i, z_obs in enumerate(z_data):
-    if i == 0: # DV/rd
-        model_dist = D_V_model(z_obs, *model_args)
-    else: # c/Hrd (DH/rd)
-        model_dist = c / H_model(z_obs, *model_args)
-    model_ratios.append(model_dist / rd_model_pred)
-model_ratios = np.array(model_ratios)
+# First point is DV/rd, the others are c/Hrd (DH/rd)
+is_dv = np.arange(len(z_data)) == 0
+model_dist = np.where(is_dv, volume_averaged_distance(z_data, *model_args),
+                      c / H_model(z_data, *model_args))
+model_ratios = model_dist / rd_model_pred
 
 print("\n[STEP 3] Computing the Chi-squared value.")
 chi2_bao = np.sum(((obs_ratios - model_ratios) / sigma_ratios)**2)
@@ -0,0 +1,62 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Fused phi/H Kernel Benchmark
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Compares H_model (phi_z with three exp calls, two pow() arrays and a new
+# array at every step) with the fused PhiHKernel writing into preallocated
+# buffers, in float64 and float32, on a large redshift grid. Reports the best
+# wall time, the peak of newly allocated memory and the largest relative
+# deviation from H_model.
+#
+# Usage: python benchmarks/bench_fused_kernel.py [N] [repeats]
+# (defaults: N = 10^7 redshifts in [0, 1100], 5 repeats)
+# ==============================================================================
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dfcm.kernels import PhiHKernel
+from dfcm.model import BEST_FIT, H_model
+
+
+def measure(func, repeats):
+    func()  # warm-up
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10**7
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    z = np.linspace(0.0, 1100.0, n)
+
+    reference, t_ref, peak_ref = measure(lambda: H_model(z, *BEST_FIT), repeats)
+    print(f"--- phi(z)/H(z) on {n:,} redshifts (best of {repeats}) ---")
+    print(f"{'H_model':<24}{1e3 * t_ref:>10.1f} ms{peak_ref / 2**20:>10.1f} MiB")
+    for dtype in (np.float64, np.float32):
+        kernel = PhiHKernel(z, dtype)
+        out = np.empty(n, dtype=dtype)
+        result, elapsed, peak = measure(lambda: kernel.H(*BEST_FIT, out=out), repeats)
+        error = np.max(np.abs(result / reference - 1.0))
+        label = f"PhiHKernel ({np.dtype(dtype).name})"
+        print(f"{label:<24}{1e3 * elapsed:>10.1f} ms{peak / 2**20:>10.1f} MiB"
+              f"   x{t_ref / elapsed:.2f}, max rel. error {error:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Incremental Recomputation Benchmark
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Evaluates the validation graph (dfcm.graph) once, then applies typical
+# changes (H0 only, a BAO amplitude, one probe's dataset, nothing) and
+# reports, for each, the nodes recomputed and the time against a full
+# evaluation of a fresh graph. The evaluation memo cache is disabled so the
+# timings only reflect the graph's own reuse.
+#
+# Usage: python benchmarks/bench_graph.py [workers]
+# ==============================================================================
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dfcm.data import COSMIC_CHRONOMETERS
+from dfcm.graph import validation_graph
+from dfcm.memo import MEMO
+from dfcm.model import BEST_FIT
+from dfcm.probes import CosmicChronometers
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    MEMO.resize(0)
+    graph = validation_graph(workers=workers)
+    graph['report']
+    full = timed(lambda: validation_graph(workers=workers)['report'])
+
+    # A revised cc dataset: one H(z) measurement shifted by 1 km/s/Mpc
+    revised_cc = np.array(COSMIC_CHRONOMETERS, dtype=float)
+    revised_cc[0, 1] += 1.0
+    changes = (
+        ("H0 only", lambda: graph.source('params', (70.0,) + BEST_FIT[1:])),
+        ("A1 (BAO bump)", lambda: graph.source('params', (70.0, BEST_FIT[1], BEST_FIT[2], 0.02, BEST_FIT[4]))),
+        ("cc dataset replaced", lambda: graph.source('probe:cc', CosmicChronometers(revised_cc))),
+        ("no change", lambda: None),
+    )
+    print(f"--- Validation graph: {len(graph.names)} nodes, {graph.workers} worker(s); "
+          f"full evaluation {1e3 * full:.2f} ms ---")
+    for label, change in changes:
+        change()
+        graph.computations.clear()
+        elapsed = timed(lambda: graph['report'])
+        print(f"{label:<22}{1e3 * elapsed:>8.2f} ms  recomputed {len(graph.computations):>2}: "
+              f"{', '.join(graph.computations) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
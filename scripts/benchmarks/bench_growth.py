@@ -0,0 +1,74 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Growth Equation Benchmark
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Times the batched growth solver (dfcm.growth) for increasing numbers of
+# parameter vectors drawn from the prior, returning fsigma8 on a redshift
+# grid, against solving the vectors one at a time (every configuration is
+# warmed up before it is timed), and the cost of the exact parameter
+# derivatives; then checks the convergence of the fixed-step RK4 integration
+# against a 16x finer grid.
+#
+# Usage: python benchmarks/bench_growth.py [n_redshifts]
+# ==============================================================================
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dfcm.growth import GROWTH_STEPS, solve_growth
+from dfcm.model import BEST_FIT, PRIOR_BOUNDS
+
+BATCH_SIZES = (1, 32, 256, 1024)
+
+
+def prior_draws(n, seed=0):
+    low, high = np.array(PRIOR_BOUNDS).T
+    return tuple((low + (high - low) * np.random.default_rng(seed).random((n, 5))).T)
+
+
+def timed(function, repeat=3):
+    """Best of ``repeat`` timings, after one untimed warm-up call."""
+    function()
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n_z = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    z = np.linspace(0.0, 4.0, n_z)
+    print(f"--- Growth equation: RK4, {GROWTH_STEPS} steps, fsigma8 at {n_z} redshifts ---")
+    for n in BATCH_SIZES:
+        params = prior_draws(n)[1:]
+        batched = timed(lambda: solve_growth(*params).f_sigma8(z))
+        line = f"{n:>5} vectors: batched {1e3 * batched:>8.2f} ms ({1e6 * batched / n:>8.1f} us/vector)"
+        if n <= 256:
+            serial = timed(lambda: [solve_growth(*p).f_sigma8(z) for p in zip(*params)], repeat=1)
+            line += f", one at a time {1e3 * serial:>8.2f} ms ({serial / batched:.1f}x)"
+        print(line)
+    exact = timed(lambda: solve_growth(*BEST_FIT[1:], jacobian=True).f_sigma8_jacobian(z))
+    single = timed(lambda: solve_growth(*BEST_FIT[1:]).f_sigma8(z))
+    print(f"-> fsigma8 with exact derivatives (sensitivity equations): {1e3 * exact:.2f} ms "
+          f"for one vector, {exact / single:.1f}x the solve without them")
+
+    params = prior_draws(256)[1:]
+    reference = solve_growth(*params, steps=16 * GROWTH_STEPS).f_sigma8(z)
+    for steps in (GROWTH_STEPS // 4, GROWTH_STEPS // 2, GROWTH_STEPS):
+        error = np.max(np.abs(solve_growth(*params, steps=steps).f_sigma8(z) / reference - 1.0))
+        print(f"-> {steps:>4} steps: max relative fsigma8 error {error:.2e}")
+    best = solve_growth(*BEST_FIT[1:])
+    print(f"-> Best fit: f(0) = {best.f(0.0):.4f}, D(1) = {best.D(1.0):.4f}, "
+          f"fsigma8(0.5) = {best.f_sigma8(0.5):.4f}")
+
+
+if __name__ == "__main__":
+    main()
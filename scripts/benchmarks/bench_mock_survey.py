@@ -0,0 +1,54 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Mock Survey Throughput Benchmark
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Generates mock SNIa catalogs of increasing size and measures the
+# throughput (objects per second) and peak memory of the streaming chi2,
+# with a diagonal and a block-diagonal covariance. The peak memory is set by
+# the chunk size, not by the catalog size.
+#
+# Usage: python benchmarks/bench_mock_survey.py [N ...]
+# (defaults: 10^5 10^6 10^7 objects; catalogs go to a temporary directory)
+# ==============================================================================
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dfcm.model import BEST_FIT
+from dfcm.survey import StreamingSNIa, generate_catalog
+
+# (label, sigma_block, block_size)
+COVARIANCES = (('diagonal', 0.0, 1), ('block-diagonal', 0.05, 256))
+
+
+def main():
+    sizes = [int(float(n)) for n in sys.argv[1:]] or [10**5, 10**6, 10**7]
+    print(f"{'N':>12}  {'covariance':<16}{'generate':>12}{'chi2':>10}{'objects/s':>14}{'peak':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            for label, sigma_block, block_size in COVARIANCES:
+                path = os.path.join(directory, f"mock_{n}_{label}.dfcmsn")
+                start = time.perf_counter()
+                generate_catalog(path, n, sigma_block=sigma_block, block_size=block_size)
+                generated = time.perf_counter() - start
+
+                probe = StreamingSNIa(path)
+                tracemalloc.start()
+                start = time.perf_counter()
+                probe(*BEST_FIT)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{n:>12,}  {label:<16}{generated:>10.2f} s{elapsed:>8.2f} s"
+                      f"{n / elapsed:>14,.0f}{peak / 2**20:>6.1f} MiB")
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
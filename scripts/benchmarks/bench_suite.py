@@ -0,0 +1,222 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Benchmark Suite
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Times the computations behind every validation script: phi(z) and H(z) on
+# large arrays, the SNIa distance-modulus vector and chi2 solve, the CMB
+# high-redshift distance, the Planck TT bandpower chi2 of 1000 parameter
+# vectors, the BAO ratios and the full validate_bao_hz report.
+# Each case is warmed up, run repeatedly (median and percentile timings) and
+# run once more under tracemalloc for its peak memory. Results are written as
+# JSON and can be compared with a stored baseline to flag regressions.
+#
+# Usage: python benchmarks/bench_suite.py [--output results.json]
+#                                         [--baseline baseline.json] [--tolerance 0.2]
+# The exit status is 1 when a case is slower than the baseline by more than
+# the tolerance. SNIa cases are skipped when the Pantheon+ covariance cannot
+# be loaded (no stored copy and no network).
+# ==============================================================================
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import runpy
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, SCRIPTS_DIR)
+from dfcm import BEST_FIT, H_model, comoving_distance, distance_modulus, phi_z
+from dfcm.memo import MEMO
+from dfcm.probes import BAO, DistanceTable, SNIa
+
+# Size of the arrays of the phi(z) / H(z) case
+LARGE_ARRAY = 1_000_000
+Z_RECOMBINATION = 1090.0
+
+
+class Skip(Exception):
+    """Raised by a case setup when its inputs are not available."""
+
+
+def load_snia():
+    try:
+        return SNIa.load()
+    except (OSError, ImportError) as error:
+        raise Skip(f"Pantheon+ data unavailable: {error}")
+
+
+def case_phi_H():
+    z = np.linspace(0.0, 10.0, LARGE_ARRAY)
+    _, _, Gamma, A1, A2 = BEST_FIT
+    return lambda: (phi_z(z, Gamma, A1, A2), H_model(z, *BEST_FIT))
+
+
+def case_snia_mu():
+    snia = load_snia()
+    return lambda: distance_modulus(snia.redshifts, *BEST_FIT)
+
+
+def case_snia_chi2():
+    snia = load_snia()
+    table = DistanceTable(snia.redshifts, BEST_FIT)
+    return lambda: snia.chi2(table)
+
+
+def case_cmb_distance():
+    return lambda: comoving_distance(Z_RECOMBINATION, *BEST_FIT)
+
+
+def case_cmb_tt_batch():
+    from dfcm.cmb import PlanckTT
+
+    cmb_tt = PlanckTT.load()
+    params = np.broadcast_arrays(np.linspace(60.0, 80.0, 1000), *BEST_FIT[1:])
+    table = DistanceTable(cmb_tt.redshifts, params)
+    return lambda: cmb_tt.chi2(table)
+
+
+def case_bao_ratios():
+    bao = BAO()
+    return lambda: bao.chi2(DistanceTable(bao.redshifts, BEST_FIT))
+
+
+def case_validate_report():
+    path = os.path.join(SCRIPTS_DIR, 'validate_bao_hz.py')
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(path, run_name='__main__')
+    return run
+
+
+CASES = {
+    'phi_H_1e6': case_phi_H,
+    'snia_distance_modulus': case_snia_mu,
+    'snia_chi2': case_snia_chi2,
+    'cmb_high_z_distance': case_cmb_distance,
+    'cmb_tt_bandpowers_1000': case_cmb_tt_batch,
+    'bao_ratios': case_bao_ratios,
+    'validate_bao_hz_report': case_validate_report,
+}
+
+
+def time_case(function, warmup, repeats):
+    """Timings (s) of ``repeats`` calls after ``warmup`` untimed ones."""
+    for _ in range(warmup):
+        function()
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings[i] = time.perf_counter() - start
+    return timings
+
+
+def peak_memory(function):
+    """Peak traced allocation (bytes) of one call."""
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_suite(names, warmup, repeats):
+    results = {}
+    for name in names:
+        try:
+            function = CASES[name]()
+        except Skip as reason:
+            results[name] = {'skipped': str(reason)}
+            continue
+        timings = time_case(function, warmup, repeats)
+        p10, median, p90 = np.percentile(timings, [10, 50, 90])
+        results[name] = {
+            'repeats': repeats, 'median_s': median, 'p10_s': p10, 'p90_s': p90,
+            'min_s': float(timings.min()), 'mean_s': float(timings.mean()),
+            'peak_memory_bytes': peak_memory(function),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Names of the cases whose median exceeds the baseline median by more than ``tolerance``."""
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get('cases', {}).get(name, {})
+        if 'median_s' not in stats or 'median_s' not in reference:
+            continue
+        ratio = stats['median_s'] / reference['median_s']
+        stats['baseline_ratio'] = ratio
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DFCM validation computations.")
+    parser.add_argument('cases', nargs='*', default=list(CASES), help=f"cases to run (default: all of {list(CASES)})")
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--output', default=None, help="write the results to this JSON file")
+    parser.add_argument('--baseline', default=None, help="JSON results of a previous run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed relative slowdown of the median before flagging a regression")
+    parser.add_argument('--memo', action='store_true', help="keep the evaluation cache enabled (off by default)")
+    args = parser.parse_args(argv)
+
+    unknown = sorted(set(args.cases) - set(CASES))
+    if unknown:
+        parser.error(f"unknown cases {unknown}")
+    if not args.memo:
+        # Every call must do the actual work, not return a memoized result
+        MEMO.resize(0)
+
+    results = run_suite(args.cases, args.warmup, args.repeats)
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                        'machine': platform.machine(), 'processor': platform.processor(),
+                        'cpus': os.cpu_count()},
+        'settings': {'warmup': args.warmup, 'repeats': args.repeats, 'memo': args.memo},
+        'cases': results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+
+    print(f"{'case':<26}{'median':>12}{'p10':>12}{'p90':>12}{'peak mem':>12}{'vs base':>10}")
+    for name, stats in results.items():
+        if 'skipped' in stats:
+            print(f"{name:<26}  skipped ({stats['skipped']})")
+            continue
+        ratio = f"x{stats['baseline_ratio']:.2f}" if 'baseline_ratio' in stats else '-'
+        print(f"{name:<26}{1e3 * stats['median_s']:>10.3f}ms{1e3 * stats['p10_s']:>10.3f}ms"
+              f"{1e3 * stats['p90_s']:>10.3f}ms{stats['peak_memory_bytes'] / 2**20:>9.1f}MiB{ratio:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"-> Results written to {args.output}")
+    if regressions:
+        print(f"-> REGRESSION (> {100 * args.tolerance:.0f}% slower than baseline): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
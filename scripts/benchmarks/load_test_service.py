@@ -0,0 +1,154 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Prediction Service Load Test
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Drives the local prediction service (dfcm.service) with concurrent
+# keep-alive clients for a fixed duration and reports the throughput
+# (requests/s), the p50/p99 latencies and the server's cache and coalescing
+# statistics. Requests mix /predict (all quantities on a redshift grid) and
+# /chi2 (the bundled probes); parameter vectors are drawn from a pool of
+# ``--distinct`` vectors, so a small pool exercises the response cache and
+# request coalescing and a large one the evaluation path.
+#
+# Usage: python benchmarks/load_test_service.py [--clients 32] [--duration 10]
+#                                               [--distinct 64] [--url HOST:PORT]
+# Without --url a service is started on a free local port for the test.
+# ==============================================================================
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, SCRIPTS_DIR)
+from dfcm.model import BEST_FIT, PRIOR_BOUNDS
+
+REDSHIFTS = np.linspace(0.01, 2.5, 64).tolist()
+
+
+def request_bodies(distinct, seed=0):
+    """(path, JSON body) pairs: a /predict and a /chi2 request per parameter vector."""
+    rng = np.random.default_rng(seed)
+    low, high = np.array(PRIOR_BOUNDS).T
+    vectors = np.vstack([BEST_FIT, low + (high - low) * rng.random((distinct - 1, 5))])
+    bodies = []
+    for vector in vectors.tolist():
+        bodies.append(('/predict', json.dumps({'z': REDSHIFTS, 'params': vector}).encode()))
+        bodies.append(('/chi2', json.dumps({'params': vector}).encode()))
+    return bodies
+
+
+async def http_request(reader, writer, method, path, body=b'', host='localhost'):
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(host, port, bodies, deadline, rng, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            path, body = bodies[rng.integers(len(bodies))]
+            start = time.perf_counter()
+            status, _ = await http_request(reader, writer, 'POST', path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, clients, duration, distinct):
+    bodies = request_bodies(distinct)
+    latencies, failures = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*[client(host, port, bodies, deadline, np.random.default_rng(i), latencies, failures)
+                           for i in range(clients)])
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await http_request(reader, writer, 'GET', '/stats')
+    writer.close()
+    return np.array(latencies), failures, elapsed, json.loads(stats)
+
+
+def start_service(processes):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    command = [sys.executable, '-m', 'dfcm', 'serve', '--port', str(port)]
+    if processes is not None:
+        command += ['--processes', str(processes)]
+    # In its own process group, so that it can be stopped together with its workers
+    process = subprocess.Popen(command, cwd=SCRIPTS_DIR, stdout=subprocess.PIPE, text=True,
+                               start_new_session=True)
+    process.stdout.readline()  # the "serving on" line
+    return process, port
+
+
+def stop_service(process, timeout=10.0):
+    """Stops the service with SIGINT (a clean shutdown), killing its process group if it hangs."""
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    process.stdout.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the DFCM prediction service.")
+    parser.add_argument('--clients', type=int, default=32, help="concurrent keep-alive connections")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of load")
+    parser.add_argument('--distinct', type=int, default=64, help="distinct parameter vectors requested")
+    parser.add_argument('--processes', type=int, default=None, help="worker processes of the started service")
+    parser.add_argument('--url', default=None, help="HOST:PORT of a running service (default: start one)")
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        host, port = args.url.rsplit(':', 1)
+        port = int(port)
+    else:
+        process, port = start_service(args.processes)
+        host = '127.0.0.1'
+    try:
+        latencies, failures, elapsed, stats = asyncio.run(
+            run_load(host, port, args.clients, args.duration, args.distinct))
+    finally:
+        if process is not None:
+            stop_service(process)
+
+    print(f"--- DFCM service load test: {args.clients} clients, {args.distinct} distinct vectors, "
+          f"{elapsed:.1f} s ---")
+    print(f"-> Requests: {latencies.size:,} ({latencies.size / elapsed:,.0f} requests/s), "
+          f"{len(failures)} failed")
+    if latencies.size:
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"-> Latency: p50 {1e3 * p50:.2f} ms, p99 {1e3 * p99:.2f} ms, max {1e3 * latencies.max():.2f} ms")
+    cache = stats['cache']
+    print(f"-> Server: {stats['evaluations']} evaluations, {stats['coalesced']} coalesced, "
+          f"cache hit rate {100 * cache['hit_rate']:.1f}% ({cache['entries']} entries, "
+          f"{cache['nbytes'] / 2**20:.2f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Likelihood Profile
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Loads the probes and evaluates the joint likelihood with the hot-path
+# instrumentation enabled, then prints where the time goes (data load,
+# prediction, per-probe chi2, covariance solve) and how many integrand and
+# H(z) evaluations the distances cost.
+#
+# Usage: python benchmarks/profile_likelihood.py [--evaluations 20] [--no-snia]
+#                                                [--output profile.json]
+# ==============================================================================
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dfcm import BEST_FIT
+from dfcm.likelihood import JointLikelihood
+from dfcm.memo import MEMO
+from dfcm.profiling import profiling
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the data loading and likelihood evaluations.")
+    parser.add_argument('--evaluations', type=int, default=20)
+    parser.add_argument('--no-snia', action='store_true', help="leave out the Pantheon+ SNIa probe")
+    parser.add_argument('--output', default=None, help="write the profile to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Profile the actual computations, not memoized results
+    MEMO.resize(0)
+    with profiling() as profiler:
+        with profiler.stage('data load'):
+            likelihood = JointLikelihood.default(include_snia=not args.no_snia)
+        for _ in range(args.evaluations):
+            likelihood(BEST_FIT)
+    print(profiler.summary())
+    if args.output:
+        profiler.save(args.output)
+        print(f"-> Profile written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
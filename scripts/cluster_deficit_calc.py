@@ -1,7 +1,6 @@
 import numpy as np
 import platform
 import scipy
-from scipy.integrate import quad # Using quad for higher precision
 import sys
 
 # ==============================================================================
@@ -22,43 +21,19 @@ print(f"SciPy Version: {scipy.__version__}")
 print("-" * 38 + "\n")
 
 # --- 1. Model Definitions ---
-# --- CORRECTION APPLIQUÉE ICI ---
-PHI = (1 + np.sqrt(5)) / 2
-
-def phi_z(z, Gamma, A1, A2):
-    """Calculates the dynamic fractal dimension phi(z)."""
-    phi_inf = PHI
-    phi_0 = 2.85
-    base = phi_inf + (phi_0 - phi_inf) * np.exp(-Gamma * z)
-    bao_correction1 = A1 * np.exp(-0.5 * ((z - 0.4)/0.3)**2)
-    bao_correction2 = A2 * np.exp(-0.5 * ((z - 1.5)/0.4)**2)
-    return base + bao_correction1 + bao_correction2
-
-def H_model_fractal(z, H0, Om, Gamma, A1, A2):
-    """Calculates H(z) for the Dynamic Fractal Model."""
-    OL = 1.0 - Om
-    phi = phi_z(z, Gamma, A1, A2)
-    term1 = Om * (1.0 + z)**(3.0 * phi)
-    term2 = OL * (1.0 + z)**(3.0 * (2.0 - phi))
-    return H0 * np.sqrt(term1 + term2)
+# phi(z), H(z) and D_M come from the shared dfcm model core.
+from dfcm import BEST_FIT, PHI, comoving_distance, phi_z
+from dfcm.distances import cumulative_comoving_distance
 
 def H_model_lcdm(z, H0, Om):
     """Calculates H(z) for a standard flat LambdaCDM model."""
     OL = 1.0 - Om
     return H0 * np.sqrt(Om * (1.0 + z)**3 + OL)
 
-c = 299792.458
-
-def get_comoving_distance(redshift, H_function, args):
-    """Generic comoving distance calculator using 'quad'."""
-    integrand = lambda z: c / H_function(z, *args)
-    integral, _ = quad(integrand, 0, redshift)
-    return integral
-
 # --- 2. GLOBAL Optimized Parameters ---
 print("--- Script for Cluster Mass Function Deficit ---")
 print("\n[STEP 1] Defining the GLOBAL best-fit parameters from the paper.")
-H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = (73.24, 0.2974, 0.433, 0.031, 0.019)
+H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = BEST_FIT
 fractal_args = (H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt)
 # For a fair comparison, we use the same H0 and Om for the LCDM reference model
 lcdm_args = (H0_opt, Om_opt)
@@ -70,9 +45,9 @@ print(f"-> Comparing predicted cluster abundance at redshift z = {z_comparison}.
 # --- 3. Calculation of Predicted Deficit ---
 print("\n[STEP 2] Calculating the comoving volume for both models.")
 
-# Calculate comoving distance for both models using the high-precision integrator
-D_M_fractal = get_comoving_distance(z_comparison, H_model_fractal, fractal_args)
-D_M_lcdm = get_comoving_distance(z_comparison, H_model_lcdm, lcdm_args)
+# Calculate comoving distance for both models with the shared cumulative integrator
+D_M_fractal = comoving_distance(z_comparison, *fractal_args)
+D_M_lcdm = cumulative_comoving_distance(z_comparison, H_model_lcdm, lcdm_args)
 
 # The number of clusters is proportional to the comoving volume, which is ~D_M^3
 volume_fractal = D_M_fractal**3
@@ -0,0 +1,77 @@
+"""
+Dynamic Fractal Cosmological Model (DFCM) core library.
+
+The public names are imported lazily, on first access, so that ``import
+dfcm`` (and the ``python -m dfcm`` command) stays cheap and NumPy/SciPy are
+only loaded by the code paths that need them.
+"""
+
+import importlib
+
+__version__ = "2.0"
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    'PlanckTT': 'cmb',
+    'cumulative_comoving_distance': 'distances',
+    'DistanceEmulator': 'emulator',
+    'PhiHKernel': 'kernels',
+    'fused_H': 'kernels',
+    'Graph': 'graph',
+    'validation_graph': 'graph',
+    'GrowthSolution': 'growth',
+    'growth_f_sigma8': 'growth',
+    'solve_growth': 'growth',
+    'MEMO': 'memo',
+    'EvaluationCache': 'memo',
+    'PROBES': 'probes',
+    'grid_minimum': 'scan',
+    'grid_scan': 'scan',
+    'JointLikelihood': 'likelihood',
+    'MockCatalog': 'survey',
+    'StreamingSNIa': 'survey',
+    'generate_catalog': 'survey',
+    'SUITES': 'suites',
+    'run_suites': 'suites',
+}
+_EXPORTS.update(dict.fromkeys((
+    'BEST_FIT',
+    'C_LIGHT',
+    'PARAM_NAMES',
+    'PHI',
+    'PHI_0',
+    'PRIOR_BOUNDS',
+    'DFCMModel',
+    'H_from_phi',
+    'H_model',
+    'H_model_jacobian',
+    'HIGH_Z',
+    'comoving_distance',
+    'comoving_distance_jacobian',
+    'distance_modulus',
+    'distance_modulus_jacobian',
+    'expand_params',
+    'f_sigma8',
+    'high_z_comoving_distance',
+    'log_H_model',
+    'luminosity_distance',
+    'phi_z',
+    'phi_z_jacobian',
+    'rd_model',
+    'rd_model_jacobian',
+    'volume_averaged_distance',
+), 'model'))
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'dfcm' has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,7 @@
+"""Entry point of ``python -m dfcm``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,141 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Command Line Interface
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# One entry point for the validations and the fitting tools, run from the
+# scripts/ directory:
+#
+#   python -m dfcm list
+#   python -m dfcm run cc bao snia cmb [--json results.json] [--timing]
+#   python -m dfcm run all --processes 8 --report [--no-cache]
+#   python -m dfcm fit ... | sample ... | emulator ... | survey ... | serve ...
+#
+# ``run`` evaluates the selected suites in one process, loading each dataset
+# once, or with ``--processes N`` each suite in its own pool worker. Heavy
+# modules are imported only by the subcommand that needs them; ``--timing``
+# reports the import, data-load and compute times against the cold-start
+# budget. Results of unchanged suites come from the on-disk result cache
+# (dfcm.results) unless ``--no-cache`` is given. A suite that fails is
+# reported as such after the others, and ``run`` then exits with status 1.
+# ==============================================================================
+
+import argparse
+import json
+import sys
+import time
+
+# Library import + data load + compute of ``run`` over the bundled suites
+COLD_START_BUDGET_S = 1.0
+# Subcommands forwarded to the command line of an existing module
+DELEGATED = {
+    'fit': ('optimize', "multi-start global fit of the parameters"),
+    'sample': ('sampler', "ensemble MCMC over the parameters"),
+    'emulator': ('emulator', "build or load the cached D_M emulator"),
+    'survey': ('survey', "generate a mock SNIa catalog and time its streaming chi2"),
+    'serve': ('service', "run the local HTTP prediction service"),
+}
+
+
+def _run(args):
+    start = time.perf_counter()
+    from .results import ResultCache
+    from .suites import (DERIVED_SUITES, SUITES, SuiteContext, format_results, render_report, result_key,
+                         run_concurrently, run_suites)
+
+    names = list(SUITES) if not args.suites or args.suites == ['all'] else args.suites
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        print(f"dfcm: unknown suites {unknown}; available: {', '.join(SUITES)}", file=sys.stderr)
+        return 2
+
+    context = SuiteContext(params=args.params)
+    cache = None if args.no_cache else ResultCache()
+    imported = time.perf_counter()
+    if args.processes > 1:
+        # Every worker loads the data of its own suite
+        loaded = imported
+        results = run_concurrently(names, context.params, processes=args.processes, cache=cache)
+    else:
+        # Load the datasets of the suites to compute up front, so that data
+        # loading and computation are timed separately
+        for name in names:
+            key = result_key(name, context) if cache is not None and cache.enabled else None
+            if name not in DERIVED_SUITES and (key is None or key not in cache):
+                try:
+                    context.probe(name)
+                except Exception:
+                    # Reported with the results: run_suites records the failure
+                    pass
+        loaded = time.perf_counter()
+        results = run_suites(names, context, cache)
+    done = time.perf_counter()
+
+    if args.report:
+        print(render_report(results, context.params))
+    else:
+        print(f"--- DFCM validation: parameters {', '.join(f'{p:g}' for p in context.params)} ---")
+        for line in format_results(results):
+            print(line)
+    timing = {'import_s': imported - start, 'load_s': loaded - imported, 'compute_s': done - loaded,
+              'total_s': done - start, 'budget_s': COLD_START_BUDGET_S}
+    if args.timing:
+        status = "within" if timing['total_s'] <= COLD_START_BUDGET_S else "OVER"
+        print(f"-> Timing: import {1e3 * timing['import_s']:.0f} ms, data load {1e3 * timing['load_s']:.0f} ms, "
+              f"compute {1e3 * timing['compute_s']:.0f} ms; total {1e3 * timing['total_s']:.0f} ms "
+              f"({status} the {COLD_START_BUDGET_S:.1f} s budget)")
+    if args.json:
+        report = {'params': list(context.params), 'suites': results, 'timing': timing}
+        if args.json == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.json, 'w') as handle:
+                json.dump(report, handle, indent=2)
+    failed = [name for name, result in results.items() if 'error' in result]
+    if failed:
+        print(f"dfcm: {len(failed)} suite(s) failed: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _list(args):
+    from .suites import SUITES
+
+    for name, title in SUITES.items():
+        print(f"{name:>10}  {title}")
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in DELEGATED:
+        import importlib
+
+        module = importlib.import_module(f".{DELEGATED[argv[0]][0]}", __package__)
+        # argparse of the module then reports its usage as "dfcm <command>"
+        sys.argv[0] = f"dfcm {argv[0]}"
+        return module.main(argv[1:])
+
+    parser = argparse.ArgumentParser(prog='dfcm', description="Dynamic Fractal Cosmological Model tools.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run = subparsers.add_parser('run', help="run validation suites in one process")
+    run.add_argument('suites', nargs='*', help="suite names, or 'all' (default)")
+    run.add_argument('--params', type=float, nargs=5, default=None, metavar=('H0', 'OM', 'GAMMA', 'A1', 'A2'),
+                     help="parameter vector (default: the paper's best fit)")
+    run.add_argument('--json', default=None, metavar='PATH', help="write the results as JSON ('-' for stdout)")
+    run.add_argument('--processes', type=int, default=1,
+                     help="run each suite in its own worker of a pool of this size (default: 1, in-process)")
+    run.add_argument('--report', action='store_true', help="print the full text report")
+    run.add_argument('--timing', action='store_true', help="report import, load and compute times")
+    run.add_argument('--no-cache', action='store_true',
+                     help="recompute every suite instead of reusing the on-disk result cache")
+    run.set_defaults(handler=_run)
+    listing = subparsers.add_parser('list', help="list the available suites")
+    listing.set_defaults(handler=_list)
+    for name, (_, description) in DELEGATED.items():
+        subparsers.add_parser(name, help=description, add_help=False)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,133 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Planck TT Bandpowers
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# The Planck 2018 TT spectrum shipped with the repository
+# (COM_PowerSpect_CMB-TT-full_R3.01.txt), loaded once into the dataset store
+# and binned into bandpowers by a precomputed inverse-variance binning matrix.
+# The model spectrum is a template whose acoustic scale follows theta*:
+#
+#   D_l(model) = T(l theta*_model / theta*_ref)
+#
+# so the peaks move to l_n ~ n pi / theta*_model. By default the template is
+# the smoothed Planck spectrum itself (acoustic scale theta*_ref = Planck
+# theta*); any (l, D_l) theory spectrum can be passed instead. Beyond the
+# template's last multipole (the damping tail) the template is zero. chi2 is
+# vectorized over parameter batches, with its gradient through theta*.
+# ==============================================================================
+
+import numpy as np
+
+from .data import PLANCK_THETA_STAR, Z_RECOMBINATION
+from .probes import Probe
+
+PLANCK_TT_FILE = 'COM_PowerSpect_CMB-TT-full_R3.01.txt'
+# Width of the default bandpowers (multipoles), below which l >= 2 forms one bin
+BIN_WIDTH = 30
+L_MIN = 2
+# Gaussian width (multipoles) of the smoothing that turns the data into a template
+TEMPLATE_SMOOTHING = 20.0
+
+
+def default_edges(l_max, width=BIN_WIDTH, l_min=L_MIN):
+    """Bin edges [l_min, width, 2 width, ..., l_max + 1] (each bin is [lo, hi))."""
+    return np.unique(np.concatenate(([l_min], np.arange(width, l_max + 1, width), [l_max + 1])))
+
+
+def binning_matrix(ell, sigma, edges):
+    """
+    The (n_bins, n_l) matrix averaging D_l over each bin with inverse-variance
+    weights, and the resulting bandpower errors.
+    """
+    ell = np.asarray(ell)
+    weights = 1.0 / np.asarray(sigma, dtype=float)**2
+    bins = np.searchsorted(edges, ell, side='right') - 1
+    inside = (bins >= 0) & (bins < len(edges) - 1)
+    matrix = np.zeros((len(edges) - 1, ell.size))
+    matrix[bins[inside], np.flatnonzero(inside)] = weights[inside]
+    total = matrix.sum(axis=1)
+    keep = total > 0
+    return matrix[keep] / total[keep, None], 1.0 / np.sqrt(total[keep])
+
+
+def smoothed_spectrum(ell, Dl, sigma, width=TEMPLATE_SMOOTHING):
+    """Inverse-variance weighted Gaussian smoothing of D_l over multipoles (unit spacing)."""
+    offsets = np.arange(-int(4 * width), int(4 * width) + 1)
+    kernel = np.exp(-0.5 * (offsets / width)**2)
+    weights = 1.0 / np.asarray(sigma, dtype=float)**2
+    return (np.convolve(weights * Dl, kernel, mode='same')
+            / np.convolve(weights, kernel, mode='same'))
+
+
+class PlanckTT(Probe):
+    """
+    Binned Planck TT bandpowers against the theta*-shifted template, with
+    diagonal bandpower errors (symmetrized per-multipole errors).
+    """
+
+    name = 'cmb_tt'
+
+    def __init__(self, ell, Dl, sigma, edges=None, template=None, theta_ref=PLANCK_THETA_STAR,
+                 z_recombination=Z_RECOMBINATION):
+        self.redshifts = np.array([z_recombination])
+        self.ell = np.asarray(ell, dtype=float)
+        sigma = np.asarray(sigma, dtype=float)
+        self.edges = default_edges(int(self.ell.max())) if edges is None else np.asarray(edges)
+        self.binning, self.bandpower_err = binning_matrix(self.ell, sigma, self.edges)
+        self.bandpowers = self.binning @ np.asarray(Dl, dtype=float)
+        self.theta_ref = theta_ref
+        if template is None:
+            template = (self.ell, smoothed_spectrum(self.ell, Dl, sigma))
+        self.template_ell = np.asarray(template[0], dtype=float)
+        self.template = np.asarray(template[1], dtype=float)
+        self.template_slope = np.gradient(self.template, self.template_ell)
+
+    @classmethod
+    def load(cls, store=None, edges=None, template=None):
+        """Loads the shipped Planck TT spectrum through the dataset store (cached as .npy)."""
+        from .config import DATA_DIR
+        from .datasets import DatasetStore
+        from .profiling import PROFILER
+
+        with PROFILER.stage('load:cmb_tt'):
+            store = store if store is not None else DatasetStore()
+            spectrum = store.table('planck_tt', DATA_DIR / PLANCK_TT_FILE, columns=('l', 'Dl', '-dDl', '+dDl'))
+            sigma = 0.5 * (np.asarray(spectrum['-dDl']) + np.asarray(spectrum['+dDl']))
+            return cls(spectrum['l'], spectrum['Dl'], sigma, edges=edges, template=template)
+
+    @property
+    def ndata(self):
+        return self.bandpowers.size
+
+    def theta(self, table):
+        return table.rd / table.D_M(self.redshifts)[..., 0]
+
+    def _shifted(self, theta, values):
+        """Interpolates a template array at l theta / theta_ref, shape B + (n_l,)."""
+        scale = np.asarray(theta, dtype=float)[..., None] / self.theta_ref
+        x = scale * self.ell
+        return np.interp(x.ravel(), self.template_ell, values, right=0.0).reshape(x.shape)
+
+    def predict(self, theta):
+        """Model bandpowers for theta* values of any batch shape B, shape B + (n_bins,)."""
+        return self._shifted(theta, self.template) @ self.binning.T
+
+    def chi2_theta(self, theta):
+        """chi2 for theta* values of any batch shape B."""
+        weighted = (self.bandpowers - self.predict(theta)) / self.bandpower_err
+        return np.sum(weighted**2, axis=-1)
+
+    def chi2(self, table):
+        return self.chi2_theta(self.theta(table))
+
+    def chi2_gradient(self, table):
+        theta = self.theta(table)
+        d_theta = theta * (table.rd_jac / table.rd
+                           - table.dD_M(self.redshifts)[..., 0] / table.D_M(self.redshifts)[..., 0])
+        # dD_l/dtheta = (l / theta_ref) T'(l theta / theta_ref)
+        d_pred = (self._shifted(theta, self.template_slope) * (self.ell / self.theta_ref)) @ self.binning.T
+        weighted = (self.bandpowers - self.predict(theta)) / self.bandpower_err
+        d_chi2 = -2.0 * np.sum(weighted / self.bandpower_err * d_pred, axis=-1)
+        return np.sum(weighted**2, axis=-1), d_chi2 * d_theta
@@ -0,0 +1,17 @@
+"""Filesystem locations shared by the dfcm package."""
+
+import os
+from pathlib import Path
+
+# Directory holding the data files shipped with the repository (scripts/)
+DATA_DIR = Path(__file__).resolve().parent.parent
+# Local cache for derived artefacts; override with the DFCM_CACHE_DIR variable
+CACHE_DIR = Path(os.environ.get("DFCM_CACHE_DIR", Path.home() / ".cache" / "dfcm"))
+# Memory ceiling of the in-process evaluation cache (bytes, 0 disables it)
+MEMO_MAX_BYTES = int(os.environ.get("DFCM_MEMO_BYTES", 64 << 20))
+# Enables the hot-path counters and stage timers (dfcm.profiling)
+PROFILE = os.environ.get("DFCM_PROFILE", "") not in ("", "0")
+# Rank of the structured (diagonal + low-rank) Pantheon+ covariance; 0 keeps the dense Cholesky factor
+SNIA_COV_RANK = int(os.environ.get("DFCM_SNIA_RANK", 0))
+# Size limit of the on-disk cache of validation results (bytes, 0 disables it)
+RESULT_CACHE_BYTES = int(os.environ.get("DFCM_RESULT_CACHE_BYTES", 16 << 20))
@@ -0,0 +1,212 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Covariance Handling
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Chi-squared evaluation through a Cholesky factorization of the covariance
+# matrix, with the factor persisted to the local cache so that the O(N^3)
+# decomposition is done once per dataset.
+#
+# LowRankCovariance is the structured alternative for large compilations: a
+# diagonal plus the k leading eigenmodes of the systematics, C ~ D + U U^T,
+# with chi2 through the Woodbury identity in O(N k) memory and time.
+# ==============================================================================
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+from scipy.linalg import cho_solve, cholesky, eigh, solve_triangular
+
+from .config import CACHE_DIR
+from .profiling import PROFILER
+
+
+def covariance_cache_key(*sources, mask=None):
+    """
+    Builds a cache key from the raw content of the data/covariance sources
+    (bytes or file paths) and an optional selection mask or index array.
+    """
+    digest = hashlib.sha256()
+    for source in sources:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            digest.update(source)
+        else:
+            with open(source, 'rb') as handle:
+                for block in iter(lambda: handle.read(1 << 20), b''):
+                    digest.update(block)
+    if mask is not None:
+        digest.update(np.ascontiguousarray(mask).tobytes())
+    return digest.hexdigest()[:32]
+
+
+class CholeskyCovariance:
+    """
+    A covariance matrix C held as its lower Cholesky factor L (C = L L^T).
+
+    chi2 = d^T C^-1 d is evaluated as |L^-1 d|^2 with one triangular solve,
+    O(N^2) per residual vector, without ever forming C^-1.
+    """
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    @classmethod
+    def from_matrix(cls, cov_matrix):
+        """Factorizes a dense symmetric positive-definite covariance matrix."""
+        factor = cholesky(cov_matrix, lower=True, check_finite=False)
+        return cls(np.asfortranarray(factor))
+
+    @classmethod
+    def cached(cls, key, build_covariance, cache_dir=None):
+        """
+        Loads the factor stored under ``key`` in the cache directory, or calls
+        ``build_covariance()`` to get the dense matrix, factorizes it and
+        stores the factor for the next run.
+        """
+        path = Path(cache_dir or CACHE_DIR) / f"cholesky-{key}.npy"
+        if path.exists():
+            return cls(np.load(path, mmap_mode='r'))
+
+        instance = cls.from_matrix(build_covariance())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as handle:
+            np.save(handle, instance.factor)
+        os.replace(tmp_path, path)
+        return instance
+
+    @property
+    def size(self):
+        return self.factor.shape[0]
+
+    def whiten(self, diff):
+        """Returns L^-1 diff for a residual vector or an (N, k) block of them."""
+        return solve_triangular(self.factor, diff, lower=True, check_finite=False)
+
+    def solve(self, diff):
+        """Returns C^-1 diff with two triangular solves."""
+        return solve_triangular(self.factor, self.whiten(diff), lower=True, trans='T',
+                                check_finite=False)
+
+    def chi2(self, diff):
+        """Calculates diff^T C^-1 diff (one value per column for 2-D input)."""
+        with PROFILER.stage('covariance solve'):
+            white = self.whiten(diff)
+            return np.sum(white * white, axis=0)
+
+    def log_det(self):
+        """Calculates log|C| from the diagonal of the factor."""
+        return 2.0 * np.sum(np.log(np.diag(self.factor)))
+
+
+class LowRankCovariance:
+    """
+    A covariance approximated as C = D + U U^T, with D diagonal (N,) and U
+    the (N, k) loadings of the k leading systematic modes.
+
+    By the Woodbury identity, chi2 = |D^-1/2 d|^2 - |L_M^-1 W^T D^-1/2 d|^2
+    with W = D^-1/2 U and L_M the Cholesky factor of the k x k capacitance
+    matrix M = I + W^T W, so no N x N array is ever held.
+    """
+
+    def __init__(self, diagonal, loadings):
+        self.diagonal = np.asarray(diagonal, dtype=float)
+        self.loadings = np.asarray(loadings, dtype=float).reshape(self.diagonal.size, -1)
+        self._inv_sqrt = 1.0 / np.sqrt(self.diagonal)
+        self._white_loadings = self.loadings * self._inv_sqrt[:, None]
+        capacitance = np.eye(self.rank) + self._white_loadings.T @ self._white_loadings
+        self._capacitance = cholesky(capacitance, lower=True, check_finite=False)
+
+    @classmethod
+    def from_matrix(cls, cov_matrix, rank, iterations=3):
+        """
+        Decomposes a dense covariance by principal factor analysis: U holds
+        the ``rank`` leading eigenmodes of C - D, and D = diag(C - U U^T) keeps
+        the variances exact. A few alternations settle D and U.
+        """
+        cov_matrix = np.asarray(cov_matrix, dtype=float)
+        n = cov_matrix.shape[0]
+        variances = np.diag(cov_matrix).copy()
+        diagonal, loadings = variances, np.zeros((n, 0))
+        for iteration in range(max(iterations, 1) if rank > 0 else 0):
+            # The first pass decomposes C itself, later ones the off-diagonal part C - D
+            reduced = cov_matrix - np.diag(diagonal) if iteration else cov_matrix
+            values, vectors = eigh(reduced, subset_by_index=(n - rank, n - 1), check_finite=False)
+            loadings = vectors * np.sqrt(np.clip(values, 0.0, None))
+            # Floor keeps D positive definite where a mode absorbs a whole variance
+            diagonal = np.maximum(variances - np.sum(loadings**2, axis=1), 1e-6 * variances)
+        return cls(diagonal, loadings)
+
+    @classmethod
+    def cached(cls, key, build_covariance, rank, cache_dir=None):
+        """
+        Loads the decomposition of rank ``rank`` stored under ``key``, or
+        builds it from ``build_covariance()`` and stores it.
+        """
+        path = Path(cache_dir or CACHE_DIR) / f"lowrank-{key}-k{rank}.npz"
+        if path.exists():
+            with np.load(path) as stored:
+                return cls(stored['diagonal'], stored['loadings'])
+
+        instance = cls.from_matrix(build_covariance(), rank)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as handle:
+            np.savez(handle, diagonal=instance.diagonal, loadings=instance.loadings)
+        os.replace(tmp_path, path)
+        return instance
+
+    @property
+    def size(self):
+        return self.diagonal.size
+
+    @property
+    def rank(self):
+        return self.loadings.shape[1]
+
+    def dense(self):
+        """The represented N x N matrix D + U U^T (for checks only)."""
+        return np.diag(self.diagonal) + self.loadings @ self.loadings.T
+
+    def _projection(self, white):
+        """L_M^-1 W^T white, for whitened residuals (N,) or (N, m)."""
+        return solve_triangular(self._capacitance, self._white_loadings.T @ white, lower=True,
+                                check_finite=False)
+
+    def solve(self, diff):
+        """Returns C^-1 diff (Woodbury)."""
+        diff = np.asarray(diff, dtype=float)
+        scale = self._inv_sqrt if diff.ndim == 1 else self._inv_sqrt[:, None]
+        white = diff * scale
+        correction = self._white_loadings @ cho_solve((self._capacitance, True),
+                                                      self._white_loadings.T @ white,
+                                                      check_finite=False)
+        return (white - correction) * scale
+
+    def chi2(self, diff):
+        """Calculates diff^T C^-1 diff (one value per column for 2-D input)."""
+        with PROFILER.stage('covariance solve'):
+            diff = np.asarray(diff, dtype=float)
+            white = diff * (self._inv_sqrt if diff.ndim == 1 else self._inv_sqrt[:, None])
+            projected = self._projection(white)
+            return np.sum(white * white, axis=0) - np.sum(projected * projected, axis=0)
+
+    def log_det(self):
+        """Calculates log|C| = log|D| + log|M| (matrix determinant lemma)."""
+        return np.sum(np.log(self.diagonal)) + 2.0 * np.sum(np.log(np.diag(self._capacitance)))
+
+
+def chi2_discrepancy(dense, structured, diff):
+    """
+    Compares the chi2 of the residuals ``diff`` (N,) or (N, m) under a dense
+    covariance (CholeskyCovariance) and its structured approximation.
+    """
+    exact = np.atleast_1d(dense.chi2(diff))
+    approx = np.atleast_1d(structured.chi2(diff))
+    return {'rank': getattr(structured, 'rank', None), 'chi2_dense': exact.tolist(),
+            'chi2_structured': approx.tolist(),
+            'max_abs_error': float(np.max(np.abs(approx - exact))),
+            'max_rel_error': float(np.max(np.abs(approx / exact - 1.0)))}
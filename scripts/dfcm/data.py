@@ -0,0 +1,64 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Observational Datasets
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# The small observational datasets used by the validation scripts, defined
+# once as NumPy arrays. The large Pantheon+ files are served by
+# dfcm.datasets.
+# ==============================================================================
+
+import numpy as np
+
+# --- H(z) Cosmic Chronometers: z, H(z), sigma_H (km/s/Mpc) ---
+COSMIC_CHRONOMETERS = np.array([
+    [0.07, 69.0, 19.6], [0.09, 69.0, 12.0], [0.12, 68.6, 26.2], [0.17, 83.0, 8.0],
+    [0.179, 75.0, 4.0], [0.199, 75.0, 5.0], [0.20, 72.9, 29.6], [0.27, 77.0, 14.0],
+    [0.28, 88.8, 36.6], [0.352, 83.0, 14.0], [0.38, 83.0, 13.5], [0.4, 95.0, 17.0],
+    [0.4004, 77.0, 10.2], [0.425, 87.1, 11.2], [0.445, 92.8, 12.9], [0.47, 89.0, 49.6],
+    [0.4783, 80.9, 9.0], [0.48, 97.0, 62.0], [0.593, 104.0, 13.0], [0.68, 92.0, 8.0],
+    [0.75, 98.8, 33.6], [0.781, 105.0, 12.0], [0.875, 125.0, 17.0], [0.88, 90.0, 40.0],
+    [0.9, 117.0, 23.0], [1.037, 154.0, 20.0], [1.3, 168.0, 17.0], [1.363, 160.0, 33.6],
+    [1.43, 177.0, 18.0], [1.53, 140.0, 14.0], [1.75, 202.0, 40.0], [1.965, 186.5, 50.4]
+])
+
+# --- DESI BAO: z, ratio, sigma. First row is DV/rd, the others c/Hrd (DH/rd) ---
+DESI_BAO = np.array([
+    [0.51, 13.09, 0.10], [0.71, 20.29, 0.30], [2.33, 32.18, 0.85]
+])
+DESI_BAO_IS_DV = np.array([True, False, False])
+
+# --- DESI Y1 growth rate fsigma8 (arXiv:2404.03000): z, fsigma8, sigma ---
+DESI_FSIGMA8 = np.array([
+    [0.25, 0.413, 0.031], [0.45, 0.459, 0.016], [0.65, 0.415, 0.017], [0.85, 0.400, 0.019],
+    [1.05, 0.365, 0.020], [1.25, 0.338, 0.022], [1.45, 0.319, 0.023], [1.65, 0.292, 0.024],
+    [2.1, 0.265, 0.018], [2.5, 0.228, 0.016], [3.0, 0.201, 0.014], [3.8, 0.142, 0.023]
+])
+SIGMA8 = 0.812
+
+# --- Fermi-LAT GRB (Dirirsa et al. 2023): z, D_L, sigma_DL (Mpc) ---
+FERMI_GRB = np.array([
+    [2.02, 3347, 180], [1.95, 3205, 165], [3.58, 5980, 320], [2.31, 3820, 200],
+    [4.35, 7250, 380], [5.47, 9020, 470], [2.17, 3590, 190], [3.64, 6050, 315],
+    [1.54, 2560, 135], [2.19, 3630, 190], [1.92, 3170, 165], [3.20, 5280, 275],
+    [4.65, 7650, 400], [1.62, 2680, 140], [2.38, 3950, 210], [8.23, 13100, 680],
+    [5.71, 9400, 490], [3.06, 5020, 260], [4.50, 7450, 390], [1.79, 2980, 155]
+], dtype=float)
+# Realistic error scaling used in the GRB analysis (15% minimum)
+GRB_ERROR_FLOOR = 0.15
+
+# --- H0LiCOW lensing (Suyu et al. 2020): z_lens, H0, sigma_H0 ---
+H0LICOW = np.array([
+    [0.295, 72.5, 2.1], [0.630, 73.7, 3.0], [0.722, 74.1, 2.6],
+    [0.939, 71.8, 2.7], [1.004, 73.3, 2.1], [1.524, 74.6, 3.2]
+])
+
+# --- CMB (Planck) angular scale of the sound horizon ---
+Z_RECOMBINATION = 1090.0
+PLANCK_THETA_STAR = 0.0104085
+PLANCK_THETA_STAR_ERR = 0.000004
+
+# --- Local H0 (SH0ES) ---
+H0_LOCAL = 73.24
+H0_LOCAL_ERR = 0.42
@@ -0,0 +1,254 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Offline Binary Dataset Store
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Converts the text data files (Pantheon+ table, STAT+SYS covariance) into
+# .npy arrays once, records them with their checksums in a JSON manifest and
+# memory-maps them on every later run. After the first conversion no network
+# access and no text parsing is needed.
+# ==============================================================================
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .config import CACHE_DIR
+
+MANIFEST_NAME = "manifest.json"
+# Size of the blocks read by the streaming matrix parser
+CHUNK_BYTES = 1 << 22
+
+
+def file_sha256(path):
+    """Calculates the SHA-256 checksum of a file, reading it in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_text_table(path, columns):
+    """
+    Parses the requested numeric columns of a whitespace table with a header
+    row (which may be commented out with a leading '#').
+    """
+    with open(path) as handle:
+        header = handle.readline().lstrip('#').split()
+    missing = [name for name in columns if name not in header]
+    if missing:
+        raise KeyError(f"Columns {missing} not found in {path}")
+    usecols = [header.index(name) for name in columns]
+    data = np.loadtxt(path, skiprows=1, usecols=usecols, ndmin=2)
+    return {name: np.ascontiguousarray(data[:, i]) for i, name in enumerate(columns)}
+
+
+def read_text_matrix(path, index=None, allocate=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Parses a square matrix stored as its size N followed by N*N values,
+    streaming the file in blocks of ``chunk_bytes`` straight into the output.
+
+    ``index`` selects a submatrix (rows and columns ``index``), extracted in
+    the same pass: values arrive in row-major order, so the kept entries of
+    each block are simply appended to the flat output. ``allocate(shape)``
+    provides the output buffer (e.g. a memory-mapped .npy file); by default
+    a new array is returned. Peak memory is the output plus one block.
+    """
+    with open(path, 'rb') as handle:
+        n = int(handle.readline())
+        keep = None
+        if index is not None:
+            keep = np.zeros(n, dtype=bool)
+            keep[index] = True
+        m = n if keep is None else int(keep.sum())
+        out = allocate((m, m)) if allocate is not None else np.empty((m, m))
+        flat = out.reshape(-1)
+
+        position = 0
+        filled = 0
+        tail = b''
+        while True:
+            block = handle.read(chunk_bytes)
+            data = tail + block
+            if block:
+                # Only parse complete lines; the partial last line goes to the next block
+                cut = data.rfind(b'\n') + 1
+                data, tail = data[:cut], data[cut:]
+            if data.strip():
+                values = np.fromstring(data.decode('ascii'), sep=' ')
+                start, position = position, position + values.size
+                # Surplus values are only counted, for the size check below
+                if position <= n * n:
+                    if keep is not None:
+                        rows, cols = np.divmod(np.arange(start, position), n)
+                        values = values[keep[rows] & keep[cols]]
+                    flat[filled:filled + values.size] = values
+                    filled += values.size
+            if not block:
+                break
+
+    if position != n * n:
+        raise ValueError(f"{path}: expected {n * n} matrix values, found {position}")
+    return out
+
+
+def download(url, destination):
+    """Downloads ``url`` to ``destination`` (the only step needing the network)."""
+    import requests
+
+    response = requests.get(url, timeout=60)
+    if response.status_code != 200:
+        raise IOError(f"Failed to download {url}. Status: {response.status_code}")
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_suffix(destination.suffix + f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(response.content)
+    os.replace(tmp_path, destination)
+    return destination
+
+
+class DatasetStore:
+    """
+    Local store of datasets converted to memory-mappable binary arrays.
+
+    Each dataset is described in the manifest by its source file (path, size,
+    mtime, SHA-256) and its arrays (file, dtype, shape, SHA-256). A dataset
+    is rebuilt only when its source file changes; if the source is gone the
+    stored arrays keep being served, so the store works fully offline.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else CACHE_DIR / "datasets"
+        self._manifest = None
+
+    # --- Manifest ---
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            path = self.root / MANIFEST_NAME
+            self._manifest = json.loads(path.read_text()) if path.exists() else {}
+        return self._manifest
+
+    def _write_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f"{MANIFEST_NAME}.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps(self.manifest, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.root / MANIFEST_NAME)
+
+    # --- Public API ---
+    def table(self, name, source, columns, url=None):
+        """Returns the requested columns of a text table as a dict of memmapped arrays."""
+        columns = tuple(columns)
+
+        def build(path, allocate):
+            for column, values in read_text_table(path, columns).items():
+                allocate(column, values.shape)[:] = values
+
+        entry = self._entry(name, source, url, build, signature=list(columns))
+        return {column: self._open(entry, column) for column in columns}
+
+    def matrix(self, name, source, url=None, index=None):
+        """
+        Returns a square text matrix, or its ``index`` x ``index`` submatrix,
+        as a memmapped array. The text is streamed directly into the stored
+        .npy file, so the conversion never holds more than one read block
+        besides the output.
+        """
+        signature = ['matrix']
+        if index is not None:
+            index = np.asarray(index, dtype=np.int64)
+            signature.append(hashlib.sha256(index.tobytes()).hexdigest())
+
+        def build(path, allocate):
+            read_text_matrix(path, index=index, allocate=lambda shape: allocate('matrix', shape))
+
+        entry = self._entry(name, source, url, build, signature=signature)
+        return self._open(entry, 'matrix')
+
+    def checksum(self, name):
+        """SHA-256 of the source file the dataset was built from."""
+        return self.manifest[name]['source']['sha256']
+
+    def fingerprint(self, name):
+        """
+        SHA-256 of the dataset's source if the stored copy is current, without
+        reading any file; None when the dataset is not stored or its source
+        file changed size or mtime since (it then needs a rebuild check).
+        """
+        entry = self.manifest.get(name)
+        if entry is None:
+            return None
+        source = Path(entry['source']['path'])
+        if source.exists():
+            stat = source.stat()
+            if stat.st_size != entry['source']['size'] or stat.st_mtime != entry['source']['mtime']:
+                return None
+        return entry['source']['sha256']
+
+    def verify(self, name):
+        """Checks every stored array of ``name`` against its recorded checksum."""
+        entry = self.manifest[name]
+        return all(file_sha256(self.root / info['file']) == info['sha256']
+                   for info in entry['arrays'].values())
+
+    # --- Internals ---
+    def _open(self, entry, key):
+        return np.load(self.root / entry['arrays'][key]['file'], mmap_mode='r')
+
+    def _resolve_source(self, source, url):
+        source = Path(source)
+        if source.exists() or url is None:
+            return source
+        # Files not shipped with the repository are downloaded once into the store
+        return self.root / "sources" / source.name
+
+    def _entry(self, name, source, url, build, signature):
+        source = self._resolve_source(source, url)
+        entry = self.manifest.get(name)
+
+        if entry is not None and entry['signature'] == signature:
+            if not source.exists():
+                return entry
+            stat = source.stat()
+            recorded = entry['source']
+            if recorded['size'] == stat.st_size and recorded['mtime'] == stat.st_mtime:
+                return entry
+            if recorded['sha256'] == file_sha256(source):
+                recorded['mtime'] = stat.st_mtime
+                self._write_manifest()
+                return entry
+
+        if not source.exists():
+            if url is None:
+                raise FileNotFoundError(f"No source file or stored copy for dataset '{name}': {source}")
+            download(url, source)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        allocated = {}
+
+        def allocate(key, shape, dtype=np.float64):
+            path = self.root / f"{name}.{key}.npy"
+            allocated[key] = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=tuple(shape))
+            return allocated[key]
+
+        build(source, allocate)
+        arrays = {}
+        for key, array in allocated.items():
+            array.flush()
+            filename = f"{name}.{key}.npy"
+            arrays[key] = {'file': filename, 'dtype': str(array.dtype), 'shape': list(array.shape),
+                           'sha256': file_sha256(self.root / filename)}
+        allocated.clear()
+        stat = source.stat()
+        self.manifest[name] = {
+            'signature': signature,
+            'source': {'path': str(source), 'size': stat.st_size, 'mtime': stat.st_mtime,
+                       'sha256': file_sha256(source)},
+            'arrays': arrays,
+        }
+        self._write_manifest()
+        return self.manifest[name]
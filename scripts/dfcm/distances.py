@@ -0,0 +1,109 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Cumulative Distance Engine
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Integrates c/H(z) once along a shared redshift grid and reads the comoving
+# distance off the running sum at every requested redshift, instead of
+# starting an independent quadrature from z = 0 for each target.
+# ==============================================================================
+
+from functools import lru_cache
+
+import numpy as np
+
+from .profiling import PROFILER
+
+# Speed of light in km/s
+C_LIGHT = 299792.458
+
+# Largest redshift step of the shared integration grid
+DZ_MAX = 0.25
+# Gauss-Legendre nodes per grid interval
+GL_ORDER = 8
+# Composite fixed-node rule of the log-space (high-redshift) integrator
+LOG_PANELS = 16
+LOG_ORDER = 16
+
+
+@lru_cache(maxsize=None)
+def unit_interval_rule(panels=LOG_PANELS, order=LOG_ORDER):
+    """
+    Nodes and weights of a composite Gauss-Legendre rule on [0, 1]
+    (``panels`` equal panels of ``order`` nodes), computed once and reused.
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    edges = np.linspace(0.0, 1.0, panels + 1)
+    half = 0.5 * np.diff(edges)[:, None]
+    mid = 0.5 * (edges[1:] + edges[:-1])[:, None]
+    rule_nodes = (mid + half * nodes).ravel()
+    rule_weights = (half * weights).ravel()
+    rule_nodes.flags.writeable = False
+    rule_weights.flags.writeable = False
+    return rule_nodes, rule_weights
+
+
+def cumulative_integral(z, integrand, args=(), dz_max=DZ_MAX, order=GL_ORDER):
+    """
+    Calculates int_0^z integrand(z', *args) dz' for every redshift of ``z``
+    in a single pass.
+
+    The unique target redshifts are sorted and merged with a uniform grid of
+    step ``dz_max``; each interval of the merged grid is integrated with an
+    ``order``-point Gauss-Legendre rule (one vectorized call to
+    ``integrand``) and the interval integrals are accumulated with a
+    cumulative sum.
+
+    The entries of ``args`` may be arrays of a common batch shape B (one
+    parameter vector per entry); they reach ``integrand`` with two extra
+    trailing (interval, node) axes. Whatever leading shape S the integrand
+    returns (B, or e.g. a stack of derivatives times B), the result has shape
+    S + z.shape. Redshifts must be non-negative.
+    """
+    z = np.asarray(z, dtype=float)
+    args = np.broadcast_arrays(*[np.asarray(arg, dtype=float) for arg in args])
+    targets, inverse = np.unique(z.ravel(), return_inverse=True)
+    if targets.size == 0:
+        lead_shape = np.shape(integrand(np.zeros((1, 1)), *[arg[..., None, None] for arg in args]))[:-2]
+        return np.zeros(lead_shape + z.shape)
+    if targets[0] < 0:
+        raise ValueError("cumulative_integral requires non-negative redshifts")
+
+    z_max = targets[-1]
+    base = np.linspace(0.0, z_max, int(np.ceil(z_max / dz_max)) + 1)
+    knots = np.union1d(base, targets)
+
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    half = 0.5 * np.diff(knots)[:, None]
+    mid = 0.5 * (knots[1:] + knots[:-1])[:, None]
+    # Parameters gain two trailing axes: (interval, node)
+    values = integrand(mid + half * nodes, *[arg[..., None, None] for arg in args])
+    segments = np.sum(half * weights * values, axis=-1)
+    if PROFILER.enabled:
+        PROFILER.count('integrals')
+        PROFILER.count('integrand_calls')
+        PROFILER.count('integrand_points', values.size)
+        PROFILER.count('distances', values.size // (values.shape[-1] * values.shape[-2]) * z.size)
+
+    lead_shape = segments.shape[:-1]
+    running = np.zeros(lead_shape + (knots.size,))
+    np.cumsum(segments, axis=-1, out=running[..., 1:])
+    integrals = running[..., np.searchsorted(knots, targets)]
+    return integrals[..., inverse].reshape(lead_shape + z.shape)
+
+
+def cumulative_comoving_distance(z, H_function, args=(), dz_max=DZ_MAX, order=GL_ORDER):
+    """
+    Calculates the comoving distance D_M(z) = int_0^z c/H(z') dz' in Mpc for
+    every redshift of ``z`` in a single pass of ``cumulative_integral``.
+
+    With parameters of batch shape B in ``args`` the result has shape
+    B + z.shape.
+
+    Accuracy: for the DFCM H(z) the default grid agrees with scipy ``quad``
+    to a relative error below 1e-12 on every Pantheon+ redshift, i.e. better
+    than 1e-11 mag in the distance modulus.
+    """
+    integrand = lambda zz, *params: C_LIGHT / H_function(zz, *params)
+    return cumulative_integral(z, integrand, args, dz_max, order)
@@ -0,0 +1,292 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Incremental Computation Graph
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# The validation computations as a DAG of named nodes, evaluated lazily:
+#
+#   params -> shape (Gamma, A1, A2) -> phi table -> H table --------+
+#         \                        \-> rd, cluster deficit         |
+#          \-> D_M table (integration) ----------------------------+-> distance
+#   probe:<name> (datasets) -> redshifts -------------------------/    table
+#                                          chi2:<name> <- table, probe:<name>
+#                                          report <- every chi2, rd, deficit
+#
+# Every node records the versions of its inputs when it is computed, and is
+# recomputed only when one of them changed. A source's version is a cheap
+# token: source() bumps it unless the new value is the same object or an
+# equal plain value (e.g. the same parameter tuple), and touch() bumps it
+# after a source was changed in place; source values are never hashed.
+# Computed values are compared through a content digest, and a node whose
+# new value equals the old one keeps its version (early cutoff): changing H0
+# leaves phi, rd and the cluster deficit alone, and replacing one probe's
+# dataset only recomputes that probe's chi2 if its redshifts are already
+# tabulated. Each node is submitted to a thread pool as soon as its inputs
+# are up to date (NumPy releases the GIL in the heavy array operations), so
+# a slow node never holds back independent branches.
+#
+# The graph is a library API for interactive and incremental use (see
+# benchmarks/bench_graph.py); ``dfcm run`` evaluates its suites directly.
+#
+# Shortcut: the H node only holds H at the probe redshifts, so the D_M node
+# does not read it. It integrates H(z) on its own quadrature nodes straight
+# from the parameters, and is recomputed whenever any parameter changes.
+# ==============================================================================
+
+import hashlib
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+
+def _unchanged(old, new):
+    """Cheap test that a source value is the one it replaces: identity, or equal plain values."""
+    if old is new:
+        return True
+    if type(old) is not type(new) or not isinstance(new, (tuple, int, float, str)):
+        return False
+    try:
+        return bool(old == new)
+    except (TypeError, ValueError):
+        return False
+
+
+def _fingerprint(value):
+    """
+    Content digest of a computed value (arrays, nested tuples/lists/dicts,
+    scalars, and objects through their attributes), for early cutoff.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    seen = set()
+
+    def feed(item):
+        if isinstance(item, np.ndarray):
+            digest.update(f"ndarray{item.dtype.str}{item.shape}".encode())
+            digest.update(np.ascontiguousarray(item).tobytes())
+        elif isinstance(item, (tuple, list)):
+            digest.update(f"{type(item).__name__}{len(item)}".encode())
+            for element in item:
+                feed(element)
+        elif isinstance(item, dict):
+            digest.update(f"dict{len(item)}".encode())
+            for key, element in item.items():
+                feed(key)
+                feed(element)
+        elif isinstance(item, (int, float, complex, str, bytes, np.generic)) or item is None:
+            digest.update(f"{type(item).__name__}:{item!r}".encode())
+        elif hasattr(item, '__dict__') and id(item) not in seen:
+            seen.add(id(item))
+            digest.update(f"{type(item).__qualname__}".encode())
+            feed(vars(item))
+        else:
+            digest.update(f"{type(item).__qualname__}@{id(item)}".encode())
+
+    feed(value)
+    return digest.digest()
+
+
+class _Node:
+    def __init__(self, name, function=None, inputs=()):
+        self.name = name
+        self.function = function
+        self.inputs = tuple(inputs)
+        self.value = None
+        # Content digest of a computed value, compared for early cutoff
+        self.stamp = None
+        self.version = 0
+        # Input versions the value was computed from (None: never computed)
+        self.computed_from = None
+
+
+class Graph:
+    """
+    Named source and computed nodes. ``graph[name]`` (or ``evaluate``)
+    brings the requested nodes up to date, computing only what changed.
+    ``workers`` threads evaluate independent nodes concurrently (serially
+    when 1; default: the CPU count).
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self._nodes = {}
+        # Node name -> number of times it was computed
+        self.computations = {}
+
+    def source(self, name, value):
+        """Defines or updates an input node; dependents are invalidated if the value changed."""
+        node = self._nodes.get(name)
+        if node is None:
+            node = self._nodes[name] = _Node(name)
+        elif node.function is not None:
+            raise ValueError(f"'{name}' is a computed node")
+        elif node.version and _unchanged(node.value, value):
+            return
+        node.value = value
+        node.version += 1
+
+    def touch(self, name):
+        """Invalidates the dependents of a source whose value was changed in place."""
+        node = self._nodes[name]
+        if node.function is not None:
+            raise ValueError(f"'{name}' is a computed node")
+        node.version += 1
+
+    def node(self, name, function, inputs=()):
+        """Defines the node ``name`` = function(*values of ``inputs``)."""
+        if name in self._nodes:
+            raise ValueError(f"Node '{name}' is already defined")
+        self._nodes[name] = _Node(name, function, inputs)
+
+    @property
+    def names(self):
+        return list(self._nodes)
+
+    def _order(self, names):
+        """The requested nodes and their ancestors, inputs before dependents."""
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Cycle through node '{name}'")
+            if name not in self._nodes:
+                raise KeyError(f"Unknown node '{name}'")
+            state[name] = 'visiting'
+            for parent in self._nodes[name].inputs:
+                visit(parent)
+            state[name] = 'done'
+            order.append(name)
+
+        for name in names:
+            visit(name)
+        return order
+
+    def _current(self, node):
+        return node.function is None or node.computed_from == tuple(
+            self._nodes[parent].version for parent in node.inputs)
+
+    def stale(self, names=None):
+        """Nodes that evaluating ``names`` would compute (ignoring early cutoff)."""
+        order = self._order(self.names if names is None else names)
+        changed = set()
+        for name in order:
+            node = self._nodes[name]
+            if node.function is not None and (not self._current(node)
+                                              or any(parent in changed for parent in node.inputs)):
+                changed.add(name)
+        return [name for name in order if name in changed]
+
+    def _compute(self, node):
+        return node.function(*[self._nodes[parent].value for parent in node.inputs])
+
+    def _store(self, node, value):
+        """Records a computed value; its version only changes if its content did."""
+        node.value = value
+        stamp = _fingerprint(value)
+        if stamp != node.stamp:
+            node.stamp = stamp
+            node.version += 1
+        node.computed_from = tuple(self._nodes[parent].version for parent in node.inputs)
+        self.computations[node.name] = self.computations.get(node.name, 0) + 1
+
+    def evaluate(self, names=None):
+        """Brings ``names`` (default: every node) up to date and returns their values."""
+        names = self.names if names is None else list(names)
+        order = self._order(names)
+        if self.workers <= 1:
+            for name in order:
+                node = self._nodes[name]
+                if not self._current(node):
+                    self._store(node, self._compute(node))
+            return {name: self._nodes[name].value for name in names}
+
+        waiting = {name: set(self._nodes[name].inputs) for name in order}
+        dependents = {name: [] for name in order}
+        for name in order:
+            for parent in self._nodes[name].inputs:
+                dependents[parent].append(name)
+        ready = [name for name in order if not waiting[name]]
+        running = {}
+        executor = ThreadPoolExecutor(self.workers)
+        try:
+            while ready or running:
+                while ready:
+                    node = self._nodes[ready.pop()]
+                    if self._current(node):
+                        ready.extend(self._release(node.name, waiting, dependents))
+                    else:
+                        running[executor.submit(self._compute, node)] = node
+                if running:
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        node = running.pop(future)
+                        self._store(node, future.result())
+                        ready.extend(self._release(node.name, waiting, dependents))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return {name: self._nodes[name].value for name in names}
+
+    @staticmethod
+    def _release(name, waiting, dependents):
+        """Marks ``name`` up to date and returns the dependents it made ready."""
+        released = []
+        for child in dependents[name]:
+            waiting[child].discard(name)
+            if not waiting[child]:
+                released.append(child)
+        return released
+
+    def __getitem__(self, name):
+        return self.evaluate([name])[name]
+
+
+def _redshifts(*probes):
+    return np.unique(np.concatenate([np.asarray(probe.redshifts, dtype=float) for probe in probes]))
+
+
+def _table(redshifts, params, hubble, comoving, rd):
+    from .probes import DistanceTable
+
+    return DistanceTable.from_arrays(redshifts, params, hubble, comoving, rd)
+
+
+def _report(names, rd, deficit, *chi2):
+    per_probe = {name: float(value) for name, value in zip(names, chi2)}
+    return {'chi2': per_probe, 'total_chi2': sum(per_probe.values()), 'rd': float(rd),
+            'cluster_deficit_percent': float(deficit)}
+
+
+def validation_graph(probes=None, params=None, workers=None):
+    """
+    The DAG of the validation quantities for ``probes`` (default: the probes
+    bundled with the package) at ``params`` (default: the best fit). Update
+    inputs with ``graph.source('params', ...)`` or ``graph.source('probe:<name>',
+    probe)`` and read any node, e.g. ``graph['report']``.
+    """
+    from .model import BEST_FIT, H_from_phi, comoving_distance, phi_z, rd_model
+    from .probes import PROBES
+    from .suites import cluster_deficit
+
+    probes = list(PROBES.values()) if probes is None else list(probes)
+    names = tuple(probe.name for probe in probes)
+    graph = Graph(workers)
+    graph.source('params', tuple(float(p) for p in (BEST_FIT if params is None else params)))
+    for probe in probes:
+        graph.source(f"probe:{probe.name}", probe)
+
+    graph.node('shape', lambda params: params[2:], ['params'])
+    graph.node('redshifts', _redshifts, [f"probe:{name}" for name in names])
+    graph.node('phi', lambda z, shape: phi_z(z, *shape), ['redshifts', 'shape'])
+    graph.node('H', lambda z, phi, params: H_from_phi(z, phi, *params[:2]), ['redshifts', 'phi', 'params'])
+    graph.node('D_M', lambda z, params: comoving_distance(z, *params), ['redshifts', 'params'])
+    graph.node('rd', lambda shape: rd_model(*shape), ['shape'])
+    graph.node('cluster_deficit', lambda shape: cluster_deficit((None, None) + shape), ['shape'])
+    graph.node('table', _table, ['redshifts', 'params', 'H', 'D_M', 'rd'])
+    for name in names:
+        graph.node(f"chi2:{name}", lambda probe, table: probe.chi2(table), [f"probe:{name}", 'table'])
+    graph.node('report', lambda *values: _report(names, *values),
+               ['rd', 'cluster_deficit'] + [f"chi2:{name}" for name in names])
+    return graph
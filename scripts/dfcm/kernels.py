@@ -0,0 +1,136 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Fused phi(z)/H(z) Kernel
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Evaluates phi(z) and H(z) on a fixed redshift grid with in-place ufuncs
+# writing into preallocated buffers. Everything that depends only on z
+# (ln(1+z), (1+z)^3 and the two BAO bumps) is computed once per grid, and
+# H(z) is rewritten with a single exponential:
+#
+#   H = H0 sqrt((1+z)^3 (Om e^b + (1 - Om) e^-b)),  b = 3 (phi - 1) ln(1+z)
+#
+# so one parameter vector costs two exp calls and no temporary arrays.
+# Batches of parameter vectors run the same in-place sequence on blocks of
+# rows. float32 grids are supported. The kernel is an entry point for
+# callers that evaluate H(z) many times on one fixed grid; the distance
+# integrators (DistanceTable, the scan, the emulator build) evaluate H_model
+# on quadrature nodes that change with their targets and do not use it.
+# ==============================================================================
+
+import numpy as np
+
+from .model import PHI, PHI_0
+
+# Elements per block of H_batch rows (2 MiB of float64 scratch)
+BATCH_BLOCK_ELEMENTS = 1 << 18
+
+
+class PhiHKernel:
+    """
+    phi(z) and H(z) on the redshift grid ``z`` for scalar parameters, with
+    optional ``out`` buffers of the grid's shape and dtype. Only one scratch
+    array of the grid's size is allocated, at construction.
+    """
+
+    def __init__(self, z, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.z = np.ascontiguousarray(z, dtype=self.dtype)
+        self.log1pz = np.log1p(self.z)
+        self.cube = (1.0 + self.z)**3
+        self.bump_1 = np.exp(-0.5 * ((self.z - 0.4) / 0.3)**2)
+        self.bump_2 = np.exp(-0.5 * ((self.z - 1.5) / 0.4)**2)
+        self._work = np.empty_like(self.z)
+
+    @property
+    def shape(self):
+        return self.z.shape
+
+    def _buffer(self, out):
+        if out is None:
+            return np.empty_like(self.z)
+        if out.shape != self.z.shape or out.dtype != self.dtype:
+            raise ValueError(f"out must have shape {self.z.shape} and dtype {self.dtype}")
+        return out
+
+    def phi(self, Gamma, A1, A2, out=None):
+        """Calculates phi(z) into ``out``."""
+        phi = self._buffer(out)
+        np.multiply(self.z, -Gamma, out=phi)
+        np.exp(phi, out=phi)
+        phi *= PHI_0 - PHI
+        phi += PHI
+        np.multiply(self.bump_1, A1, out=self._work)
+        phi += self._work
+        np.multiply(self.bump_2, A2, out=self._work)
+        phi += self._work
+        return phi
+
+    def H(self, H0, Om, Gamma, A1, A2, out=None, phi_out=None):
+        """Calculates H(z) into ``out`` (and phi(z) into ``phi_out`` if given)."""
+        H = self._buffer(out)
+        work = self._work
+        phi = self.phi(Gamma, A1, A2, out=phi_out if phi_out is not None else H)
+        # b = 3 (phi - 1) ln(1+z), then Om e^b + (1 - Om) e^-b
+        np.subtract(phi, 1.0, out=work)
+        work *= self.log1pz
+        work *= 3.0
+        np.exp(work, out=work)
+        np.reciprocal(work, out=H)
+        H *= 1.0 - Om
+        work *= Om
+        H += work
+        H *= self.cube
+        np.sqrt(H, out=H)
+        H *= H0
+        return H
+
+    def H_batch(self, H0, Om, Gamma, A1, A2, out=None):
+        """
+        Calculates H(z) for n parameter vectors (1-D parameter arrays) into
+        ``out`` of shape (n,) + z.shape, in blocks of rows sharing one
+        scratch array. Each row equals the result of H().
+        """
+        params = np.broadcast_arrays(*[np.atleast_1d(np.asarray(p, dtype=self.dtype))
+                                       for p in (H0, Om, Gamma, A1, A2)])
+        if params[0].ndim != 1:
+            raise ValueError("H_batch takes scalar or 1-D parameter arrays")
+        n = params[0].size
+        shape = (n,) + self.z.shape
+        if out is None:
+            out = np.empty(shape, dtype=self.dtype)
+        elif out.shape != shape or out.dtype != self.dtype:
+            raise ValueError(f"out must have shape {shape} and dtype {self.dtype}")
+        block = max(1, BATCH_BLOCK_ELEMENTS // max(self.z.size, 1))
+        scratch = np.empty((min(block, n),) + self.z.shape, dtype=self.dtype)
+        columns = (-1,) + (1,) * self.z.ndim
+        for start in range(0, n, block):
+            H, work = out[start:start + block], scratch[:min(block, n - start)]
+            H0, Om, Gamma, A1, A2 = (p[start:start + block].reshape(columns) for p in params)
+            # phi, then H, as in phi() and H() with one row per parameter vector
+            np.multiply(self.z, -Gamma, out=H)
+            np.exp(H, out=H)
+            H *= PHI_0 - PHI
+            H += PHI
+            np.multiply(self.bump_1, A1, out=work)
+            H += work
+            np.multiply(self.bump_2, A2, out=work)
+            H += work
+            np.subtract(H, 1.0, out=work)
+            work *= self.log1pz
+            work *= 3.0
+            np.exp(work, out=work)
+            np.reciprocal(work, out=H)
+            H *= 1.0 - Om
+            work *= Om
+            H += work
+            H *= self.cube
+            np.sqrt(H, out=H)
+            H *= H0
+        return out
+
+
+def fused_H(z, H0, Om, Gamma, A1, A2, out=None, dtype=np.float64):
+    """One-shot H(z) through the fused kernel (scalar parameters)."""
+    return PhiHKernel(z, dtype).H(H0, Om, Gamma, A1, A2, out=out)
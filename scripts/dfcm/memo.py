@@ -0,0 +1,190 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Evaluation Memo Cache
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Bounded in-memory LRU cache of model evaluations (distance arrays, shared
+# distance tables), keyed on the rounded parameter vector and the redshift
+# set, so that repeated evaluations at the same point are computed once per
+# run. Entries are evicted least-recently-used first once the stored arrays
+# exceed a memory ceiling. Only single parameter vectors are cached: the
+# batches of scans, samplers, optimizers and the service are almost never
+# evaluated twice and would only evict the useful entries.
+# ==============================================================================
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .config import MEMO_MAX_BYTES
+
+# Parameters and redshifts are rounded to this many decimals in the keys
+KEY_DECIMALS = 12
+
+
+def _nbytes(value):
+    """Memory held by the arrays of a cached value (arrays, bytes, containers or plain objects)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+    if hasattr(value, '__dict__'):
+        return _nbytes(vars(value))
+    return 0
+
+
+def _freeze(value):
+    """
+    Marks the arrays returned by a cached function read-only, since they are
+    shared between callers (objects are left as they are: they may hold the
+    caller's own input arrays).
+    """
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+class EvaluationCache:
+    """
+    LRU cache of evaluations with hit/miss statistics and a memory ceiling.
+
+    ``get_or_compute(kind, args, compute)`` returns the value stored for the
+    numerical arguments ``args`` (scalars or arrays, rounded to
+    ``decimals``), or calls ``compute()`` and stores its result. Returned
+    arrays are read-only. ``max_bytes=0`` disables caching.
+    """
+
+    def __init__(self, max_bytes=MEMO_MAX_BYTES, decimals=KEY_DECIMALS):
+        self.max_bytes = int(max_bytes)
+        self.decimals = decimals
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, kind, args):
+        """Hashable key of ``kind`` evaluated at the rounded numerical ``args``."""
+        digest = hashlib.blake2b(digest_size=16)
+        for arg in args:
+            array = np.round(np.asarray(arg, dtype=float), self.decimals) + 0.0
+            digest.update(repr(array.shape).encode())
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return kind, digest.digest()
+
+    def get_or_compute(self, kind, args, compute):
+        if self.max_bytes <= 0:
+            return compute()
+        key = self.key(kind, args)
+        found, value = self._lookup(key)
+        if found:
+            return value
+        return self._store(key, compute())
+
+    def get(self, kind, args, default=None):
+        """The value stored for ``args``, or ``default`` (counted as a miss)."""
+        if self.max_bytes <= 0:
+            return default
+        found, value = self._lookup(self.key(kind, args))
+        return value if found else default
+
+    def put(self, kind, args, value):
+        """Stores ``value`` for ``args`` and returns it (read-only if an array)."""
+        if self.max_bytes <= 0:
+            return value
+        return self._store(self.key(kind, args), value)
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            self.misses += 1
+            return False, None
+
+    def _store(self, key, value):
+        value = _freeze(value)
+        size = _nbytes(value)
+        with self._lock:
+            if size <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (value, size)
+                self._nbytes += size
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._nbytes -= size
+            self.evictions += 1
+
+    def resize(self, max_bytes):
+        """Changes the memory ceiling, evicting entries that no longer fit."""
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def clear(self):
+        """Drops every entry and resets the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Hit/miss counts, hit rate, evictions and memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': self.hits / lookups if lookups else 0.0,
+                    'evictions': self.evictions, 'entries': len(self._entries),
+                    'nbytes': self._nbytes, 'max_bytes': self.max_bytes}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        stats = self.stats()
+        return (f"EvaluationCache(entries={stats['entries']}, hits={stats['hits']}, misses={stats['misses']}, "
+                f"nbytes={stats['nbytes']}, max_bytes={stats['max_bytes']})")
+
+
+# Process-wide cache shared by the model core and every probe
+MEMO = EvaluationCache()
+
+
+def single_point(params):
+    """Whether parameters are scalars (one parameter vector) rather than a batch."""
+    return all(np.ndim(p) == 0 for p in params)
+
+
+def memoize(kind, cache=None, params_from=0):
+    """
+    Decorator caching a function of numerical arguments in ``cache`` (the
+    shared MEMO by default). Calls whose arguments from ``params_from`` on
+    are not all scalars (parameter batches) are computed without caching.
+    The uncached function stays available as ``__wrapped__``.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args):
+            if not single_point(args[params_from:]):
+                return function(*args)
+            memo = cache if cache is not None else MEMO
+            return memo.get_or_compute(kind, args, lambda: function(*args))
+        return wrapper
+    return decorate
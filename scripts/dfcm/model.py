@@ -0,0 +1,321 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Shared Model Core
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Single definition of phi(z), H(z) and the derived distances used by every
+# validation script. All functions accept whole NumPy redshift arrays and
+# broadcast over the model parameters.
+# ==============================================================================
+
+import numpy as np
+
+from .distances import C_LIGHT, cumulative_comoving_distance, cumulative_integral, unit_interval_rule
+from .memo import memoize
+from .profiling import PROFILER
+
+# --- Constants ---
+# The Golden Ratio, value of phi(z) in the distant past
+PHI = (1 + np.sqrt(5)) / 2
+# Value of phi(z) today
+PHI_0 = 2.85
+# Fiducial LambdaCDM sound horizon at the drag epoch (Mpc)
+RS_FIDUCIAL = 147.0
+Z_DRAG = 1060.0
+# Above this redshift distances are integrated in ln(1+z) (CMB distances)
+HIGH_Z = 10.0
+
+PARAM_NAMES = ("H0", "Om", "Gamma", "A1", "A2")
+# GLOBAL best-fit parameters from the paper
+BEST_FIT = (73.24, 0.2974, 0.433, 0.031, 0.019)
+# Flat prior box (lower, upper) of each parameter for fits and samplers
+PRIOR_BOUNDS = ((50.0, 100.0), (0.05, 0.6), (0.0, 2.0), (-0.2, 0.2), (-0.2, 0.2))
+
+
+def phi_z(z, Gamma, A1, A2):
+    """Calculates the dynamic fractal dimension phi(z)."""
+    base = PHI + (PHI_0 - PHI) * np.exp(-Gamma * z)
+    bao_bump_1 = A1 * np.exp(-0.5 * ((z - 0.4) / 0.3)**2)
+    bao_bump_2 = A2 * np.exp(-0.5 * ((z - 1.5) / 0.4)**2)
+    return base + bao_bump_1 + bao_bump_2
+
+
+def H_from_phi(z, phi, H0, Om):
+    """Calculates H(z) from an already evaluated phi(z)."""
+    OL = 1.0 - Om
+    term1 = Om * (1.0 + z)**(3.0 * phi)
+    term2 = OL * (1.0 + z)**(3.0 * (2.0 - phi))
+    return H0 * np.sqrt(term1 + term2)
+
+
+def H_model(z, H0, Om, Gamma, A1, A2):
+    """Calculates the theoretical H(z) from the dynamic fractal model."""
+    H = H_from_phi(z, phi_z(z, Gamma, A1, A2), H0, Om)
+    if PROFILER.enabled:
+        PROFILER.count('H_model_calls')
+        PROFILER.count('H_model_points', np.size(H))
+    return H
+
+
+def expand_params(params, ndim):
+    """
+    Appends ``ndim`` trailing axes to each parameter so that a batch of
+    parameter vectors broadcasts against an ``ndim``-dimensional redshift array.
+    """
+    axes = tuple(range(-ndim, 0))
+    return tuple(np.expand_dims(np.asarray(p, dtype=float), axes) for p in params)
+
+
+def log_H_model(z, H0, Om, Gamma, A1, A2, log1pz=None):
+    """
+    Calculates ln H(z) in log space: the matter and dark-energy terms are
+    combined with log-sum-exp, so no power of (1 + z) is ever formed.
+    """
+    u = np.log1p(z) if log1pz is None else log1pz
+    phi = phi_z(z, Gamma, A1, A2)
+    log_matter = np.log(Om) + 3.0 * phi * u
+    log_dark_energy = np.log1p(-Om) + 3.0 * (2.0 - phi) * u
+    log_H = np.log(H0) + 0.5 * np.logaddexp(log_matter, log_dark_energy)
+    if PROFILER.enabled:
+        PROFILER.count('log_H_model_calls')
+        PROFILER.count('log_H_model_points', np.size(log_H))
+    return log_H
+
+
+def _log_space_nodes(z, params):
+    """Nodes u = t ln(1+z) of the fixed unit-interval rule, and the expanded parameters."""
+    z = np.asarray(z, dtype=float)
+    nodes, weights = unit_interval_rule()
+    log_max = np.log1p(z)[..., None]
+    u = log_max * nodes
+    return u, np.expm1(u), log_max[..., 0], weights, expand_params(params, z.ndim + 1)
+
+
+def high_z_comoving_distance(z, H0, Om, Gamma, A1, A2):
+    """
+    Calculates D_M(z) for high redshifts (CMB) by integrating
+    c (1+z)/H(z) d ln(1+z) with a precomputed fixed-node rule and ln H in
+    log space. With the default 16 x 16-node rule the relative error against
+    scipy ``quad`` is below 1e-15 at z = 1090 and 1100. Batched parameters
+    give a result of shape B + z.shape.
+    """
+    u, zz, log_max, weights, params = _log_space_nodes(z, (H0, Om, Gamma, A1, A2))
+    integrand = np.exp(u - log_H_model(zz, *params, log1pz=u))
+    _count_log_space_integral(integrand)
+    return C_LIGHT * log_max * np.sum(weights * integrand, axis=-1)
+
+
+def _count_log_space_integral(integrand):
+    if PROFILER.enabled:
+        PROFILER.count('integrals')
+        PROFILER.count('integrand_calls')
+        PROFILER.count('integrand_points', integrand.size)
+        PROFILER.count('distances', integrand.size // integrand.shape[-1])
+
+
+def _split_high_z(z, low, high):
+    """
+    Evaluates ``low`` on the redshifts up to HIGH_Z and ``high`` above it,
+    and reassembles the results (which share their leading axes).
+    """
+    z = np.asarray(z, dtype=float)
+    is_high = z > HIGH_Z
+    if not is_high.any():
+        return low(z)
+    if is_high.all():
+        return high(z)
+    low_part = low(z[~is_high])
+    high_part = high(z[is_high])
+    out = np.empty(low_part.shape[:-1] + z.shape)
+    out[..., ~is_high] = low_part
+    out[..., is_high] = high_part
+    return out
+
+
+@memoize('D_M', params_from=1)
+def comoving_distance(z, H0, Om, Gamma, A1, A2):
+    """
+    Calculates the comoving distance D_M(z) in Mpc for a whole redshift array,
+    integrating c/H(z) once along a shared grid. Redshifts above HIGH_Z use
+    the log-space integrator. Results for a single parameter vector are
+    memoized (read-only arrays).
+
+    The parameters may be arrays of a common batch shape B, in which case
+    the result has shape B + z.shape (this holds for all distance functions).
+    """
+    params = (H0, Om, Gamma, A1, A2)
+    return _split_high_z(z, lambda zz: cumulative_comoving_distance(zz, H_model, params),
+                         lambda zz: high_z_comoving_distance(zz, *params))
+
+
+def luminosity_distance(z, H0, Om, Gamma, A1, A2):
+    """Calculates the luminosity distance D_L(z) in Mpc."""
+    return (1.0 + np.asarray(z, dtype=float)) * comoving_distance(z, H0, Om, Gamma, A1, A2)
+
+
+def volume_averaged_distance(z, H0, Om, Gamma, A1, A2):
+    """Calculates the BAO volume-averaged distance D_V(z) in Mpc."""
+    z = np.asarray(z, dtype=float)
+    comoving_dist = comoving_distance(z, H0, Om, Gamma, A1, A2)
+    hubble = H_model(z, *expand_params((H0, Om, Gamma, A1, A2), z.ndim))
+    with np.errstate(divide='ignore'):
+        return np.where(hubble == 0.0, np.inf,
+                        np.cbrt(C_LIGHT * z * comoving_dist**2 / hubble))
+
+
+def distance_modulus(z, H0, Om, Gamma, A1, A2):
+    """Calculates the theoretical distance modulus mu(z)."""
+    dl_mpc = luminosity_distance(z, H0, Om, Gamma, A1, A2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(dl_mpc > 0, 5 * np.log10(dl_mpc) + 25, np.inf)
+
+
+def f_sigma8(z, Gamma, A1, A2, sigma8=0.812):
+    """Structure growth rate fsigma8 prediction."""
+    phi = phi_z(z, Gamma, A1, A2)
+    f = phi**0.5 * (1 + z)**(1.5 * phi - 1)
+    return f * sigma8
+
+
+def rd_model(Gamma, A1, A2, z_drag=Z_DRAG):
+    """Calculates the sound horizon at drag epoch (rd)."""
+    phi_at_drag = phi_z(z_drag, Gamma, A1, A2)
+    return RS_FIDUCIAL * (phi_at_drag / PHI)**(-0.75)
+
+
+# --- Parameter Jacobians ---
+# Derivatives are taken with respect to (H0, Om, Gamma, A1, A2) and stacked
+# on a new leading axis of length 5, in front of the shape of the value.
+
+def phi_z_jacobian(z, Gamma, A1, A2):
+    """phi(z) and its derivatives with respect to (Gamma, A1, A2), stacked on a leading axis."""
+    decay = (PHI_0 - PHI) * np.exp(-Gamma * z)
+    bump_1 = np.exp(-0.5 * ((z - 0.4) / 0.3)**2)
+    bump_2 = np.exp(-0.5 * ((z - 1.5) / 0.4)**2)
+    phi = PHI + decay + A1 * bump_1 + A2 * bump_2
+    return phi, np.stack(np.broadcast_arrays(-z * decay, bump_1, bump_2, phi))[:3]
+
+
+def H_model_jacobian(z, H0, Om, Gamma, A1, A2):
+    """
+    H(z) and its exact derivatives with respect to (H0, Om, Gamma, A1, A2),
+    computed from the same intermediate terms.
+    """
+    phi, dphi = phi_z_jacobian(z, Gamma, A1, A2)
+    x = 1.0 + z
+    matter_growth = x**(3.0 * phi)
+    dark_energy_growth = x**(3.0 * (2.0 - phi))
+    matter = Om * matter_growth
+    dark_energy = (1.0 - Om) * dark_energy_growth
+    E = np.sqrt(matter + dark_energy)
+    H = H0 * E
+    dH_dphi = 1.5 * H0 * np.log(x) * (matter - dark_energy) / E
+    dH_dOm = 0.5 * H0 * (matter_growth - dark_energy_growth) / E
+    jacobian = np.stack(np.broadcast_arrays(E, dH_dOm, *(dH_dphi * dphi), H))[:5]
+    return H, jacobian
+
+
+def _high_z_distance_and_jacobian(z, H0, Om, Gamma, A1, A2):
+    """
+    High-redshift D_M(z) stacked with its parameter derivatives, from the
+    log-space integrand f = c exp(u - ln H) with df = -f dlnH.
+    """
+    u, zz, log_max, weights, params = _log_space_nodes(z, (H0, Om, Gamma, A1, A2))
+    H0, Om, Gamma, A1, A2 = params
+    phi, dphi = phi_z_jacobian(zz, Gamma, A1, A2)
+    log_matter = np.log(Om) + 3.0 * phi * u
+    log_dark_energy = np.log1p(-Om) + 3.0 * (2.0 - phi) * u
+    log_E2 = np.logaddexp(log_matter, log_dark_energy)
+    matter_share = np.exp(log_matter - log_E2)
+    dark_energy_share = np.exp(log_dark_energy - log_E2)
+    integrand = np.exp(u - np.log(H0) - 0.5 * log_E2)
+
+    dlogH_dH0 = np.broadcast_to(1.0 / H0, integrand.shape)
+    dlogH_dOm = 0.5 * (matter_share / Om - dark_energy_share / (1.0 - Om))
+    dlogH_dphi = 1.5 * u * (matter_share - dark_energy_share)
+    dlogH = np.concatenate([dlogH_dH0[None], dlogH_dOm[None], dlogH_dphi * dphi])
+    stacked = np.concatenate([integrand[None], -integrand * dlogH])
+    _count_log_space_integral(stacked)
+    return C_LIGHT * log_max * np.sum(weights * stacked, axis=-1)
+
+
+def comoving_distance_jacobian(z, H0, Om, Gamma, A1, A2):
+    """
+    D_M(z) and its parameter derivatives dD_M = -int c/H^2 dH dz', integrated
+    together with the distance in one pass on the same grid (log-space rule
+    above HIGH_Z).
+    """
+    def integrand(zz, *params):
+        H, dH = H_model_jacobian(zz, *params)
+        inverse = C_LIGHT / H
+        return np.concatenate([inverse[None], -(inverse / H) * dH])
+
+    params = (H0, Om, Gamma, A1, A2)
+    result = _split_high_z(z, lambda zz: cumulative_integral(zz, integrand, params),
+                           lambda zz: _high_z_distance_and_jacobian(zz, *params))
+    return result[0], result[1:]
+
+
+def distance_modulus_jacobian(z, H0, Om, Gamma, A1, A2):
+    """mu(z) and its parameter derivatives, dmu = 5/ln(10) dD_M / D_M."""
+    D_M, dD_M = comoving_distance_jacobian(z, H0, Om, Gamma, A1, A2)
+    dl_mpc = (1.0 + np.asarray(z, dtype=float)) * D_M
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu = np.where(dl_mpc > 0, 5 * np.log10(dl_mpc) + 25, np.inf)
+        return mu, (5.0 / np.log(10.0)) * dD_M / D_M
+
+
+def rd_model_jacobian(Gamma, A1, A2, z_drag=Z_DRAG):
+    """rd and its derivatives with respect to (H0, Om, Gamma, A1, A2)."""
+    phi, dphi = phi_z_jacobian(z_drag, Gamma, A1, A2)
+    rd = RS_FIDUCIAL * (phi / PHI)**(-0.75)
+    drd = -0.75 * rd / phi * dphi
+    return rd, np.concatenate([np.zeros((2,) + np.shape(rd)), drd])
+
+
+class DFCMModel:
+    """
+    The Dynamic Fractal Cosmological Model at a fixed parameter vector.
+
+    Every method takes a scalar or a NumPy array of redshifts and evaluates
+    it in one vectorized call.
+    """
+
+    def __init__(self, H0=BEST_FIT[0], Om=BEST_FIT[1], Gamma=BEST_FIT[2],
+                 A1=BEST_FIT[3], A2=BEST_FIT[4]):
+        self.H0 = H0
+        self.Om = Om
+        self.Gamma = Gamma
+        self.A1 = A1
+        self.A2 = A2
+
+    @property
+    def params(self):
+        """The parameter vector (H0, Om, Gamma, A1, A2)."""
+        return (self.H0, self.Om, self.Gamma, self.A1, self.A2)
+
+    def __repr__(self):
+        args = ", ".join(f"{name}={value!r}" for name, value in zip(PARAM_NAMES, self.params))
+        return f"DFCMModel({args})"
+
+    def phi(self, z):
+        return phi_z(z, self.Gamma, self.A1, self.A2)
+
+    def H(self, z):
+        return H_model(z, *self.params)
+
+    def D_M(self, z):
+        return comoving_distance(z, *self.params)
+
+    def D_L(self, z):
+        return luminosity_distance(z, *self.params)
+
+    def D_V(self, z):
+        return volume_averaged_distance(z, *self.params)
+
+    def mu(self, z):
+        return distance_modulus(z, *self.params)
+
+    def rd(self, z_drag=Z_DRAG):
+        return rd_model(self.Gamma, self.A1, self.A2, z_drag)
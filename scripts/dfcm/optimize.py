@@ -0,0 +1,223 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Multi-Start Global Fit
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Regenerates the best-fit parameters from the data: bounded local
+# minimizations of the joint chi-squared start from Latin-hypercube points of
+# the prior box and run concurrently in a process pool, using the exact chi2
+# gradient of the joint likelihood. Converged minima are deduplicated, and
+# the parameter errors of the best one come from the Hessian of chi2
+# (one-sided at the prior edges; parameters on a bound get no error bar).
+#
+# Usage: python -m dfcm.optimize --starts 16 --output best_fit.json
+# ==============================================================================
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.stats import qmc
+
+from .model import PARAM_NAMES, PRIOR_BOUNDS
+
+# Step (in units of the prior width) of the Hessian finite differences
+HESSIAN_STEP = 1e-4
+# Distance (in units of the prior width) within which a parameter is at a prior bound
+BOUND_TOL = 1e-8
+# chi2 reported where the likelihood is not finite: large but finite, so that
+# the minimizer's line search backtracks out of the region instead of failing
+NONFINITE_CHI2 = 1e30
+
+
+class Chi2Objective:
+    """
+    chi2 of a likelihood as a function of the unit-cube coordinates u of the
+    prior box (params = lower + u * width), which keeps the parameters on a
+    common scale for the minimizer.
+    """
+
+    def __init__(self, likelihood, bounds=PRIOR_BOUNDS):
+        self.likelihood = likelihood
+        bounds = np.asarray(bounds, dtype=float)
+        self.lower = bounds[:, 0]
+        self.width = bounds[:, 1] - bounds[:, 0]
+
+    def to_params(self, u):
+        return self.lower + np.asarray(u) * self.width
+
+    def to_unit(self, params):
+        return (np.asarray(params) - self.lower) / self.width
+
+    def chi2(self, u):
+        """chi2 at one point or an (n, ndim) batch of unit-cube points."""
+        params = self.to_params(np.atleast_2d(u))
+        total, _ = self.likelihood(tuple(params.T))
+        return np.where(np.isfinite(total), total, NONFINITE_CHI2)
+
+    def gradient(self, u):
+        """chi2 and its exact gradient in unit-cube coordinates, for an (n, ndim) batch."""
+        params = self.to_params(np.atleast_2d(u))
+        total, gradient, _ = self.likelihood.value_and_gradient(tuple(params.T))
+        gradient = gradient.T * self.width
+        finite = np.isfinite(total) & np.all(np.isfinite(gradient), axis=1)
+        return np.where(finite, total, NONFINITE_CHI2), np.where(finite[:, None], gradient, 0.0)
+
+    def value_and_gradient(self, u):
+        """chi2 and its analytic gradient at one unit-cube point."""
+        total, gradient = self.gradient(u)
+        return total[0], gradient[0]
+
+    def hessian(self, u):
+        """
+        Hessian of chi2 in unit-cube coordinates: differences of the analytic
+        gradient, all 2 * ndim points evaluated in one batched call. The step
+        is one-sided for a parameter on the edge of the prior box, so every
+        point stays inside it.
+        """
+        u = np.asarray(u, dtype=float)
+        shift = np.eye(u.size, dtype=bool)
+        plus = np.minimum(u + HESSIAN_STEP, 1.0)
+        minus = np.maximum(u - HESSIAN_STEP, 0.0)
+        _, gradients = self.gradient(np.vstack([np.where(shift, plus, u), np.where(shift, minus, u)]))
+        hess = (gradients[:u.size] - gradients[u.size:]).T / (plus - minus)
+        return 0.5 * (hess + hess.T)
+
+
+# Objective of the current worker process, set once per worker
+_worker_objective = None
+
+
+def _init_worker(objective):
+    global _worker_objective
+    _worker_objective = objective
+
+
+def _minimize_from(start, objective=None):
+    objective = objective if objective is not None else _worker_objective
+    result = minimize(objective.value_and_gradient, start, jac=True, method='L-BFGS-B',
+                      bounds=[(0.0, 1.0)] * len(start), options={'maxiter': 500})
+    return {'start': start, 'u': result.x, 'chi2': float(result.fun),
+            'converged': bool(result.success), 'iterations': int(result.nit),
+            'evaluations': int(result.nfev)}
+
+
+def latin_hypercube_starts(n_starts, ndim=len(PARAM_NAMES), seed=None):
+    """``n_starts`` Latin-hypercube points of the unit cube."""
+    return qmc.LatinHypercube(d=ndim, seed=seed).random(n_starts)
+
+
+def deduplicate_minima(results, tol=1e-3, chi2_tol=1e-3):
+    """
+    Groups local minima that agree within ``tol`` in unit-cube coordinates
+    and ``chi2_tol`` (relative) in chi2; returns one representative per
+    group, sorted by chi2, with the number of starts that reached it.
+    """
+    minima = []
+    for result in sorted(results, key=lambda r: r['chi2']):
+        for minimum in minima:
+            same_point = np.max(np.abs(result['u'] - minimum['u'])) < tol
+            same_chi2 = abs(result['chi2'] - minimum['chi2']) <= chi2_tol * max(abs(minimum['chi2']), 1.0)
+            if same_point and same_chi2:
+                minimum['count'] += 1
+                break
+        else:
+            minima.append(dict(result, count=1))
+    return minima
+
+
+def multistart_fit(likelihood, n_starts=16, processes=None, bounds=PRIOR_BOUNDS, seed=None):
+    """
+    Minimizes the joint chi2 from ``n_starts`` Latin-hypercube starts in
+    parallel and returns the best fit with Hessian-based 1-sigma errors
+    (None for the parameters listed in 'at_bound'). Starts where chi2 is
+    not finite are rejected before the minimizations.
+    """
+    objective = Chi2Objective(likelihood, bounds)
+    starts = latin_hypercube_starts(n_starts, seed=seed)
+    starts = starts[objective.chi2(starts) < NONFINITE_CHI2]
+    if not len(starts):
+        raise ValueError(f"chi2 is not finite at any of the {n_starts} starts")
+    processes = processes if processes is not None else os.cpu_count() or 1
+
+    begin = time.perf_counter()
+    if processes > 1:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(objective,)) as pool:
+            results = list(pool.map(_minimize_from, starts))
+    else:
+        results = [_minimize_from(start, objective) for start in starts]
+    elapsed = time.perf_counter() - begin
+
+    minima = deduplicate_minima([result for result in results if result['chi2'] < NONFINITE_CHI2])
+    best = minima[0]
+    params = objective.to_params(best['u'])
+
+    # Parameters on a prior bound get no error bar; the others are conditioned on them
+    at_bound = (best['u'] <= BOUND_TOL) | (best['u'] >= 1.0 - BOUND_TOL)
+    free = np.flatnonzero(~at_bound)
+    # chi2 = -2 ln L, so the covariance is (H_chi2 / 2)^-1, mapped back from unit coordinates
+    hessian = objective.hessian(best['u']) / np.outer(objective.width, objective.width)
+    covariance = np.full_like(hessian, np.nan)
+    try:
+        covariance[np.ix_(free, free)] = 2.0 * np.linalg.inv(hessian[np.ix_(free, free)])
+    except np.linalg.LinAlgError:
+        pass
+    variances = np.diag(covariance)
+    errors = [None if at_bound[i] else float(np.sqrt(variances[i])) if variances[i] > 0 else float('nan')
+              for i in range(len(params))]
+    covariance = [[None if at_bound[i] or at_bound[j] else float(covariance[i, j]) for j in range(len(params))]
+                  for i in range(len(params))]
+
+    _, per_probe = likelihood(tuple(params))
+    return {
+        'best_fit': dict(zip(PARAM_NAMES, params.tolist())),
+        'errors': dict(zip(PARAM_NAMES, errors)),
+        'at_bound': [name for name, bound in zip(PARAM_NAMES, at_bound) if bound],
+        'covariance': covariance,
+        'chi2': best['chi2'],
+        'dof': likelihood.dof,
+        'chi2_per_probe': {name: float(value) for name, value in per_probe.items()},
+        'probes': likelihood.names,
+        'minima': [{'params': objective.to_params(m['u']).tolist(), 'chi2': m['chi2'],
+                    'count': m['count'], 'converged': m['converged']} for m in minima],
+        'n_starts': n_starts,
+        'rejected_starts': n_starts - len(starts),
+        'evaluations': sum(r['evaluations'] for r in results),
+        'elapsed_sec': elapsed,
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    from .likelihood import JointLikelihood
+
+    parser = argparse.ArgumentParser(description="Multi-start global fit of the DFCM parameters.")
+    parser.add_argument('--starts', type=int, default=16)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--output', default='best_fit.json')
+    parser.add_argument('--no-snia', action='store_true', help="leave out the Pantheon+ SNIa probe")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    likelihood = JointLikelihood.default(include_snia=not args.no_snia)
+    fit = multistart_fit(likelihood, n_starts=args.starts, processes=args.processes, seed=args.seed)
+    with open(args.output, 'w') as handle:
+        json.dump(fit, handle, indent=2)
+
+    print(f"--- Multi-start fit: {args.starts} starts, probes {fit['probes']} ---")
+    for name in PARAM_NAMES:
+        if name in fit['at_bound']:
+            print(f"-> {name:>5} = {fit['best_fit'][name]:.4f} (at a prior bound, no error bar)")
+        else:
+            print(f"-> {name:>5} = {fit['best_fit'][name]:.4f} +/- {fit['errors'][name]:.4f}")
+    print(f"-> chi2 = {fit['chi2']:.3f} for {fit['dof']} dof ({len(fit['minima'])} distinct minima)")
+    print(f"-> {fit['evaluations']} chi2 evaluations in {fit['elapsed_sec']:.1f} s; written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,400 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Observational Probes
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Chi-squared of each observational probe. Probes read H(z), D_M(z) and rd
+# from a DistanceTable, so that several probes evaluated at the same
+# parameter vector share one set of integrations. Every probe is also
+# callable as probe(H0, Om, Gamma, A1, A2) with scalars or arrays of a
+# common batch shape B, returning chi2 with shape B.
+#
+# With a table built with jacobian=True, chi2_gradient(table) returns chi2
+# together with its exact derivatives with respect to (H0, Om, Gamma, A1, A2),
+# stacked on a leading axis of length 5.
+# ==============================================================================
+
+import numpy as np
+
+from .data import (
+    COSMIC_CHRONOMETERS,
+    DESI_BAO,
+    DESI_BAO_IS_DV,
+    DESI_FSIGMA8,
+    FERMI_GRB,
+    GRB_ERROR_FLOOR,
+    H0LICOW,
+    PLANCK_THETA_STAR,
+    PLANCK_THETA_STAR_ERR,
+    SIGMA8,
+    Z_RECOMBINATION,
+)
+from .growth import growth_f_sigma8_jacobian, solve_growth
+from .model import (
+    C_LIGHT,
+    H_model,
+    H_model_jacobian,
+    comoving_distance,
+    comoving_distance_jacobian,
+    expand_params,
+    f_sigma8,
+    phi_z_jacobian,
+    rd_model,
+    rd_model_jacobian,
+)
+from .profiling import PROFILER
+
+PANTHEON_COV_URL = ('https://raw.githubusercontent.com/sylvainherbin/dfcm-ai-api/main/'
+                    'scripts/Pantheon+SH0ES_STAT+SYS.cov')
+
+
+class DistanceTable:
+    """
+    H(z), D_M(z) and rd for one parameter vector, or a batch of them, at a
+    fixed set of redshifts. Computed once and shared by every probe.
+
+    With ``jacobian=True`` the parameter derivatives of the three quantities
+    are computed in the same pass (leading axis of length 5). An ``emulator``
+    (DistanceEmulator) replaces the D_M integration when no derivatives are
+    requested.
+    """
+
+    def __init__(self, redshifts, params, jacobian=False, emulator=None):
+        self.redshifts = np.unique(np.asarray(redshifts, dtype=float))
+        self.params = tuple(np.broadcast_arrays(*[np.asarray(p, dtype=float) for p in params]))
+        self.jacobian = jacobian
+        if jacobian:
+            self.hubble, self.hubble_jac = H_model_jacobian(self.redshifts, *self.expanded(1))
+            self.comoving, self.comoving_jac = comoving_distance_jacobian(self.redshifts, *self.params)
+            self.rd, self.rd_jac = rd_model_jacobian(*self.params[2:])
+        else:
+            self.hubble = H_model(self.redshifts, *self.expanded(1))
+            integrate = comoving_distance if emulator is None else emulator.comoving_distance
+            self.comoving = integrate(self.redshifts, *self.params)
+            self.rd = rd_model(*self.params[2:])
+
+    @classmethod
+    def from_arrays(cls, redshifts, params, hubble, comoving, rd):
+        """A table of already computed H and D_M (at sorted, unique ``redshifts``) and rd."""
+        table = cls.__new__(cls)
+        table.redshifts = np.asarray(redshifts, dtype=float)
+        table.params = tuple(np.broadcast_arrays(*[np.asarray(p, dtype=float) for p in params]))
+        table.jacobian = False
+        table.hubble, table.comoving, table.rd = hubble, comoving, rd
+        return table
+
+    @property
+    def batch_shape(self):
+        return self.params[0].shape
+
+    def expanded(self, ndim=1):
+        """The parameters with ``ndim`` trailing axes, ready to broadcast against data."""
+        return expand_params(self.params, ndim)
+
+    def _index(self, z):
+        index = np.searchsorted(self.redshifts, z)
+        if np.any(index >= self.redshifts.size) or not np.array_equal(self.redshifts[index], z):
+            raise KeyError("Redshifts not tabulated in this DistanceTable")
+        return index
+
+    def H(self, z):
+        return self.hubble[..., self._index(z)]
+
+    def D_M(self, z):
+        return self.comoving[..., self._index(z)]
+
+    def D_L(self, z):
+        return (1.0 + z) * self.D_M(z)
+
+    def D_V(self, z):
+        return np.cbrt(C_LIGHT * z * self.D_M(z)**2 / self.H(z))
+
+    # --- Parameter derivatives (tables built with jacobian=True) ---
+    def dH(self, z):
+        return self.hubble_jac[..., self._index(z)]
+
+    def dD_M(self, z):
+        return self.comoving_jac[..., self._index(z)]
+
+    def dD_L(self, z):
+        return (1.0 + z) * self.dD_M(z)
+
+    def dD_V(self, z):
+        return self.D_V(z) * (2.0 * self.dD_M(z) / self.D_M(z) - self.dH(z) / self.H(z)) / 3.0
+
+
+class Probe:
+    """Base class of the observational probes."""
+
+    name = None
+    # Redshifts at which the probe reads the distance table
+    redshifts = np.empty(0)
+
+    @property
+    def ndata(self):
+        raise NotImplementedError
+
+    def chi2(self, table):
+        raise NotImplementedError
+
+    def chi2_gradient(self, table):
+        """chi2 and its parameter gradient (leading axis of length 5)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _gaussian(obs, pred, sigma, dpred):
+        """chi2 of independent Gaussian data and its gradient from the prediction Jacobian."""
+        weighted = (obs - pred) / sigma
+        return np.sum(weighted**2, axis=-1), -2.0 * np.sum(weighted / sigma * dpred, axis=-1)
+
+    def __call__(self, H0, Om, Gamma, A1, A2):
+        return self.chi2(DistanceTable(self.redshifts, (H0, Om, Gamma, A1, A2)))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(ndata={self.ndata})"
+
+
+class CosmicChronometers(Probe):
+    """H(z) Cosmic Chronometers."""
+
+    name = 'cc'
+
+    def __init__(self, data=COSMIC_CHRONOMETERS):
+        self.redshifts, self.Hz_obs, self.sigma_Hz = np.asarray(data, dtype=float).T
+
+    @property
+    def ndata(self):
+        return self.redshifts.size
+
+    def chi2(self, table):
+        Hz_pred = table.H(self.redshifts)
+        return np.sum(((self.Hz_obs - Hz_pred) / self.sigma_Hz)**2, axis=-1)
+
+    def chi2_gradient(self, table):
+        return self._gaussian(self.Hz_obs, table.H(self.redshifts), self.sigma_Hz,
+                              table.dH(self.redshifts))
+
+
+class BAO(Probe):
+    """DESI BAO ratios: DV/rd where ``is_dv``, c/Hrd (DH/rd) elsewhere."""
+
+    name = 'bao'
+
+    def __init__(self, data=DESI_BAO, is_dv=DESI_BAO_IS_DV):
+        self.redshifts, self.obs_ratios, self.sigma_ratios = np.asarray(data, dtype=float).T
+        self.is_dv = np.asarray(is_dv, dtype=bool)
+
+    @property
+    def ndata(self):
+        return self.redshifts.size
+
+    def chi2(self, table):
+        model_dist = np.where(self.is_dv, table.D_V(self.redshifts),
+                              C_LIGHT / table.H(self.redshifts))
+        model_ratios = model_dist / np.asarray(table.rd)[..., None]
+        return np.sum(((self.obs_ratios - model_ratios) / self.sigma_ratios)**2, axis=-1)
+
+    def chi2_gradient(self, table):
+        z = self.redshifts
+        H = table.H(z)
+        model_dist = np.where(self.is_dv, table.D_V(z), C_LIGHT / H)
+        d_model_dist = np.where(self.is_dv, table.dD_V(z), -C_LIGHT / H**2 * table.dH(z))
+        rd = np.asarray(table.rd)[..., None]
+        model_ratios = model_dist / rd
+        d_model_ratios = d_model_dist / rd - model_ratios / rd * table.rd_jac[..., None]
+        return self._gaussian(self.obs_ratios, model_ratios, self.sigma_ratios, d_model_ratios)
+
+
+class GrowthRate(Probe):
+    """
+    DESI Y1 growth rate fsigma8, from the closed form (no distances needed)
+    or, with ode=True, from the growth equation in the DFCM background.
+    """
+
+    name = 'fs8'
+
+    def __init__(self, data=DESI_FSIGMA8, sigma8=SIGMA8, ode=False):
+        self.z, self.fs8_obs, self.sigma_fs8 = np.asarray(data, dtype=float).T
+        self.sigma8 = sigma8
+        self.ode = ode
+        if ode:
+            self.name = 'fs8_ode'
+
+    @property
+    def ndata(self):
+        return self.z.size
+
+    def chi2(self, table):
+        if self.ode:
+            fs8_pred = solve_growth(*table.params[1:]).f_sigma8(self.z, self.sigma8)
+        else:
+            _, _, Gamma, A1, A2 = table.expanded(1)
+            fs8_pred = f_sigma8(self.z, Gamma, A1, A2, sigma8=self.sigma8)
+        return np.sum(((self.fs8_obs - fs8_pred) / self.sigma_fs8)**2, axis=-1)
+
+    def chi2_gradient(self, table):
+        if self.ode:
+            # Sensitivities integrated with the growth solution (the closed form is differentiated directly)
+            fs8_pred, d_fs8 = growth_f_sigma8_jacobian(self.z, *table.params[1:], sigma8=self.sigma8)
+            d_fs8 = np.concatenate([np.zeros((1,) + fs8_pred.shape), d_fs8])
+            return self._gaussian(self.fs8_obs, fs8_pred, self.sigma_fs8, d_fs8)
+        _, _, Gamma, A1, A2 = table.expanded(1)
+        phi, dphi = phi_z_jacobian(self.z, Gamma, A1, A2)
+        fs8_pred = f_sigma8(self.z, Gamma, A1, A2, sigma8=self.sigma8)
+        dfs8_dphi = fs8_pred * (0.5 / phi + 1.5 * np.log(1.0 + self.z))
+        d_fs8 = np.concatenate([np.zeros((2,) + fs8_pred.shape), dfs8_dphi * dphi])
+        return self._gaussian(self.fs8_obs, fs8_pred, self.sigma_fs8, d_fs8)
+
+
+class GammaRayBursts(Probe):
+    """Fermi-LAT GRB luminosity distances with a fractional error floor."""
+
+    name = 'grb'
+
+    def __init__(self, data=FERMI_GRB, error_floor=GRB_ERROR_FLOOR):
+        self.redshifts, self.dl_obs, dl_err = np.asarray(data, dtype=float).T
+        self.dl_err = np.maximum(dl_err, error_floor * self.dl_obs)
+
+    @property
+    def ndata(self):
+        return self.redshifts.size
+
+    def chi2(self, table):
+        dl_pred = table.D_L(self.redshifts)
+        return np.sum(((self.dl_obs - dl_pred) / self.dl_err)**2, axis=-1)
+
+    def chi2_gradient(self, table):
+        return self._gaussian(self.dl_obs, table.D_L(self.redshifts), self.dl_err,
+                              table.dD_L(self.redshifts))
+
+
+class H0LiCOW(Probe):
+    """H0LiCOW lensing H0 measurements."""
+
+    name = 'h0licow'
+
+    def __init__(self, data=H0LICOW):
+        self.z_lens, self.h0_measured, self.h0_errors = np.asarray(data, dtype=float).T
+
+    @property
+    def ndata(self):
+        return self.z_lens.size
+
+    def chi2(self, table):
+        H0 = table.expanded(1)[0]
+        return np.sum(((self.h0_measured - H0) / self.h0_errors)**2, axis=-1)
+
+    def chi2_gradient(self, table):
+        H0 = table.expanded(1)[0]
+        dH0 = np.zeros((5,) + np.shape(H0))
+        dH0[0] = 1.0
+        return self._gaussian(self.h0_measured, H0, self.h0_errors, dH0)
+
+
+class CMBThetaStar(Probe):
+    """Planck angular scale of the sound horizon, theta* = rd / D_M(z_rec)."""
+
+    name = 'cmb'
+
+    def __init__(self, theta_star=PLANCK_THETA_STAR, theta_star_err=PLANCK_THETA_STAR_ERR,
+                 z_recombination=Z_RECOMBINATION):
+        self.redshifts = np.array([z_recombination])
+        self.theta_star = theta_star
+        self.theta_star_err = theta_star_err
+
+    @property
+    def ndata(self):
+        return 1
+
+    def theta(self, table):
+        return table.rd / table.D_M(self.redshifts)[..., 0]
+
+    def chi2(self, table):
+        return ((self.theta(table) - self.theta_star) / self.theta_star_err)**2
+
+    def chi2_gradient(self, table):
+        theta = self.theta(table)
+        d_theta = theta * (table.rd_jac / table.rd
+                           - table.dD_M(self.redshifts)[..., 0] / table.D_M(self.redshifts)[..., 0])
+        weighted = (theta - self.theta_star) / self.theta_star_err
+        return weighted**2, 2.0 * weighted / self.theta_star_err * d_theta
+
+
+class SNIa(Probe):
+    """
+    Pantheon+ distance moduli with the full STAT+SYS covariance (dense, or
+    any object with the chi2/solve methods of CholeskyCovariance).
+    """
+
+    name = 'snia'
+
+    def __init__(self, redshifts, mu_obs, cov_factor):
+        self.redshifts = np.asarray(redshifts, dtype=float)
+        self.mu_obs = np.asarray(mu_obs, dtype=float)
+        self.cov_factor = cov_factor
+
+    @classmethod
+    def load(cls, store=None, rank=None):
+        """
+        Loads the non-calibrator Pantheon+ supernovae from the dataset store,
+        with the Cholesky factor of their covariance (cached on disk), or with
+        its diagonal + rank-``rank`` decomposition when ``rank`` > 0 (default:
+        SNIA_COV_RANK, set by DFCM_SNIA_RANK).
+        """
+        from .config import DATA_DIR, SNIA_COV_RANK
+        from .covariance import CholeskyCovariance, LowRankCovariance, covariance_cache_key
+        from .datasets import DatasetStore
+
+        with PROFILER.stage('load:snia'):
+            store = store if store is not None else DatasetStore()
+            snia_data = store.table('pantheon_plus', DATA_DIR / 'Pantheon+SH0ES.dat',
+                                    columns=('zHD', 'MU_SH0ES', 'IS_CALIBRATOR'))
+            non_calibrator_indices = np.flatnonzero(snia_data['IS_CALIBRATOR'] != 1)
+            cov_matrix = store.matrix('pantheon_plus_cov', DATA_DIR / 'Pantheon+SH0ES_STAT+SYS.cov',
+                                      url=PANTHEON_COV_URL, index=non_calibrator_indices)
+            cov_key = covariance_cache_key(store.checksum('pantheon_plus').encode(),
+                                           store.checksum('pantheon_plus_cov').encode(),
+                                           mask=non_calibrator_indices)
+            rank = SNIA_COV_RANK if rank is None else rank
+            if rank > 0:
+                cov_factor = LowRankCovariance.cached(cov_key, lambda: cov_matrix, rank)
+            else:
+                cov_factor = CholeskyCovariance.cached(cov_key, lambda: cov_matrix)
+        return cls(snia_data['zHD'][non_calibrator_indices],
+                   snia_data['MU_SH0ES'][non_calibrator_indices], cov_factor)
+
+    @property
+    def ndata(self):
+        return self.redshifts.size
+
+    def chi2(self, table):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dl_mpc = table.D_L(self.redshifts)
+            mu_pred = np.where(dl_mpc > 0, 5 * np.log10(dl_mpc) + 25, np.inf)
+        diff = self.mu_obs - mu_pred
+        chi2 = self.cov_factor.chi2(diff.reshape(-1, self.ndata).T)
+        return chi2.reshape(table.batch_shape)
+
+    def chi2_gradient(self, table):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            D_M = table.D_M(self.redshifts)
+            dl_mpc = (1.0 + self.redshifts) * D_M
+            mu_pred = np.where(dl_mpc > 0, 5 * np.log10(dl_mpc) + 25, np.inf)
+            d_mu = (5.0 / np.log(10.0)) * table.dD_M(self.redshifts) / D_M
+        diff = self.mu_obs - mu_pred
+        flat = diff.reshape(-1, self.ndata).T
+        chi2 = self.cov_factor.chi2(flat).reshape(table.batch_shape)
+        weighted = self.cov_factor.solve(flat).T.reshape(diff.shape)
+        return chi2, -2.0 * np.sum(weighted * d_mu, axis=-1)
+
+
+# Probe name -> probe, for the probes whose data ship with the package
+PROBES = {probe.name: probe for probe in (
+    CosmicChronometers(),
+    BAO(),
+    GrowthRate(),
+    GammaRayBursts(),
+    H0LiCOW(),
+    CMBThetaStar(),
+)}
@@ -0,0 +1,115 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Hot-Path Instrumentation
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Opt-in counters and stage timers. When enabled (DFCM_PROFILE=1 or the
+# ``profiling()`` context), the integrators count their integrand calls and
+# evaluated points, H(z) counts its evaluations, and the likelihood records
+# the wall time of each stage (data load, model prediction, per-probe chi2,
+# covariance solve). Disabled, every hook is a single attribute check.
+# benchmarks/profile_likelihood.py prints the profile of a likelihood run.
+# ==============================================================================
+
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from .config import PROFILE
+
+
+class Profiler:
+    """
+    Counters and nested stage timers. Stages opened inside another stage are
+    recorded under the path ``outer/inner``.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = defaultdict(int)
+            self.stages = {}
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += int(n)
+
+    @contextmanager
+    def stage(self, name):
+        """Times the enclosed block and adds it to the stage ``name``."""
+        if not self.enabled:
+            yield
+            return
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(name)
+        path = '/'.join(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                entry = self.stages.setdefault(path, [0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def profile(self):
+        """The recorded counters and stage timings as a JSON-serializable dict."""
+        with self._lock:
+            counters = dict(self.counters)
+            stages = {path: {'calls': calls, 'seconds': seconds, 'mean_s': seconds / calls}
+                      for path, (calls, seconds) in sorted(self.stages.items())}
+        derived = {}
+        if counters.get('integrals'):
+            derived['integrand_points_per_integral'] = counters.get('integrand_points', 0) / counters['integrals']
+        if counters.get('distances'):
+            derived['integrand_points_per_distance'] = counters.get('integrand_points', 0) / counters['distances']
+        return {'counters': counters, 'stages': stages, 'derived': derived}
+
+    def summary(self):
+        """Human-readable report of the profile."""
+        profile = self.profile()
+        lines = ["--- DFCM profile ---", "Stages (calls, total, mean):"]
+        for path, stats in profile['stages'].items():
+            depth = path.count('/')
+            label = "  " * depth + path.rsplit('/', 1)[-1]
+            lines.append(f"  {label:<36}{stats['calls']:>7}{1e3 * stats['seconds']:>12.3f} ms"
+                         f"{1e3 * stats['mean_s']:>11.4f} ms")
+        lines.append("Counters:")
+        for name, value in sorted(profile['counters'].items()):
+            lines.append(f"  {name:<36}{value:>14,}")
+        for name, value in profile['derived'].items():
+            lines.append(f"  {name:<36}{value:>14,.1f}")
+        return "\n".join(lines)
+
+    def save(self, path):
+        with open(path, 'w') as handle:
+            json.dump(self.profile(), handle, indent=2)
+
+
+# Process-wide profiler used by the instrumented code paths
+PROFILER = Profiler(enabled=PROFILE)
+
+
+@contextmanager
+def profiling(reset=True):
+    """Enables the profiler for the enclosed block and yields it."""
+    previous = PROFILER.enabled
+    if reset:
+        PROFILER.reset()
+    PROFILER.enabled = True
+    try:
+        yield PROFILER
+    finally:
+        PROFILER.enabled = previous
+
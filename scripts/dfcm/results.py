@@ -0,0 +1,130 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - On-Disk Result Cache
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Content-addressed cache of validation results. An entry is keyed on the
+# SHA-256 of everything its value depends on: the suite, the parameter
+# vector, the checksums of the input datasets and the version of the model
+# code (a hash of the dfcm sources), so any change to data, parameters or
+# code simply misses. Entries are small JSON files, touched on every hit;
+# the least recently used are evicted once the cache exceeds its size limit.
+# Set DFCM_RESULT_CACHE_BYTES=0 (or pass --no-cache) to bypass it.
+# ==============================================================================
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from .config import CACHE_DIR, RESULT_CACHE_BYTES
+
+# Parameters are rounded to this many decimals in the keys
+KEY_DECIMALS = 12
+
+
+@lru_cache(maxsize=1)
+def code_version():
+    """SHA-256 of the dfcm package sources (every module can change a result)."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).resolve().parent.glob('*.py')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    JSON results stored under ``root`` as ``<key[:2]>/<key>.json``, with a
+    total size limit of ``max_bytes`` (0 disables the cache).
+    """
+
+    def __init__(self, root=None, max_bytes=RESULT_CACHE_BYTES):
+        self.root = Path(root) if root is not None else CACHE_DIR / "results"
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(*parts):
+        """SHA-256 of JSON-serializable parts (floats rounded to KEY_DECIMALS)."""
+        def normalize(value):
+            if isinstance(value, float):
+                return round(value, KEY_DECIMALS) + 0.0
+            if isinstance(value, (list, tuple)):
+                return [normalize(item) for item in value]
+            if isinstance(value, dict):
+                return {name: normalize(item) for name, item in value.items()}
+            return value
+        text = json.dumps(normalize(list(parts)), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.json"
+
+    def __contains__(self, key):
+        return self.enabled and self._path(key).exists()
+
+    def get(self, key):
+        """The stored value, or None."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            value = json.loads(path.read_text())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Stores ``value`` (JSON-serializable) and evicts entries over the size limit."""
+        if not self.enabled:
+            return value
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(value, separators=(',', ':')))
+        os.replace(tmp_path, path)
+        self._evict()
+        return value
+
+    def _entries(self):
+        """(mtime, size, path) of every stored entry."""
+        entries = []
+        for path in self.root.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def stats(self):
+        entries = self._entries()
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(entries), 'nbytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes}
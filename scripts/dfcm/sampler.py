@@ -0,0 +1,323 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Parallel Ensemble MCMC Sampler
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Affine-invariant ensemble sampler (Goodman & Weare 2010 stretch move) for
+# the posterior of (H0, Om, Gamma, A1, A2). Each half-ensemble update is
+# split into one block of walkers per worker process; a block is evaluated
+# in a single vectorized likelihood call. Chains are checkpointed to disk as
+# they grow: each checkpoint appends only its new steps to preallocated .npy
+# files. A run resumed from its checkpoint continues up to the requested
+# chain length.
+#
+# Usage: python -m dfcm.sampler --walkers 32 --steps 2000 --checkpoint chains/
+# ==============================================================================
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from .model import BEST_FIT, PARAM_NAMES, PRIOR_BOUNDS
+
+
+class LogPosterior:
+    """
+    log P = -chi2/2 of a likelihood inside a flat prior box, -inf outside.
+    Takes an (n, 5) array of parameter vectors and returns n values.
+    """
+
+    def __init__(self, likelihood, bounds=PRIOR_BOUNDS):
+        self.likelihood = likelihood
+        self.bounds = np.asarray(bounds, dtype=float)
+
+    def __call__(self, positions):
+        positions = np.atleast_2d(positions)
+        inside = np.all((positions > self.bounds[:, 0]) & (positions < self.bounds[:, 1]), axis=1)
+        log_prob = np.full(len(positions), -np.inf)
+        if np.any(inside):
+            total, _ = self.likelihood(tuple(positions[inside].T))
+            log_prob[inside] = -0.5 * total
+        return np.where(np.isfinite(log_prob), log_prob, -np.inf)
+
+
+# Log-probability function of the current worker process, set once per worker
+_worker_log_prob = None
+
+
+def _init_worker(log_prob):
+    global _worker_log_prob
+    _worker_log_prob = log_prob
+
+
+def _evaluate_block(positions):
+    return _worker_log_prob(positions)
+
+
+def integrated_autocorr_time(chain, c=5.0):
+    """
+    Integrated autocorrelation time of every parameter of a (steps, walkers,
+    ndim) chain, from the walker-averaged FFT autocorrelation function with
+    Sokal's adaptive window (window M is the smallest M >= c * tau(M)).
+    """
+    steps, _, ndim = chain.shape
+    n_fft = 1 << int(np.ceil(np.log2(2 * steps)))
+    tau = np.empty(ndim)
+    for k in range(ndim):
+        x = chain[:, :, k] - chain[:, :, k].mean(axis=0)
+        acf = np.fft.irfft(np.abs(np.fft.rfft(x, n=n_fft, axis=0))**2, axis=0)[:steps]
+        acf = acf.mean(axis=1)
+        if acf[0] <= 0:
+            tau[k] = np.nan
+            continue
+        taus = 2.0 * np.cumsum(acf / acf[0]) - 1.0
+        window = np.arange(steps) < c * taus
+        m = np.argmin(window) if not np.all(window) else steps - 1
+        tau[k] = taus[m]
+    return tau
+
+
+class EnsembleSampler:
+    """
+    Affine-invariant ensemble sampler.
+
+    ``log_prob`` maps an (n, ndim) array to n log-probabilities. With
+    ``processes > 1`` it is shipped once to each worker of a process pool;
+    every half-ensemble update then submits one block of walkers per worker.
+    """
+
+    def __init__(self, log_prob, nwalkers, ndim=len(PARAM_NAMES), processes=None,
+                 a=2.0, seed=None, checkpoint=None, checkpoint_every=10):
+        if nwalkers < 2 * ndim or nwalkers % 2:
+            raise ValueError("nwalkers must be even and at least twice the dimension")
+        self.log_prob = log_prob
+        self.nwalkers = nwalkers
+        self.ndim = ndim
+        self.processes = processes if processes is not None else os.cpu_count() or 1
+        self.a = a
+        self.rng = np.random.default_rng(seed)
+        self.checkpoint = Path(checkpoint) if checkpoint is not None else None
+        self.checkpoint_every = checkpoint_every
+        self.chain = np.empty((0, nwalkers, ndim))
+        self.log_probs = np.empty((0, nwalkers))
+        self.n_evaluations = 0
+        self.eval_time = 0.0
+        self.accepted = np.zeros(nwalkers)
+        self._pool = None
+
+    # --- Likelihood evaluation ---
+    def _evaluate(self, positions):
+        start = time.perf_counter()
+        if self._pool is None:
+            values = self.log_prob(positions)
+        else:
+            blocks = np.array_split(positions, min(self.processes, len(positions)))
+            values = np.concatenate(list(self._pool.map(_evaluate_block, blocks)))
+        self.eval_time += time.perf_counter() - start
+        self.n_evaluations += len(positions)
+        return values
+
+    def _stretch_move(self, positions, log_probs):
+        half = self.nwalkers // 2
+        for first, second in ((slice(0, half), slice(half, None)),
+                              (slice(half, None), slice(0, half))):
+            active, complement = positions[first], positions[second]
+            z = ((self.a - 1.0) * self.rng.random(half) + 1.0)**2 / self.a
+            partners = complement[self.rng.integers(half, size=half)]
+            proposals = partners + z[:, None] * (active - partners)
+            new_log_probs = self._evaluate(proposals)
+            log_ratio = (self.ndim - 1) * np.log(z) + new_log_probs - log_probs[first]
+            accept = np.log(self.rng.random(half)) < log_ratio
+            positions[first][accept] = proposals[accept]
+            log_probs[first][accept] = new_log_probs[accept]
+            self.accepted[first] += accept
+        return positions, log_probs
+
+    # --- Checkpointing ---
+    def _open_checkpoint(self, capacity):
+        """
+        The chain and log-probability files of the checkpoint, preallocated
+        for ``capacity`` steps; a smaller existing file is regrown once.
+        """
+        self.checkpoint.mkdir(parents=True, exist_ok=True)
+        files = []
+        for name, valid in (('chain', self.chain), ('log_prob', self.log_probs)):
+            path = self.checkpoint / f"{name}.npy"
+            shape = (capacity,) + valid.shape[1:]
+            stored = open_memmap(path, mode='r+') if path.exists() else None
+            if stored is None or stored.shape[0] < capacity or stored.shape[1:] != shape[1:]:
+                tmp_path = self.checkpoint / f"{name}.{os.getpid()}.tmp.npy"
+                grown = open_memmap(tmp_path, mode='w+', dtype=float, shape=shape)
+                grown[:len(valid)] = valid
+                grown.flush()
+                del stored
+                os.replace(tmp_path, path)
+                stored = grown
+            files.append(stored)
+        return files
+
+    def _save_checkpoint(self, files, start):
+        """Writes the steps from ``start`` on into the checkpoint files, then the state."""
+        stop = len(self.chain)
+        for stored, array in zip(files, (self.chain, self.log_probs)):
+            stored[start:stop] = array[start:stop]
+            stored.flush()
+        state = {'steps': stop, 'nwalkers': self.nwalkers, 'ndim': self.ndim,
+                 'accepted': self.accepted.tolist(), 'n_evaluations': self.n_evaluations,
+                 'eval_time': self.eval_time,
+                 'rng_state': self.rng.bit_generator.state}
+        # The state names how many stored steps are valid, so it is replaced last
+        tmp_path = self.checkpoint / f"state.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, self.checkpoint / 'state.json')
+
+    def _load_checkpoint(self):
+        state_path = self.checkpoint / 'state.json'
+        if not state_path.exists():
+            return False
+        state = json.loads(state_path.read_text())
+        if (state['nwalkers'], state['ndim']) != (self.nwalkers, self.ndim):
+            raise ValueError(f"Checkpoint {self.checkpoint} has a different ensemble shape")
+        self.chain = np.array(np.load(self.checkpoint / 'chain.npy', mmap_mode='r')[:state['steps']])
+        self.log_probs = np.array(np.load(self.checkpoint / 'log_prob.npy', mmap_mode='r')[:state['steps']])
+        self.accepted = np.asarray(state['accepted'])
+        self.n_evaluations = state['n_evaluations']
+        self.eval_time = state['eval_time']
+        self.rng.bit_generator.state = state['rng_state']
+        return len(self.chain) > 0
+
+    # --- Public API ---
+    def run(self, initial, nsteps, progress=None):
+        """
+        Advances the ensemble from ``initial`` (nwalkers, ndim), or from the
+        last checkpointed step if one exists, until the chain holds
+        ``nsteps`` steps; a chain already that long is returned as is.
+        ``progress`` is called as progress(step, sampler) after every step.
+        """
+        if self.checkpoint is not None:
+            self._load_checkpoint()
+        done = len(self.chain)
+        if done >= nsteps:
+            return self.chain
+
+        chain = np.empty((nsteps, self.nwalkers, self.ndim))
+        chain_log_probs = np.empty((nsteps, self.nwalkers))
+        chain[:done], chain_log_probs[:done] = self.chain, self.log_probs
+        if done:
+            positions, log_probs = chain[done - 1].copy(), chain_log_probs[done - 1].copy()
+        else:
+            positions, log_probs = np.array(initial, dtype=float), None
+        files = self._open_checkpoint(nsteps) if self.checkpoint is not None else None
+        saved = done
+        pool = None
+        if self.processes > 1:
+            pool = ProcessPoolExecutor(self.processes, initializer=_init_worker,
+                                       initargs=(self.log_prob,))
+        self._pool = pool
+        try:
+            if log_probs is None:
+                log_probs = self._evaluate(positions)
+                if not np.all(np.isfinite(log_probs)):
+                    raise ValueError("Initial walker positions must have finite log-probability")
+            for step in range(done, nsteps):
+                positions, log_probs = self._stretch_move(positions, log_probs)
+                chain[step] = positions
+                chain_log_probs[step] = log_probs
+                self.chain, self.log_probs = chain[:step + 1], chain_log_probs[:step + 1]
+                if files is not None and ((step + 1) % self.checkpoint_every == 0 or step + 1 == nsteps):
+                    # Only the steps since the last checkpoint are written
+                    self._save_checkpoint(files, saved)
+                    saved = step + 1
+                if progress is not None:
+                    progress(step + 1, self)
+        finally:
+            self._pool = None
+            if pool is not None:
+                pool.shutdown()
+        return self.chain
+
+    @property
+    def acceptance_fraction(self):
+        return self.accepted / max(len(self.chain), 1)
+
+    @property
+    def throughput(self):
+        """Likelihood evaluations per second of wall time spent evaluating."""
+        return self.n_evaluations / self.eval_time if self.eval_time > 0 else 0.0
+
+    def autocorr_time(self, discard=0):
+        return integrated_autocorr_time(self.chain[discard:])
+
+    def flat_samples(self, discard=0, thin=1):
+        return self.chain[discard::thin].reshape(-1, self.ndim)
+
+    def summary(self, discard=0, thin=1):
+        """Median and 68% interval of every parameter, plus run diagnostics."""
+        samples = self.flat_samples(discard, thin)
+        low, median, high = np.percentile(samples, [16, 50, 84], axis=0)
+        return {
+            'parameters': {name: {'median': m, 'minus': m - lo, 'plus': hi - m}
+                           for name, lo, m, hi in zip(PARAM_NAMES, low, median, high)},
+            'autocorr_time': dict(zip(PARAM_NAMES, self.autocorr_time(discard))),
+            'acceptance_fraction': float(np.mean(self.acceptance_fraction)),
+            'evaluations': self.n_evaluations,
+            'evaluations_per_sec': self.throughput,
+        }
+
+
+def initial_ball(center=BEST_FIT, nwalkers=32, scale=1e-3, seed=None):
+    """Walker starting positions in a small Gaussian ball around ``center``."""
+    rng = np.random.default_rng(seed)
+    center = np.asarray(center, dtype=float)
+    return center + scale * np.maximum(np.abs(center), 1e-2) * rng.standard_normal((nwalkers, center.size))
+
+
+def main(argv=None):
+    import argparse
+
+    from .likelihood import JointLikelihood
+
+    parser = argparse.ArgumentParser(description="Ensemble MCMC over the DFCM parameters.")
+    parser.add_argument('--walkers', type=int, default=32)
+    parser.add_argument('--steps', type=int, default=2000,
+                        help="total chain length (a resumed run continues up to it)")
+    parser.add_argument('--burn', type=int, default=None, help="steps to discard (default: chain length / 4)")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--checkpoint', default=None, help="directory for incremental chain checkpoints")
+    parser.add_argument('--no-snia', action='store_true', help="leave out the Pantheon+ SNIa probe")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--emulator', action='store_true',
+                        help="use the cached Chebyshev D_M emulator instead of integrating")
+    args = parser.parse_args(argv)
+
+    emulator = None
+    if args.emulator:
+        from .emulator import DistanceEmulator
+
+        emulator = DistanceEmulator.cached()
+        print(f"-> D_M emulator: max relative error {emulator.max_error:.2e} vs exact integrator")
+    likelihood = JointLikelihood.default(include_snia=not args.no_snia, emulator=emulator)
+    sampler = EnsembleSampler(LogPosterior(likelihood), args.walkers, processes=args.processes,
+                              seed=args.seed, checkpoint=args.checkpoint)
+    sampler.run(initial_ball(nwalkers=args.walkers, seed=args.seed), args.steps)
+
+    steps = len(sampler.chain)
+    burn = args.burn if args.burn is not None else steps // 4
+    summary = sampler.summary(discard=burn)
+    print(f"--- Ensemble MCMC: {args.walkers} walkers x {steps} steps, probes {likelihood.names} ---")
+    for name, stats in summary['parameters'].items():
+        tau = summary['autocorr_time'][name]
+        print(f"-> {name:>5} = {stats['median']:.4f} +{stats['plus']:.4f} -{stats['minus']:.4f}   (tau = {tau:.1f} steps)")
+    print(f"-> Acceptance fraction: {summary['acceptance_fraction']:.3f}")
+    print(f"-> Throughput: {summary['evaluations_per_sec']:.0f} likelihood evaluations/sec "
+          f"({summary['evaluations']} evaluations, {sampler.processes} processes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Vectorized Parameter-Grid Scan
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Evaluates the probe chi-squared over the full Cartesian grid of
+# (H0, Om, Gamma, A1, A2) values. Grid points are processed in blocks of
+# parameter vectors, each block broadcast against the redshift axis of every
+# probe, so memory stays bounded whatever the size of the grid. Within a block
+# all probes share one distance table (see dfcm.likelihood).
+# ==============================================================================
+
+import numpy as np
+
+from .likelihood import JointLikelihood
+from .model import PARAM_NAMES
+from .probes import PROBES
+
+DEFAULT_PROBES = ('cc', 'bao', 'fs8', 'grb')
+# Parameter vectors per block. The distance probes hold about
+# CHUNK_SIZE x 400 integrand nodes per temporary (~3 MB at the default).
+CHUNK_SIZE = 1024
+
+
+def grid_scan(H0, Om, Gamma, A1, A2, probes=DEFAULT_PROBES, chunk_size=CHUNK_SIZE):
+    """
+    Calculates chi2 on the Cartesian grid H0 x Om x Gamma x A1 x A2.
+
+    Each argument is a scalar or a 1-D array of values. Returns a dict
+    mapping every probe name, plus 'total', to a chi2 cube of shape
+    (len(H0), len(Om), len(Gamma), len(A1), len(A2)).
+    """
+    axes = [np.atleast_1d(np.asarray(values, dtype=float)) for values in (H0, Om, Gamma, A1, A2)]
+    shape = tuple(axis.size for axis in axes)
+    size = int(np.prod(shape))
+    unknown = [name for name in probes if name not in PROBES]
+    if unknown:
+        raise KeyError(f"Unknown probes {unknown}; available: {sorted(PROBES)}")
+
+    likelihood = JointLikelihood(PROBES[name] for name in probes)
+    cubes = {name: np.empty(shape) for name in probes}
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        index = np.unravel_index(np.arange(start, stop), shape)
+        _, per_probe = likelihood([axis[i] for axis, i in zip(axes, index)])
+        for name in probes:
+            cubes[name].reshape(-1)[start:stop] = per_probe[name]
+
+    cubes['total'] = sum(cubes[name] for name in probes)
+    return cubes
+
+
+def grid_minimum(cube, H0, Om, Gamma, A1, A2):
+    """Returns (chi2_min, {parameter: value}) at the smallest entry of a chi2 cube."""
+    axes = [np.atleast_1d(np.asarray(values, dtype=float)) for values in (H0, Om, Gamma, A1, A2)]
+    index = np.unravel_index(np.argmin(cube), cube.shape)
+    best = {name: axis[i] for name, axis, i in zip(PARAM_NAMES, axes, index)}
+    return cube[index], best
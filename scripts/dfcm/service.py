@@ -0,0 +1,318 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Local Prediction Service
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# A small asyncio HTTP/1.1 JSON service over the model core, using only the
+# standard library:
+#
+#   POST /predict  {"z": [...], "params": [[H0, Om, Gamma, A1, A2], ...],
+#                   "quantities": ["phi", "H", "D_L", "mu", "fs8", "fs8_ode"]}
+#   POST /chi2     {"params": [...], "probes": ["cc", "bao", ...]}
+#   GET  /health, GET /stats
+#
+# Each request may carry a batch of parameter vectors (and of redshifts),
+# evaluated in one vectorized call. Identical requests in flight are
+# coalesced onto one evaluation, responses are kept in an LRU cache with a
+# memory ceiling. Integrations, and any request above INLINE_POINTS
+# (parameter vector, redshift) pairs, are computed and encoded in a worker
+# pool, so the event loop keeps serving while they run. Run with
+# ``python -m dfcm serve``; SIGTERM or Ctrl-C stop it and wait for the worker
+# processes to exit.
+# ==============================================================================
+
+import asyncio
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from .memo import EvaluationCache
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+# Memory ceiling of the response cache
+CACHE_BYTES = 32 << 20
+MAX_BODY_BYTES = 4 << 20
+# Largest number of (parameter vector, redshift) pairs of one /predict request
+MAX_POINTS = 1_000_000
+# Largest number of parameter vectors of a request for fs8_ode (each holds the whole growth history)
+MAX_GROWTH_VECTORS = 10_000
+QUANTITIES = ('phi', 'H', 'D_L', 'mu', 'fs8', 'fs8_ode')
+# Quantities returned when a request does not list any (fs8_ode integrates the growth equation)
+DEFAULT_QUANTITIES = ('phi', 'H', 'D_L', 'mu', 'fs8')
+# Quantities computed without integration; small requests for them run directly in the event loop
+LIGHT_QUANTITIES = ('phi', 'H', 'fs8')
+# Largest number of (parameter vector, redshift) pairs evaluated in the event loop
+INLINE_POINTS = 4096
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(ValueError):
+    """An invalid request, reported to the client with ``status``."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _jsonable(array):
+    """Nested lists of an array, with non-finite values as null."""
+    array = np.asarray(array, dtype=float)
+    if np.all(np.isfinite(array)):
+        return array.tolist()
+    return np.where(np.isfinite(array), array, None).tolist()
+
+
+def _parse_params(payload):
+    params = np.asarray(payload.get('params', ()), dtype=float)
+    if params.ndim == 1:
+        params = params[None, :]
+    if params.ndim != 2 or params.shape[1] != 5 or params.shape[0] == 0:
+        raise RequestError("'params' must be a parameter vector or a list of them (5 values each)")
+    return params
+
+
+def _encoded(function, *args):
+    """The JSON response body of function(*args), built where the function runs."""
+    return json.dumps(function(*args)).encode()
+
+
+def predict(z, params, quantities):
+    """The requested quantities at redshifts ``z`` (n_z,) for ``params`` (n, 5), each (n, n_z)."""
+    from .growth import growth_f_sigma8
+    from .model import distance_modulus, expand_params, f_sigma8, H_model, luminosity_distance, phi_z
+
+    batch = tuple(params.T)
+    expanded = expand_params(batch, 1)
+    functions = {
+        'phi': lambda: phi_z(z, *expanded[2:]),
+        'H': lambda: H_model(z, *expanded),
+        'D_L': lambda: luminosity_distance(z, *batch),
+        'mu': lambda: distance_modulus(z, *batch),
+        'fs8': lambda: f_sigma8(z, *expanded[2:]),
+        'fs8_ode': lambda: growth_f_sigma8(z, *batch[1:]),
+    }
+    return {name: _jsonable(np.broadcast_to(functions[name](), (len(params), z.size)))
+            for name in quantities}
+
+
+# Probes of the worker process, built on first use
+_CONTEXT = None
+
+
+def chi2(params, names):
+    """chi2 of each named probe (and their sum) for ``params`` (n, 5)."""
+    global _CONTEXT
+    from .likelihood import JointLikelihood
+    from .suites import SuiteContext
+
+    if _CONTEXT is None:
+        _CONTEXT = SuiteContext()
+    likelihood = JointLikelihood([_CONTEXT.probe(name) for name in names])
+    total, per_probe = likelihood(tuple(params.T))
+    return {'total': _jsonable(total), 'chi2': {name: _jsonable(value) for name, value in per_probe.items()}}
+
+
+class PredictionService:
+    """
+    The request handling of the service: validation, response cache,
+    coalescing of identical in-flight requests and the worker pool (a
+    process pool when ``processes`` > 1, otherwise one background thread).
+    """
+
+    def __init__(self, processes=None, cache_bytes=CACHE_BYTES):
+        self.processes = processes if processes is not None else os.cpu_count() or 1
+        if self.processes > 1:
+            self.executor = ProcessPoolExecutor(self.processes)
+        else:
+            self.executor = ThreadPoolExecutor(1)
+        self.cache = EvaluationCache(max_bytes=cache_bytes)
+        self._in_flight = {}
+        self.counters = {'requests': 0, 'errors': 0, 'coalesced': 0, 'evaluations': 0}
+        self.started = time.time()
+
+    def start(self):
+        """Starts the worker pool now (before the server socket exists, so workers do not inherit it)."""
+        self.executor.submit(int).result()
+
+    def close(self):
+        """Cancels the queued evaluations and waits for the workers to exit."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        return {'uptime_s': time.time() - self.started, 'processes': self.processes,
+                **self.counters, 'cache': self.cache.stats()}
+
+    def _parse(self, path, payload):
+        """Validates a request into (cache kind, numerical args, function, args, offload)."""
+        from .growth import Z_INIT
+        from .suites import DERIVED_SUITES, SUITES
+
+        params = _parse_params(payload)
+        if path == '/predict':
+            z = np.asarray(payload.get('z', ()), dtype=float).ravel()
+            quantities = tuple(payload.get('quantities', DEFAULT_QUANTITIES))
+            unknown = [name for name in quantities if name not in QUANTITIES]
+            if unknown or not quantities:
+                raise RequestError(f"unknown quantities {unknown}; available: {list(QUANTITIES)}")
+            if z.size == 0 or np.any(z < 0) or not np.all(np.isfinite(z)):
+                raise RequestError("'z' must be a non-empty list of finite redshifts >= 0")
+            if 'fs8_ode' in quantities and np.any(z > Z_INIT):
+                raise RequestError(f"fs8_ode is solved for z <= {Z_INIT}")
+            if 'fs8_ode' in quantities and len(params) > MAX_GROWTH_VECTORS:
+                raise RequestError(f"at most {MAX_GROWTH_VECTORS} parameter vectors per fs8_ode request", 413)
+            if z.size * len(params) > MAX_POINTS:
+                raise RequestError(f"at most {MAX_POINTS} (parameter vector, redshift) pairs per request", 413)
+            # Everything but small requests for light quantities leaves the event loop
+            offload = (z.size * len(params) > INLINE_POINTS
+                       or any(name not in LIGHT_QUANTITIES for name in quantities))
+            return f"predict:{','.join(quantities)}", (z, params), predict, (z, params, quantities), offload
+        probes = [name for name in SUITES if name not in DERIVED_SUITES]
+        names = tuple(payload.get('probes', [name for name in probes if name not in ('snia', 'cmb_tt')]))
+        unknown = [name for name in names if name not in probes]
+        if unknown or not names:
+            raise RequestError(f"unknown probes {unknown}; available: {probes}")
+        return f"chi2:{','.join(names)}", (params,), chi2, (params, names), True
+
+    async def respond(self, method, path, body):
+        """Returns (status, response body bytes) for one request."""
+        self.counters['requests'] += 1
+        try:
+            if path == '/health':
+                return 200, b'{"status": "ok"}'
+            if path == '/stats':
+                return 200, json.dumps(self.stats()).encode()
+            if path not in ('/predict', '/chi2'):
+                raise RequestError(f"unknown endpoint {path}", 404)
+            if method != 'POST':
+                raise RequestError(f"{path} expects POST", 405)
+            try:
+                payload = json.loads(body or b'{}')
+            except json.JSONDecodeError as error:
+                raise RequestError(f"invalid JSON: {error}")
+            if not isinstance(payload, dict):
+                raise RequestError("the request body must be a JSON object")
+            try:
+                kind, args, function, call_args, offload = self._parse(path, payload)
+            except RequestError:
+                raise
+            except (TypeError, ValueError) as error:
+                raise RequestError(str(error))
+            return 200, await self._evaluate(kind, args, function, call_args, offload)
+        except RequestError as error:
+            self.counters['errors'] += 1
+            return error.status, json.dumps({'error': str(error)}).encode()
+        except Exception as error:
+            self.counters['errors'] += 1
+            return 500, json.dumps({'error': f"{type(error).__name__}: {error}"}).encode()
+
+    async def _evaluate(self, kind, args, function, call_args, offload):
+        cached = self.cache.get(kind, args)
+        if cached is not None:
+            return cached
+        key = self.cache.key(kind, args)
+        if key in self._in_flight:
+            self.counters['coalesced'] += 1
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            self.counters['evaluations'] += 1
+            if offload:
+                body = await asyncio.get_running_loop().run_in_executor(self.executor, _encoded, function,
+                                                                        *call_args)
+            else:
+                body = _encoded(function, *call_args)
+            response = self.cache.put(kind, args, body)
+            future.set_result(response)
+            return response
+        except BaseException as error:
+            future.set_exception(error)
+            # Retrieved here so that an unawaited failure is not reported as never retrieved
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def handle_connection(self, reader, writer):
+        """Serves the HTTP/1.1 requests of one (keep-alive) connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode('latin-1').split(maxsplit=2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    status, body = 413, json.dumps({'error': "request body too large"}).encode()
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, body = await self.respond(method, path.split('?', 1)[0], body)
+                    keep_alive = (headers.get('connection', '').lower() != 'close'
+                                  and version.strip().upper() != 'HTTP/1.0')
+                writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, processes=None, cache_bytes=CACHE_BYTES):
+    """Runs the service until cancelled or sent SIGTERM, then shuts the worker pool down."""
+    service = PredictionService(processes, cache_bytes)
+    try:
+        service.start()
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        print(f"-> DFCM prediction service on http://{host}:{port} ({service.processes} worker(s))", flush=True)
+        async with server:
+            forever = asyncio.ensure_future(server.serve_forever())
+            loop = asyncio.get_running_loop()
+            loop.add_signal_handler(signal.SIGTERM, forever.cancel)
+            try:
+                await forever
+            except asyncio.CancelledError:
+                # SIGTERM only cancels serve_forever; a cancellation of this task propagates
+                if asyncio.current_task().cancelling():
+                    raise
+            finally:
+                loop.remove_signal_handler(signal.SIGTERM)
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve phi(z), H(z), D_L, mu, fsigma8 and probe chi2 over HTTP.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--processes', type=int, default=None,
+                        help="worker processes for the integrations (default: CPU count)")
+    parser.add_argument('--cache-mb', type=float, default=CACHE_BYTES / 2**20,
+                        help="memory ceiling of the response cache in MiB (0 disables it)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.processes, int(args.cache_mb * 2**20)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
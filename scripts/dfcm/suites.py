@@ -0,0 +1,330 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Validation Suites
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# The computations of the validation scripts as importable functions. A
+# SuiteContext loads each dataset at most once (the Pantheon+ store and
+# covariance factor included), and ``run_suites`` evaluates all selected
+# probes on one shared distance table, so several validations run in one
+# process without redundant loading or integration. ``run_concurrently``
+# instead runs every suite in its own worker of a process pool, so a full
+# validation takes about as long as its slowest suite. NumPy and the probe
+# modules are only imported when a suite actually runs. With a ResultCache,
+# suites whose parameters, data and code are unchanged are read back from
+# disk instead of being recomputed.
+# ==============================================================================
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Suite name -> description; the probe suites share the names of their Probe classes
+SUITES = {
+    'cc': "Cosmic chronometers H(z)",
+    'bao': "DESI BAO distance ratios",
+    'fs8': "DESI growth rate fsigma8",
+    'grb': "Fermi-LAT GRB luminosity distances",
+    'h0licow': "H0LiCOW lensing H0",
+    'cmb': "Planck CMB acoustic angle theta*",
+    'cmb_tt': "Planck TT bandpowers (theta*-shifted template)",
+    'snia': "Pantheon+ SNIa distance moduli",
+    'clusters': "Massive cluster deficit at z = 0.6",
+    'deuterium': "Primordial deuterium (Omega_b h^2)",
+    '2pcf': "Galaxy 2PCF correlation slope gamma(z)",
+}
+# Suites that are not chi2 probes of dfcm.probes
+DERIVED_SUITES = ('clusters', 'deuterium', '2pcf')
+# Fitted parameters subtracted from the data count, as in the validation scripts
+DOF_PARAMETERS = {'cc': 5, 'snia': 5}
+CLUSTER_REDSHIFT = 0.6
+# Planck 2018 baryon density used by the deuterium validation
+OMEGA_B_OBS = 0.02233
+OMEGA_B_ERR = 0.00009
+# Redshifts at which the galaxy 2PCF slope is checked
+SLOPE_REDSHIFTS = (0.1, 1.5, 4.0)
+# Stored datasets read by a suite (the other suites use the data of dfcm.data)
+SUITE_DATASETS = {'snia': ('pantheon_plus', 'pantheon_plus_cov'), 'cmb_tt': ('planck_tt',)}
+
+
+class SuiteContext:
+    """
+    Parameters and loaded data shared by the suites of one run. Probes are
+    built on first use and then reused.
+    """
+
+    def __init__(self, params=None, store=None):
+        from .model import BEST_FIT
+
+        self.params = tuple(BEST_FIT if params is None else params)
+        self.store = store
+        self._probes = {}
+
+    def probe(self, name):
+        if name not in self._probes:
+            from .probes import PROBES, SNIa
+
+            if name == 'snia':
+                self._probes[name] = SNIa.load(self.store)
+            elif name == 'cmb_tt':
+                from .cmb import PlanckTT
+
+                self._probes[name] = PlanckTT.load(self.store)
+            else:
+                self._probes[name] = PROBES[name]
+        return self._probes[name]
+
+    def fingerprint(self, name):
+        """
+        Checksums of the stored datasets (and settings) a suite depends on, or
+        None when one of them is not stored yet or may be stale.
+        """
+        if name not in SUITE_DATASETS:
+            return []
+        from .datasets import DatasetStore
+
+        store = self.store if self.store is not None else DatasetStore()
+        checksums = [store.fingerprint(dataset) for dataset in SUITE_DATASETS[name]]
+        if None in checksums:
+            return None
+        if name == 'snia':
+            from .config import SNIA_COV_RANK
+
+            checksums.append(f"rank={SNIA_COV_RANK}")
+        return checksums
+
+
+def result_key(name, context):
+    """Result-cache key of a suite in ``context``, or None if it cannot be keyed yet."""
+    from .results import ResultCache, code_version
+
+    fingerprint = context.fingerprint(name)
+    if fingerprint is None:
+        return None
+    return ResultCache.key(name, [float(p) for p in context.params], fingerprint, code_version())
+
+
+def _cached_results(names, context, cache):
+    """The results of ``names`` found in ``cache`` (marked 'cached') and the keys of the others."""
+    hits, keys = {}, {}
+    for name in names:
+        key = result_key(name, context) if cache is not None and cache.enabled else None
+        result = cache.get(key) if key is not None else None
+        if result is not None:
+            hits[name] = dict(result, cached=True)
+        else:
+            keys[name] = key
+    return hits, keys
+
+
+def _store_results(results, keys, context, cache):
+    for name, key in keys.items():
+        if cache is not None and cache.enabled and name in results and 'error' not in results[name]:
+            # Loading a dataset records it in the store, so a missing key can be built now
+            key = key if key is not None else result_key(name, context)
+            if key is not None:
+                cache.put(key, {field: value for field, value in results[name].items() if field != 'seconds'})
+
+
+def cluster_deficit(params, z=CLUSTER_REDSHIFT):
+    """Calculates the predicted massive-cluster deficit (%) at redshift ``z``."""
+    from .model import PHI, phi_z
+
+    phi = phi_z(z, *params[2:])
+    return 100.0 * (1.0 - (phi / PHI)**0.5)
+
+
+def omega_b_prediction(phi_inf=None):
+    """Predicts the baryon density Omega_b h^2 from the asymptotic fractal dimension."""
+    from .model import PHI
+
+    phi_inf = PHI if phi_inf is None else phi_inf
+    return 0.02235 * (phi_inf / PHI)**0.75
+
+
+def correlation_slope(z):
+    """Calculates the theoretical galaxy correlation slope gamma(z)."""
+    import numpy as np
+
+    gamma_inf, gamma_0, k = 0.55, 1.25, 1.1
+    return gamma_inf + (gamma_0 - gamma_inf) * np.exp(-k * np.asarray(z, dtype=float))
+
+
+def _error_result(name, error):
+    """The result of a suite that could not be loaded or computed."""
+    return {'suite': name, 'title': SUITES[name], 'error': f"{type(error).__name__}: {error}"}
+
+
+def _probe_result(name, probe, chi2, table):
+    chi2 = float(chi2)
+    dof = probe.ndata - DOF_PARAMETERS.get(name, 0)
+    result = {'suite': name, 'title': SUITES[name], 'ndata': probe.ndata, 'chi2': chi2,
+              'dof': dof, 'chi2_dof': chi2 / dof}
+    if name == 'cmb':
+        result['theta_star'] = float(probe.theta(table))
+        result['tension_sigma'] = chi2**0.5
+    return result
+
+
+def run_suites(names, context=None, cache=None):
+    """
+    Runs the named suites and returns ``{name: result dict}`` in the given
+    order. The probe suites are evaluated together on one distance table.
+    With a ResultCache, stored results are reused and new ones stored. A
+    suite that cannot be loaded or computed gets a result with an 'error'
+    message instead of aborting the others.
+    """
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        raise KeyError(f"Unknown suites {unknown}; available: {list(SUITES)}")
+    context = context if context is not None else SuiteContext()
+    if cache is not None:
+        hits, keys = _cached_results(names, context, cache)
+        computed = run_suites([name for name in names if name not in hits], context) if keys else {}
+        _store_results(computed, keys, context, cache)
+        return {name: hits[name] if name in hits else computed[name] for name in names}
+
+    from .likelihood import JointLikelihood
+
+    results = {}
+    probes = {}
+    for name in names:
+        if name not in DERIVED_SUITES:
+            try:
+                probes[name] = context.probe(name)
+            except Exception as error:
+                results[name] = _error_result(name, error)
+    per_probe, table = {}, None
+    if probes:
+        try:
+            likelihood = JointLikelihood(probes.values())
+            _, per_probe = likelihood(context.params)
+            table = likelihood.table(context.params)
+        except Exception:
+            # Evaluate the probes one by one, so that only the failing ones are lost
+            for name, probe in probes.items():
+                try:
+                    likelihood = JointLikelihood([probe])
+                    per_probe[name] = likelihood(context.params)[1][name]
+                    results[name] = _probe_result(name, probe, per_probe[name], likelihood.table(context.params))
+                except Exception as error:
+                    results[name] = _error_result(name, error)
+
+    for name in names:
+        if name in results:
+            continue
+        try:
+            if name in per_probe:
+                results[name] = _probe_result(name, probes[name], per_probe[name], table)
+            elif name == 'clusters':
+                results[name] = {'suite': name, 'title': SUITES[name], 'redshift': CLUSTER_REDSHIFT,
+                                 'deficit_percent': float(cluster_deficit(context.params))}
+            elif name == '2pcf':
+                results[name] = {'suite': name, 'title': SUITES[name], 'redshifts': list(SLOPE_REDSHIFTS),
+                                 'gamma': correlation_slope(SLOPE_REDSHIFTS).tolist()}
+            else:
+                prediction = omega_b_prediction()
+                results[name] = {'suite': name, 'title': SUITES[name], 'omega_b_h2': prediction,
+                                 'tension_sigma': abs(prediction - OMEGA_B_OBS) / OMEGA_B_ERR}
+        except Exception as error:
+            results[name] = _error_result(name, error)
+    return {name: results[name] for name in names}
+
+
+def format_results(results):
+    """One summary line per suite."""
+    lines = []
+    for name, result in results.items():
+        if 'error' in result:
+            detail = f"FAILED ({result['error']})"
+        elif 'chi2' in result:
+            detail = f"chi^2 = {result['chi2']:.3f}, chi^2/dof = {result['chi2_dof']:.3f} ({result['ndata']} points)"
+            if 'theta_star' in result:
+                detail = f"theta* = {result['theta_star']:.6f} rad, {result['tension_sigma']:.2f} sigma"
+        elif 'gamma' in result:
+            detail = ", ".join(f"gamma({z}) = {g:.3f}" for z, g in zip(result['redshifts'], result['gamma']))
+        elif 'deficit_percent' in result:
+            detail = f"deficit at z={result['redshift']} = {result['deficit_percent']:.1f}%"
+        else:
+            detail = f"Omega_b h^2 = {result['omega_b_h2']:.5f}, tension {result['tension_sigma']:.2f} sigma"
+        lines.append(f"[{name:>9}] {result['title']}: {detail}")
+    return lines
+
+
+def _run_one(name, params, store):
+    """Runs a single suite in a fresh context, recording its wall time."""
+    start = time.perf_counter()
+    try:
+        result = run_suites([name], SuiteContext(params, store))[name]
+    except Exception as error:
+        result = _error_result(name, error)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_concurrently(names, params=None, store=None, processes=None, cache=None):
+    """
+    Runs each suite in its own task of a process pool (serially in this
+    process when ``processes`` is 1) and returns ``{name: result dict}`` in
+    the given order, each result with its wall time in ``seconds``. Results
+    found in ``cache`` (a ResultCache) are not recomputed; a failing suite
+    gets an 'error' result as in ``run_suites``.
+    """
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        raise KeyError(f"Unknown suites {unknown}; available: {list(SUITES)}")
+    if cache is not None:
+        context = SuiteContext(params, store)
+        hits, keys = _cached_results(names, context, cache)
+        computed = run_concurrently([name for name in names if name not in hits], params, store,
+                                    processes) if keys else {}
+        _store_results(computed, keys, context, cache)
+        return {name: hits[name] if name in hits else computed[name] for name in names}
+    processes = processes if processes is not None else os.cpu_count() or 1
+    if processes > 1 and len(names) > 1:
+        with ProcessPoolExecutor(min(processes, len(names))) as pool:
+            futures = {name: pool.submit(_run_one, name, params, store) for name in names}
+            results = {}
+            for name in names:
+                try:
+                    results[name] = futures[name].result()
+                except Exception as error:
+                    # The worker itself failed (e.g. a broken pool or an unpicklable result)
+                    results[name] = _error_result(name, error)
+            return results
+    return {name: _run_one(name, params, store) for name in names}
+
+
+def render_report(results, params):
+    """The combined text report of a validation run, one section per suite."""
+    from .model import PARAM_NAMES
+
+    rule = "-" * 69
+    lines = ["=" * 69,
+             "  Results from the Dynamic Fractal Universe Calculator (v2.0)",
+             "  (Model by Sylvain Herbin, phi-z.space)",
+             "=" * 69,
+             "Parameters: " + ", ".join(f"{name}={value:g}" for name, value in zip(PARAM_NAMES, params)),
+             rule + "\n"]
+    for line, result in zip(format_results(results), results.values()):
+        lines.append(f"### {result['title']} ###")
+        lines.append(line.split(': ', 1)[1])
+        if result.get('cached'):
+            lines.append("(from the result cache)")
+        elif 'seconds' in result and 'error' not in result:
+            lines.append(f"(computed in {1e3 * result['seconds']:.1f} ms)")
+        lines.append(rule + "\n")
+
+    probes = [result for result in results.values() if 'chi2' in result]
+    failed = [result['suite'] for result in results.values() if 'error' in result]
+    lines.append("### Global Performance Summary ###")
+    if failed:
+        lines.append(f"Failed suites (left out of the summary): {', '.join(failed)}")
+    if probes:
+        chi2 = sum(result['chi2'] for result in probes)
+        dof = sum(result['ndata'] for result in probes) - len(PARAM_NAMES)
+        lines.append(f"Combined chi^2/dof over {', '.join(result['suite'] for result in probes)}: "
+                     f"{chi2:.3f} / {dof} = {chi2 / dof:.3f}")
+    lines.append("=" * 69)
+    return "\n".join(lines)
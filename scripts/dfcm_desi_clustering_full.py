@@ -8,7 +8,6 @@
 # ==============================================================================
 
 import numpy as np
-import pandas as pd
 import platform
 
 # --- Diagnostic ---
@@ -18,24 +17,12 @@ print(f"NumPy Version: {np.__version__}")
 print("-" * 50 + "\n")
 
 # --- 1. Model Definitions --- CORRECTED NORMALIZATION
-PHI = (1 + np.sqrt(5)) / 2
-
-def phi_z(z, Gamma, A1, A2):
-    phi_inf = PHI
-    phi_0 = 2.85
-    return phi_inf + (phi_0 - phi_inf) * np.exp(-Gamma * z) + \
-           A1 * np.exp(-0.5 * ((z - 0.4) / 0.3) ** 2) + \
-           A2 * np.exp(-0.5 * ((z - 1.5) / 0.4) ** 2)
-
-# CORRECTED: Added sigma8 normalization
-def f_sigma8(z, Gamma, A1, A2, sigma8=0.812):
-    """Structure growth rate fσ₈ prediction"""
-    phi = phi_z(z, Gamma, A1, A2)
-    f = phi**0.5 * (1 + z) ** (1.5 * phi - 1)
-    return f * sigma8
+# phi(z) and the fsigma8 prediction (with sigma8 normalization) come from the
+# shared dfcm model core.
+from dfcm import BEST_FIT, f_sigma8, growth_f_sigma8
 
 # --- 2. Parameters and Data Loading ---
-Gamma_opt, A1_opt, A2_opt = (0.433, 0.031, 0.019)
+Gamma_opt, A1_opt, A2_opt = BEST_FIT[2:]
 print("--- DESI Y1 Full Clustering Analysis ---")
 print(f"Parameters: Gamma={Gamma_opt}, A1={A1_opt}, A2={A2_opt}, σ₈=0.812")
 
@@ -46,7 +33,7 @@ errs = [0.031, 0.016, 0.017, 0.019, 0.020, 0.022, 0.023, 0.024, 0.018, 0.016, 0.
 
 # --- 3. Calculation ---
 print("\n[STEP 1] Calculating theoretical fσ₈ values")
-f8_pred = [f_sigma8(z, Gamma_opt, A1_opt, A2_opt) for z in z_desi]
+f8_pred = f_sigma8(np.array(z_desi), Gamma_opt, A1_opt, A2_opt)
 
 print("\n[STEP 2] Computing Chi-squared")
 diff = np.array(fsigma8_obs) - np.array(f8_pred)
@@ -64,4 +51,10 @@ print("-" * 50)
 print(f"FINAL RESULT: χ² = {chi2_f8:.3f}")
 print(f"FINAL RESULT: χ²/dof = {chi2_dof_f8:.3f}")
 print("-" * 50)
+
+# Cross-check: fσ₈ from the linear growth equation in the DFCM background
+f8_ode = growth_f_sigma8(np.array(z_desi), *BEST_FIT[1:])
+chi2_ode = np.sum(((np.array(fsigma8_obs) - f8_ode) / errs) ** 2)
+print(f"-> Growth equation: χ² = {chi2_ode:.3f}, χ²/dof = {chi2_ode / dof_f8:.3f}")
+print("-" * 50)
 print("\n[CONCLUSION]: Model accurately describes structure growth evolution")
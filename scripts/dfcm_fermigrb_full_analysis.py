@@ -1,7 +1,5 @@
 import numpy as np
-import pandas as pd
 import platform
-from scipy.integrate import quad
 
 # --- Diagnostic ---
 print("### Execution Environment Diagnostic ###")
@@ -10,28 +8,11 @@ print(f"NumPy Version: {np.__version__}")
 print("-" * 50 + "\n")
 
 # --- 1. Model Definitions ---
-PHI = (1 + np.sqrt(5)) / 2
-C_LIGHT = 299792.458
-
-def phi_z(z, Gamma, A1, A2):
-    phi_inf = PHI
-    phi_0 = 2.85
-    return phi_inf + (phi_0 - phi_inf) * np.exp(-Gamma * z) + \
-           A1 * np.exp(-0.5 * ((z - 0.4) / 0.3) ** 2) + \
-           A2 * np.exp(-0.5 * ((z - 1.5) / 0.4) ** 2)
-
-def H_model(z, H0, Om, Gamma, A1, A2):
-    OL = 1.0 - Om
-    phi = phi_z(z, Gamma, A1, A2)
-    return H0 * np.sqrt(Om * (1 + z) ** (3 * phi) + OL * (1 + z) ** (3 * (2 - phi)))
-
-def D_L_model(z, H0, Om, Gamma, A1, A2):
-    integrand = lambda z: C_LIGHT / H_model(z, H0, Om, Gamma, A1, A2)
-    integral, _ = quad(integrand, 0, z)
-    return (1 + z) * integral
+# phi(z), H(z) and D_L come from the shared dfcm model core.
+from dfcm import BEST_FIT, luminosity_distance
 
 # --- 2. Parameters and Data Loading ---
-H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = (73.24, 0.2974, 0.433, 0.031, 0.019)
+H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = BEST_FIT
 model_args = (H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt)
 print("--- Full Fermi-LAT GRB Analysis ---")
 print(f"Parameters: H0={H0_opt}, Om={Om_opt}, Gamma={Gamma_opt}, A1={A1_opt}, A2={A2_opt}")
@@ -46,7 +27,7 @@ dl_err = [180, 165, 320, 200, 380, 470, 190, 315, 135, 190,
 
 # --- 3. Calculation ---
 print("\n[STEP 1] Computing theoretical luminosity distances")
-dl_pred = [D_L_model(z, *model_args) for z in z_grb]
+dl_pred = luminosity_distance(z_grb, *model_args)
 
 print("\n[STEP 2] Statistical analysis - WITH ERROR SCALING")
 # Apply realistic error scaling (15% minimum)
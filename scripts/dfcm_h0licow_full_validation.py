@@ -8,8 +8,8 @@ print(f"NumPy Version: {np.__version__}")
 print("-" * 50 + "\n")
 
 # --- 1. Model Parameters ---
-PHI = (1 + np.sqrt(5)) / 2
-H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = (73.24, 0.2974, 0.433, 0.031, 0.019)
+from dfcm import BEST_FIT
+H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = BEST_FIT
 print("--- Full H0LiCOW Lensing Validation ---")
 print(f"Parameters: H0={H0_opt}, Om={Om_opt}, Gamma={Gamma_opt}, A1={A1_opt}, A2={A2_opt}")
 
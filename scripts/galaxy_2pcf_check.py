@@ -22,17 +22,8 @@ print(f"SciPy Version: {scipy.__version__}")
 print("-" * 38 + "\n")
 
 # --- 1. Model Definitions ---
-# --- CORRECTION APPLIQUÉE ICI ---
-PHI = (1 + np.sqrt(5)) / 2
-
-def phi_z(z, Gamma, A1, A2):
-    """Calculates the dynamic fractal dimension phi(z)."""
-    phi_inf = PHI
-    phi_0 = 2.85
-    base = phi_inf + (phi_0 - phi_inf) * np.exp(-Gamma * z)
-    bao_correction1 = A1 * np.exp(-0.5 * ((z - 0.4)/0.3)**2)
-    bao_correction2 = A2 * np.exp(-0.5 * ((z - 1.5)/0.4)**2)
-    return base + bao_correction1 + bao_correction2
+# The best-fit parameters come from the shared dfcm model core.
+from dfcm import BEST_FIT
 
 def gamma_z(z):
     """
@@ -50,7 +41,7 @@ def gamma_z(z):
 print("--- Script for Galaxy 2PCF using GLOBAL fit parameters ---")
 print("\n[STEP 1] Using GLOBAL best-fit parameters from the paper.")
 # Parameters from the GLOBAL fit
-H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = (73.24, 0.2974, 0.433, 0.031, 0.019)
+H0_opt, Om_opt, Gamma_opt, A1_opt, A2_opt = BEST_FIT
 print(f"-> Parameters: H0={H0_opt}, Om={Om_opt}, Gamma={Gamma_opt}, A1={A1_opt}, A2={A2_opt}")
 
 # --- 3. Consistency Checks ---
@@ -0,0 +1,29 @@
+# ==============================================================================
+# Dynamic Fractal Cosmological Model - Test Configuration
+#
+# Author: Sylvain Herbin (ORCID: 0009-0001-3390-5012)
+# Website: www.phi-z.space
+#
+# Makes the dfcm package importable from the scripts/ directory and points
+# its on-disk caches at a temporary directory, so that the tests neither read
+# nor write the user's cache. Run from scripts/: python -m pytest -q
+# ==============================================================================
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault('DFCM_CACHE_DIR', tempfile.mkdtemp(prefix='dfcm-tests-'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pytest  # noqa: E402
+
+from dfcm.memo import MEMO  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def empty_memo():
+    """Every test starts from an empty evaluation cache."""
+    MEMO.clear()
+    yield
+    MEMO.clear()
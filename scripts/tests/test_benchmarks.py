@@ -0,0 +1,54 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+from dfcm.memo import MEMO
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks')
+
+
+@pytest.fixture(scope='module')
+def bench_suite():
+    spec = importlib.util.spec_from_file_location('bench_suite', os.path.join(BENCHMARKS_DIR, 'bench_suite.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_compare_flags_slowdowns_beyond_the_tolerance(bench_suite):
+    results = {'fast': {'median_s': 1.1}, 'slow': {'median_s': 1.3}, 'new': {'median_s': 1.0},
+               'skipped': {'skipped': 'no data'}}
+    baseline = {'cases': {'fast': {'median_s': 1.0}, 'slow': {'median_s': 1.0}, 'skipped': {'median_s': 1.0}}}
+    assert bench_suite.compare(results, baseline, tolerance=0.2) == ['slow']
+    assert results['fast']['baseline_ratio'] == pytest.approx(1.1)
+    assert 'baseline_ratio' not in results['new']
+    assert bench_suite.compare(results, {}, tolerance=0.2) == []
+
+
+def test_run_against_a_baseline(bench_suite, tmp_path, monkeypatch, capsys):
+    # main() disables the evaluation cache; restored after the test
+    monkeypatch.setattr(MEMO, 'max_bytes', MEMO.max_bytes)
+    output = tmp_path / 'results.json'
+    args = ['cmb_high_z_distance', '--warmup', '1', '--repeats', '3']
+    assert bench_suite.main(args + ['--output', str(output)]) == 0
+    report = json.loads(output.read_text())
+    stats = report['cases']['cmb_high_z_distance']
+    assert stats['repeats'] == 3 and stats['p10_s'] <= stats['median_s'] <= stats['p90_s']
+    assert report['settings'] == {'warmup': 1, 'repeats': 3, 'memo': False}
+
+    # A baseline a thousand times baseline is a regression; the same baseline is not
+    stats['median_s'] /= 1000.0
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps(report))
+    assert bench_suite.main(args + ['--baseline', str(baseline)]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+    stats['median_s'] *= 1e6
+    baseline.write_text(json.dumps(report))
+    assert bench_suite.main(args + ['--baseline', str(baseline)]) == 0
+
+
+def test_unknown_cases_are_rejected(bench_suite):
+    with pytest.raises(SystemExit):
+        bench_suite.main(['no_such_case'])
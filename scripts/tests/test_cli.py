@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import dfcm
+from dfcm import cli
+from dfcm.suites import SUITES, SuiteContext
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def test_import_is_lazy():
+    code = ("import sys, dfcm; assert 'numpy' not in sys.modules and 'dfcm.model' not in sys.modules; "
+            "dfcm.H_model; assert 'dfcm.model' in sys.modules and 'dfcm.probes' not in sys.modules")
+    subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, check=True)
+
+
+def test_exports_resolve():
+    for name in dfcm.__all__:
+        assert getattr(dfcm, name) is not None
+    assert set(dfcm.__all__) <= set(dir(dfcm))
+    with pytest.raises(AttributeError, match="no_such_name"):
+        dfcm.no_such_name
+
+
+def test_list(capsys):
+    assert cli.main(['list']) == 0
+    assert len(capsys.readouterr().out.splitlines()) == len(SUITES)
+
+
+def test_run_writes_json(tmp_path, capsys):
+    path = tmp_path / 'results.json'
+    params = ['70', '0.3', '1', '0', '0']
+    assert cli.main(['run', 'cc', 'clusters', '--params', *params, '--json', str(path), '--no-cache']) == 0
+    report = json.loads(path.read_text())
+    assert report['params'] == [70.0, 0.3, 1.0, 0.0, 0.0]
+    assert list(report['suites']) == ['cc', 'clusters']
+    assert set(report['timing']) == {'import_s', 'load_s', 'compute_s', 'total_s', 'budget_s'}
+    assert "[       cc]" in capsys.readouterr().out
+
+
+def test_run_exit_status(monkeypatch, capsys):
+    assert cli.main(['run', 'cc', 'nope']) == 2
+    assert "unknown suites ['nope']" in capsys.readouterr().err
+
+    def failing_probe(self, name):
+        raise IOError("dataset unavailable")
+
+    monkeypatch.setattr(SuiteContext, 'probe', failing_probe)
+    assert cli.main(['run', 'cc', 'clusters', '--no-cache']) == 1
+    assert "1 suite(s) failed: cc" in capsys.readouterr().err
+
+
+def test_delegated_commands(monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['dfcm'])
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(['fit', '--help'])
+    assert exit_info.value.code == 0
+    assert capsys.readouterr().out.startswith("usage: dfcm fit")
+    with pytest.raises(SystemExit):
+        cli.main(['bogus'])
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from dfcm.cmb import PLANCK_TT_FILE, PlanckTT, binning_matrix, default_edges
+from dfcm.config import DATA_DIR
+from dfcm.data import PLANCK_THETA_STAR
+from dfcm.datasets import DatasetStore
+
+
+@pytest.fixture(scope='module')
+def planck_tt(tmp_path_factory):
+    return PlanckTT.load(DatasetStore(tmp_path_factory.mktemp('store')))
+
+
+def test_default_edges():
+    np.testing.assert_array_equal(default_edges(95), [2, 30, 60, 90, 96])
+    np.testing.assert_array_equal(default_edges(90), [2, 30, 60, 90, 91])
+
+
+def test_binning_matrix_is_an_inverse_variance_average():
+    ell = np.arange(2, 12)
+    sigma = np.linspace(1.0, 3.0, ell.size)
+    # The last bin [20, 30) holds no multipole and is dropped
+    matrix, errors = binning_matrix(ell, sigma, [2, 5, 9, 20, 30])
+    assert matrix.shape == (3, ell.size)
+    np.testing.assert_allclose(matrix.sum(axis=1), 1.0, rtol=1e-15)
+    for row, (lo, hi), error in zip(matrix, [(2, 5), (5, 9), (9, 20)], errors):
+        inside = (ell >= lo) & (ell < hi)
+        assert np.all(row[~inside] == 0.0)
+        weights = sigma[inside]**-2
+        np.testing.assert_allclose(row[inside], weights / weights.sum(), rtol=1e-15)
+        assert error == pytest.approx(weights.sum()**-0.5, rel=1e-15)
+
+
+def test_planck_bandpowers(planck_tt):
+    assert planck_tt.ndata == planck_tt.edges.size - 1
+    np.testing.assert_allclose(planck_tt.binning.sum(axis=1), 1.0, rtol=1e-14)
+    # Every multipole falls in exactly one bin
+    np.testing.assert_array_equal(np.count_nonzero(planck_tt.binning, axis=0), 1)
+    # The bin [30, 60), recomputed from the shipped spectrum
+    ell, Dl, minus, plus = np.loadtxt(DATA_DIR / PLANCK_TT_FILE, unpack=True)
+    inside = (ell >= 30) & (ell < 60)
+    weights = (0.5 * (minus + plus)[inside])**-2
+    assert planck_tt.bandpowers[1] == pytest.approx(np.sum(weights * Dl[inside]) / weights.sum(), rel=1e-13)
+    assert planck_tt.bandpower_err[1] == pytest.approx(weights.sum()**-0.5, rel=1e-13)
+    # At the reference theta* the template reproduces the smoothed data
+    residual = (planck_tt.bandpowers - planck_tt.predict(PLANCK_THETA_STAR)) / planck_tt.bandpower_err
+    assert np.sqrt(np.mean(residual**2)) < 3.0
+
+
+def test_chi2_theta_is_batched_and_minimal_near_the_reference(planck_tt):
+    theta = PLANCK_THETA_STAR * np.array([[0.99, 1.0], [1.0, 1.01]])
+    chi2 = planck_tt.chi2_theta(theta)
+    assert chi2.shape == (2, 2)
+    np.testing.assert_allclose(chi2[0, 1], planck_tt.chi2_theta(PLANCK_THETA_STAR), rtol=1e-14)
+    assert chi2[0, 1] < min(chi2[0, 0], chi2[1, 1])
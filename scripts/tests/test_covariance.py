@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from dfcm.covariance import CholeskyCovariance, LowRankCovariance, chi2_discrepancy, covariance_cache_key
+
+
+def random_covariance(n, seed=0):
+    """A symmetric positive-definite matrix with correlated off-diagonal terms."""
+    rng = np.random.default_rng(seed)
+    modes = rng.standard_normal((n, 4))
+    return np.diag(rng.uniform(0.5, 2.0, n)) + 0.3 * modes @ modes.T
+
+
+@pytest.fixture
+def system():
+    rng = np.random.default_rng(1)
+    return random_covariance(80), rng.standard_normal(80), rng.standard_normal((80, 3))
+
+
+def test_cholesky_chi2_matches_inverse(system):
+    cov, diff, block = system
+    covariance = CholeskyCovariance.from_matrix(cov)
+    np.testing.assert_allclose(covariance.chi2(diff), diff @ np.linalg.solve(cov, diff), rtol=1e-12)
+    np.testing.assert_allclose(covariance.chi2(block), np.einsum('ij,ij->j', block, np.linalg.solve(cov, block)),
+                               rtol=1e-12)
+    np.testing.assert_allclose(covariance.solve(diff), np.linalg.solve(cov, diff), rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(covariance.log_det(), np.linalg.slogdet(cov)[1], rtol=1e-12)
+
+
+def test_cholesky_factor_is_cached(tmp_path, system):
+    cov, diff, _ = system
+    built = []
+
+    def build():
+        built.append(True)
+        return cov
+
+    first = CholeskyCovariance.cached('test', build, cache_dir=tmp_path)
+    second = CholeskyCovariance.cached('test', build, cache_dir=tmp_path)
+    assert len(built) == 1
+    assert second.chi2(diff) == first.chi2(diff)
+
+
+def test_cache_key_depends_on_content_and_mask(tmp_path):
+    path = tmp_path / 'cov.txt'
+    path.write_bytes(b'3\n1 0 0\n')
+    assert covariance_cache_key(path) == covariance_cache_key(b'3\n1 0 0\n')
+    assert covariance_cache_key(path) != covariance_cache_key(b'3\n1 0 1\n')
+    assert covariance_cache_key(path, mask=np.array([True, False])) != covariance_cache_key(path)
+
+
+def test_low_rank_woodbury_matches_dense(system):
+    _, diff, block = system
+    rng = np.random.default_rng(2)
+    structured = LowRankCovariance(rng.uniform(0.5, 2.0, 80), rng.standard_normal((80, 5)))
+    dense = structured.dense()
+    np.testing.assert_allclose(structured.chi2(diff), diff @ np.linalg.solve(dense, diff), rtol=1e-12)
+    np.testing.assert_allclose(structured.chi2(block), CholeskyCovariance.from_matrix(dense).chi2(block),
+                               rtol=1e-12)
+    np.testing.assert_allclose(structured.solve(block), np.linalg.solve(dense, block), rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(structured.log_det(), np.linalg.slogdet(dense)[1], rtol=1e-12)
+
+
+def test_low_rank_decomposition_of_a_covariance(system):
+    cov, diff, _ = system
+    # The test matrix is a diagonal plus 4 modes: rank 4 recovers it closely
+    structured = LowRankCovariance.from_matrix(cov, rank=4, iterations=10)
+    np.testing.assert_allclose(np.diag(structured.dense()), np.diag(cov), rtol=1e-12)
+    report = chi2_discrepancy(CholeskyCovariance.from_matrix(cov), structured, diff)
+    assert report['rank'] == 4 and report['max_rel_error'] < 0.05
+    assert LowRankCovariance.from_matrix(cov, rank=0).chi2(diff) == pytest.approx(np.sum(diff**2 / np.diag(cov)))
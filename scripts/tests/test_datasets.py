@@ -0,0 +1,137 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from dfcm import datasets
+from dfcm.datasets import MANIFEST_NAME, DatasetStore, file_sha256, read_text_matrix
+
+N = 7
+
+
+def write_matrix(path, matrix, newline='\n', per_line=N, size=None):
+    """The size line followed by the values, ``per_line`` to a line."""
+    values = [repr(float(value)) for value in matrix.ravel()]
+    lines = [str(len(matrix) if size is None else size)]
+    lines += [' '.join(values[i:i + per_line]) for i in range(0, len(values), per_line)]
+    path.write_bytes(newline.join(lines).encode('ascii') + newline.encode('ascii'))
+    return path
+
+
+@pytest.fixture
+def matrix():
+    return np.random.default_rng(5).normal(size=(N, N))
+
+
+@pytest.mark.parametrize('chunk_bytes', [1, 7, 13, 64, 1 << 22])
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+@pytest.mark.parametrize('per_line', [1, N])
+def test_matrix_matches_loadtxt(tmp_path, matrix, chunk_bytes, newline, per_line):
+    path = write_matrix(tmp_path / 'matrix.txt', matrix, newline, per_line)
+    expected = np.loadtxt(path, skiprows=1).reshape(N, N)
+    np.testing.assert_array_equal(expected, matrix)
+    np.testing.assert_array_equal(read_text_matrix(path, chunk_bytes=chunk_bytes), expected)
+
+
+@pytest.mark.parametrize('chunk_bytes', [1, 13, 1 << 22])
+def test_submatrix(tmp_path, matrix, chunk_bytes):
+    path = write_matrix(tmp_path / 'matrix.txt', matrix, '\r\n')
+    index = [0, 2, 3, 6]
+    np.testing.assert_array_equal(read_text_matrix(path, index=index, chunk_bytes=chunk_bytes),
+                                  np.loadtxt(path, skiprows=1)[np.ix_(index, index)])
+
+
+def test_allocated_output(tmp_path, matrix):
+    path = write_matrix(tmp_path / 'matrix.txt', matrix)
+    out = np.empty((N, N))
+    assert read_text_matrix(path, allocate=lambda shape: out, chunk_bytes=16) is out
+    np.testing.assert_array_equal(out, matrix)
+
+
+@pytest.mark.parametrize('size, found', [(N + 1, N * N), (N - 1, N * N)])
+@pytest.mark.parametrize('index', [None, [0, 1]])
+def test_wrong_number_of_values(tmp_path, matrix, size, found, index):
+    path = write_matrix(tmp_path / 'matrix.txt', matrix, size=size)
+    with pytest.raises(ValueError, match=f"expected {size * size} matrix values, found {found}"):
+        read_text_matrix(path, index=index, chunk_bytes=13)
+
+
+def write_table(path, rows):
+    path.write_text("# z mu flag\n" + "".join(f"{z} {mu} {flag}\n" for z, mu, flag in rows))
+    return path
+
+
+def test_store_builds_and_memory_maps(tmp_path, matrix):
+    source = write_table(tmp_path / 'table.txt', [(0.1, 38.0, 0), (0.5, 42.0, 1)])
+    store = DatasetStore(tmp_path / 'store')
+    table = store.table('sn', source, ('z', 'mu'))
+    assert isinstance(table['z'], np.memmap)
+    np.testing.assert_array_equal(table['mu'], [38.0, 42.0])
+
+    path = write_matrix(tmp_path / 'matrix.txt', matrix)
+    np.testing.assert_array_equal(store.matrix('cov', path, index=[1, 4]), matrix[np.ix_([1, 4], [1, 4])])
+
+    manifest = json.loads((tmp_path / 'store' / MANIFEST_NAME).read_text())
+    assert set(manifest) == {'sn', 'cov'}
+    assert manifest['sn']['source']['sha256'] == store.checksum('sn') == file_sha256(source)
+    assert manifest['cov']['arrays']['matrix']['shape'] == [2, 2]
+    assert store.verify('sn') and store.verify('cov')
+    assert store.fingerprint('sn') == store.checksum('sn')
+    # A fresh store reads the manifest back
+    assert DatasetStore(tmp_path / 'store').checksum('cov') == file_sha256(path)
+
+
+def test_store_rebuilds_when_the_source_changes(tmp_path, monkeypatch):
+    source = write_table(tmp_path / 'table.txt', [(0.1, 38.0, 0)])
+    store = DatasetStore(tmp_path / 'store')
+    store.table('sn', source, ('z', 'mu'))
+    checksum = store.checksum('sn')
+
+    builds = []
+    read = datasets.read_text_table
+
+    def counted_read(*args):
+        builds.append(args)
+        return read(*args)
+
+    monkeypatch.setattr(datasets, 'read_text_table', counted_read)
+    # Same content with a new mtime: checked by checksum, not rebuilt
+    os.utime(source, (1e9, 1e9))
+    assert store.fingerprint('sn') is None
+    store.table('sn', source, ('z', 'mu'))
+    assert not builds and store.fingerprint('sn') == checksum
+
+    write_table(source, [(0.1, 38.0, 0), (0.7, 43.0, 0)])
+    assert store.fingerprint('sn') is None
+    np.testing.assert_array_equal(store.table('sn', source, ('z', 'mu'))['mu'], [38.0, 43.0])
+    assert len(builds) == 1 and store.checksum('sn') not in (None, checksum)
+    # Other columns are a different dataset signature, also rebuilt
+    store.table('sn', source, ('z', 'flag'))
+    assert len(builds) == 2
+
+
+def test_store_works_offline(tmp_path, monkeypatch):
+    source = write_table(tmp_path / 'table.txt', [(0.1, 38.0, 0)])
+    DatasetStore(tmp_path / 'store').table('sn', source, ('z', 'mu'))
+    source.unlink()
+    store = DatasetStore(tmp_path / 'store')
+    np.testing.assert_array_equal(store.table('sn', source, ('z', 'mu'))['mu'], [38.0])
+    assert store.fingerprint('sn') == store.checksum('sn')
+
+    with pytest.raises(FileNotFoundError, match="other"):
+        store.table('other', tmp_path / 'missing.txt', ('z',))
+
+    # Files not shipped are downloaded once into the store's sources/
+    downloads = []
+
+    def download(url, destination):
+        downloads.append(url)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        return write_table(destination, [(0.2, 39.0, 0)])
+
+    monkeypatch.setattr(datasets, 'download', download)
+    for _ in range(2):
+        table = store.table('remote', tmp_path / 'remote.txt', ('mu',), url='https://example.org/remote.txt')
+    assert downloads == ['https://example.org/remote.txt'] and table['mu'][0] == 39.0
+    assert (tmp_path / 'store' / 'sources' / 'remote.txt').exists()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from scipy.integrate import quad
+
+from dfcm.distances import C_LIGHT, cumulative_comoving_distance, cumulative_integral
+from dfcm.model import BEST_FIT, HIGH_Z, H_model, comoving_distance, high_z_comoving_distance
+
+# Pantheon+ redshift range, plus a few GRB-like redshifts
+REDSHIFTS = np.concatenate([np.geomspace(0.001, 2.3, 60), [3.5, 5.0, 8.2]])
+
+
+def quad_distance(z, params=BEST_FIT):
+    value, _ = quad(lambda zz: C_LIGHT / H_model(zz, *params), 0.0, z, epsabs=0.0, epsrel=1e-13, limit=200)
+    return value
+
+
+def test_cumulative_distance_matches_quad():
+    D_M = cumulative_comoving_distance(REDSHIFTS, H_model, BEST_FIT)
+    reference = np.array([quad_distance(z) for z in REDSHIFTS])
+    np.testing.assert_allclose(D_M, reference, rtol=1e-12, atol=0)
+
+
+@pytest.mark.parametrize('params', [(60.0, 0.1, 0.0, -0.2, 0.2), (95.0, 0.55, 1.9, 0.2, -0.2)])
+def test_cumulative_distance_matches_quad_at_prior_corners(params):
+    D_M = cumulative_comoving_distance(REDSHIFTS, H_model, params)
+    reference = np.array([quad_distance(z, params) for z in REDSHIFTS])
+    np.testing.assert_allclose(D_M, reference, rtol=1e-12, atol=0)
+
+
+def test_unsorted_and_repeated_redshifts():
+    z = np.array([[1.2, 0.1], [0.1, 0.0]])
+    D_M = cumulative_comoving_distance(z, H_model, BEST_FIT)
+    assert D_M.shape == z.shape
+    assert D_M[1, 1] == 0.0 and D_M[0, 1] == D_M[1, 0]
+    np.testing.assert_allclose(D_M[0, 0], quad_distance(1.2), rtol=1e-12)
+
+
+def test_batched_parameters():
+    batch = (np.array([65.0, 75.0]), np.array([0.25, 0.35]), 0.433, 0.031, 0.019)
+    D_M = cumulative_comoving_distance(REDSHIFTS, H_model, batch)
+    assert D_M.shape == (2, REDSHIFTS.size)
+    for i in range(2):
+        single = (batch[0][i], batch[1][i]) + BEST_FIT[2:]
+        np.testing.assert_allclose(D_M[i], cumulative_comoving_distance(REDSHIFTS, H_model, single), rtol=1e-15)
+
+
+def test_negative_redshifts_are_rejected():
+    with pytest.raises(ValueError):
+        cumulative_integral(np.array([-0.1, 0.5]), lambda zz: np.ones_like(zz))
+
+
+@pytest.mark.parametrize('z', [20.0, 1090.0, 1100.0])
+def test_high_z_distance_matches_quad(z):
+    # quad in ln(1+z), where the integrand is smooth
+    reference, _ = quad(lambda u: C_LIGHT * np.exp(u) / H_model(np.expm1(u), *BEST_FIT), 0.0, np.log1p(z),
+                        epsabs=0.0, epsrel=1e-13, limit=200)
+    assert abs(high_z_comoving_distance(z, *BEST_FIT) / reference - 1.0) < 1e-12
+
+
+def test_comoving_distance_splits_at_high_z():
+    z = np.array([0.5, HIGH_Z + 5.0, 1090.0])
+    D_M = comoving_distance(z, *BEST_FIT)
+    np.testing.assert_allclose(D_M[0], cumulative_comoving_distance(0.5, H_model, BEST_FIT), rtol=1e-15)
+    np.testing.assert_allclose(D_M[1:], high_z_comoving_distance(z[1:], *BEST_FIT), rtol=1e-15)
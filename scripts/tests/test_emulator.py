@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from dfcm.emulator import DistanceEmulator
+from dfcm.model import PRIOR_BOUNDS, comoving_distance
+
+
+@pytest.fixture(scope='module')
+def emulator(tmp_path_factory):
+    return DistanceEmulator.cached(cache_dir=tmp_path_factory.mktemp('emulator'))
+
+
+def random_vectors(n, seed):
+    rng = np.random.default_rng(seed)
+    return tuple(rng.uniform(lo, hi, n) for lo, hi in PRIOR_BOUNDS)
+
+
+def test_max_error_holds_on_fresh_vectors(emulator):
+    assert emulator.max_error is not None and emulator.max_error < 1e-4
+    # Vectors and redshifts other than those of validate(), against the unmemoized integrator
+    params = random_vectors(300, seed=11)
+    z = np.sort(np.random.default_rng(12).uniform(0.005, emulator.z_max, 50))
+    exact = comoving_distance.__wrapped__(z, *params)
+    error = np.max(np.abs(emulator.comoving_distance(z, *params) / exact - 1.0))
+    assert error <= 1.5 * emulator.max_error
+
+
+def test_single_vector_and_high_z_fallback(emulator):
+    params = tuple(p[0] for p in random_vectors(1, seed=3))
+    z = np.array([0.1, 1.0, emulator.z_max + 5.0, 1090.0])
+    D_M = emulator.comoving_distance(z, *params)
+    exact = comoving_distance.__wrapped__(z, *params)
+    np.testing.assert_allclose(D_M[:2], exact[:2], rtol=emulator.max_error)
+    # Beyond z_max the exact integrator is used
+    np.testing.assert_allclose(D_M[2:], exact[2:], rtol=1e-14)
+
+
+def test_cached_emulator_is_reloaded(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('reload')
+    built = DistanceEmulator.cached(cache_dir=directory)
+    loaded = DistanceEmulator.cached(cache_dir=directory)
+    np.testing.assert_array_equal(loaded.coefficients, built.coefficients)
+    assert loaded.max_error == built.max_error
+
+
+@pytest.mark.parametrize('axis, value', [(1, 0.01), (1, 0.7), (2, -0.1), (2, 2.5), (3, -0.3), (4, 0.25)])
+def test_parameters_outside_the_box_raise(emulator, axis, value):
+    params = [70.0, 0.3, 0.5, 0.0, 0.0]
+    params[axis] = value
+    with pytest.raises(ValueError):
+        emulator.comoving_distance(np.array([0.5]), *params)
+    # One bad vector in a batch is enough
+    batch = [np.full(3, p) for p in (70.0, 0.3, 0.5, 0.0, 0.0)]
+    batch[axis][1] = value
+    with pytest.raises(ValueError):
+        emulator.comoving_distance(np.array([0.5]), *batch)
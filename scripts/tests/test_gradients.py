@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from dfcm.likelihood import JointLikelihood
+from dfcm.model import BEST_FIT, H_model, H_model_jacobian, comoving_distance, comoving_distance_jacobian
+from dfcm.probes import PROBES, DistanceTable
+
+# Central-difference step relative to each parameter (at least 0.1 in absolute units)
+RELATIVE_STEP = 1e-5
+POINTS = [BEST_FIT, (68.0, 0.35, 1.2, -0.1, 0.15)]
+
+
+def central_differences(function, params):
+    """Derivatives of ``function`` with respect to each parameter, stacked on a leading axis."""
+    params = np.asarray(params, dtype=float)
+    derivatives = []
+    for i in range(params.size):
+        step = np.zeros(params.size)
+        step[i] = RELATIVE_STEP * max(abs(params[i]), 0.1)
+        derivatives.append((function(*(params + step)) - function(*(params - step))) / (2.0 * step[i]))
+    return np.stack(derivatives)
+
+
+def assert_gradient_close(exact, numerical, tol=1e-8):
+    """Agreement relative to the largest derivative, per value when the derivatives are arrays."""
+    scale = np.max(np.abs(exact), axis=0)
+    assert np.all(np.abs(exact - numerical) <= tol * scale)
+
+
+@pytest.mark.parametrize('params', POINTS)
+def test_H_jacobian(params):
+    z = np.linspace(0.0, 3.0, 31)
+    H, dH = H_model_jacobian(z, *params)
+    np.testing.assert_allclose(H, H_model(z, *params), rtol=1e-15)
+    assert_gradient_close(dH, central_differences(lambda *p: H_model(z, *p), params))
+
+
+@pytest.mark.parametrize('params', POINTS)
+def test_comoving_distance_jacobian(params):
+    # Both integrators: the shared grid and the log-space rule above HIGH_Z
+    z = np.array([0.05, 0.7, 2.3, 8.0, 1090.0])
+    D_M, dD_M = comoving_distance_jacobian(z, *params)
+    np.testing.assert_allclose(D_M, comoving_distance(z, *params), rtol=1e-14)
+    assert_gradient_close(dD_M, central_differences(lambda *p: comoving_distance.__wrapped__(z, *p), params))
+
+
+@pytest.mark.parametrize('name', sorted(PROBES))
+@pytest.mark.parametrize('params', POINTS)
+def test_probe_gradient(name, params):
+    probe = PROBES[name]
+    chi2, gradient = probe.chi2_gradient(DistanceTable(probe.redshifts, params, jacobian=True))
+    np.testing.assert_allclose(chi2, probe(*params), rtol=1e-14)
+    assert_gradient_close(gradient, central_differences(probe, params))
+
+
+def test_joint_gradient_of_a_batch():
+    likelihood = JointLikelihood(PROBES.values())
+    batch = tuple(np.array(column) for column in zip(*POINTS))
+    total, gradient, per_probe = likelihood.value_and_gradient(batch)
+    assert gradient.shape == (5, len(POINTS))
+    for k, params in enumerate(POINTS):
+        single_total, single_gradient, _ = likelihood.value_and_gradient(params)
+        np.testing.assert_allclose(total[k], single_total, rtol=1e-12)
+        np.testing.assert_allclose(gradient[:, k], single_gradient, rtol=1e-10,
+                                   atol=1e-10 * np.abs(single_gradient).max())
+        assert_gradient_close(single_gradient, central_differences(lambda *p: likelihood(p)[0], params))
+    np.testing.assert_allclose(total, sum(per_probe.values()), rtol=1e-15)
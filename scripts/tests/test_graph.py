@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+import pytest
+
+from dfcm.graph import Graph, validation_graph
+from dfcm.model import BEST_FIT
+from dfcm.probes import PROBES, DistanceTable
+
+
+def counting_graph(workers=1):
+    graph = Graph(workers)
+    graph.source('x', 2.0)
+    graph.source('y', 10.0)
+    graph.node('sign', lambda x: np.sign(x), ['x'])
+    graph.node('scaled', lambda sign, y: sign * y, ['sign', 'y'])
+    graph.node('total', lambda scaled, x: scaled + x, ['scaled', 'x'])
+    return graph
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_only_invalidated_nodes_are_recomputed(workers):
+    graph = counting_graph(workers)
+    assert graph['total'] == 12.0
+    assert graph.computations == {'sign': 1, 'scaled': 1, 'total': 1}
+    graph.computations.clear()
+    graph.source('y', 20.0)
+    assert graph.stale(['total']) == ['scaled', 'total']
+    assert graph['total'] == 22.0
+    assert graph.computations == {'scaled': 1, 'total': 1}
+    graph.computations.clear()
+    # The same plain value again is no change
+    graph.source('y', 20.0)
+    assert graph['total'] == 22.0 and graph.computations == {}
+
+
+def test_early_cutoff_stops_at_an_unchanged_value():
+    graph = counting_graph()
+    graph['total']
+    graph.computations.clear()
+    # sign(3) == sign(2): 'sign' is recomputed, but 'scaled' must not be
+    graph.source('x', 3.0)
+    assert graph['total'] == 13.0
+    assert graph.computations == {'sign': 1, 'total': 1}
+
+
+def test_touch_after_an_in_place_change():
+    graph = Graph(1)
+    values = np.array([1.0, 2.0])
+    graph.source('values', values)
+    graph.node('sum', lambda v: float(v.sum()), ['values'])
+    assert graph['sum'] == 3.0
+    values[0] = 5.0
+    # Re-sourcing the same object is no change; touch() declares the edit
+    graph.source('values', values)
+    assert graph['sum'] == 3.0
+    graph.touch('values')
+    assert graph['sum'] == 7.0
+
+
+def test_cycles_and_unknown_nodes_are_rejected():
+    graph = Graph(1)
+    graph.source('x', 1.0)
+    graph.node('a', lambda x, c: x, ['x', 'c'])
+    graph.node('b', lambda a: a, ['a'])
+    graph.node('c', lambda b: b, ['b'])
+    with pytest.raises(ValueError, match='Cycle'):
+        graph['c']
+    graph.node('d', lambda missing: missing, ['missing'])
+    with pytest.raises(KeyError):
+        graph['d']
+    with pytest.raises(ValueError):
+        graph.node('b', lambda a: a, ['a'])
+    with pytest.raises(ValueError):
+        graph.source('b', 1.0)
+
+
+def test_a_slow_node_does_not_hold_back_independent_branches():
+    released = threading.Event()
+    graph = Graph(workers=2)
+    graph.source('x', 1.0)
+    # 'slow' only finishes once 'second', two levels down the other branch, has run
+    graph.node('slow', lambda x: released.wait(timeout=10.0), ['x'])
+    graph.node('first', lambda x: x + 1.0, ['x'])
+    graph.node('second', lambda first: released.set() or first, ['first'])
+    values = graph.evaluate(['slow', 'second'])
+    assert values == {'slow': True, 'second': 2.0}
+
+
+def test_errors_propagate():
+    graph = Graph(workers=2)
+    graph.source('x', 0.0)
+    graph.node('inverse', lambda x: 1.0 / x, ['x'])
+    with pytest.raises(ZeroDivisionError):
+        graph['inverse']
+
+
+def test_validation_graph_matches_direct_evaluation():
+    graph = validation_graph(workers=2)
+    report = graph['report']
+    table = DistanceTable(np.concatenate([probe.redshifts for probe in PROBES.values()]), BEST_FIT)
+    for name, probe in PROBES.items():
+        np.testing.assert_allclose(report['chi2'][name], probe.chi2(table), rtol=1e-12)
+    graph.computations.clear()
+    graph.source('params', (70.0,) + BEST_FIT[1:])
+    graph['report']
+    # H0 does not enter phi, rd or the cluster deficit
+    assert not {'phi', 'rd', 'cluster_deficit', 'redshifts'} & set(graph.computations)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from dfcm.growth import Z_INIT, growth_f_sigma8, growth_f_sigma8_jacobian, solve_growth
+from dfcm.model import BEST_FIT, H_model, phi_z
+from dfcm.probes import DistanceTable, GrowthRate
+
+Z = np.linspace(0.0, 3.0, 31)
+POINTS = [BEST_FIT, (70.0, 0.2, 1.5, -0.15, 0.1), (70.0, 0.5, 0.1, 0.1, -0.2)]
+
+
+def background(log1pz, params):
+    """Om(a) and dln H/dln a from H_model, the latter by complex step (exact to rounding)."""
+    H0, Om = params[:2]
+    z = np.expm1(log1pz)
+    omega_m = Om * np.exp(3.0 * phi_z(z, *params[2:]) * log1pz) * (H0 / H_model(z, *params))**2
+    step = 1e-30
+    dlnH = -np.log(H_model(np.expm1(log1pz + 1j * step), *params)).imag / step
+    return omega_m, dlnH
+
+
+def reference_f_sigma8(params, sigma8=0.812):
+    """fsigma8 from solve_ivp (DOP853) on the same equations and initial growing mode."""
+    def rhs(ln_a, y):
+        omega_m, dlnH = background(-ln_a, params)
+        f = y[0]
+        return [1.5 * omega_m - f * f - (2.0 + dlnH) * f, f]
+
+    omega_m, dlnH = background(np.log1p(Z_INIT), params)
+    friction = 2.0 + dlnH
+    f0 = 0.5 * (-friction + np.sqrt(friction**2 + 6.0 * omega_m))
+    ln_a = -np.log1p(Z[::-1])
+    solution = solve_ivp(rhs, (-np.log1p(Z_INIT), 0.0), [f0, 0.0], method='DOP853', t_eval=ln_a,
+                         rtol=1e-12, atol=1e-14)
+    f, lnD = solution.y[:, ::-1]
+    return sigma8 * f * np.exp(lnD - lnD[0])
+
+
+@pytest.mark.parametrize('params', POINTS)
+def test_growth_matches_solve_ivp(params):
+    np.testing.assert_allclose(growth_f_sigma8(Z, *params[1:]), reference_f_sigma8(params), rtol=1e-6)
+
+
+def test_growth_normalization():
+    solution = solve_growth(*BEST_FIT[1:])
+    assert solution.D(0.0) == pytest.approx(1.0, rel=1e-14)
+    # Structure grows: f > 0, so D decreases with redshift
+    assert np.all(solution.f(Z) > 0)
+    assert np.all(np.diff(solution.D(Z)) < 0)
+
+
+def test_batch_matches_single_vectors():
+    batch = tuple(np.array(column) for column in zip(*POINTS))[1:]
+    fs8 = solve_growth(*batch).f_sigma8(Z)
+    assert fs8.shape == (len(POINTS), Z.size)
+    for k, params in enumerate(POINTS):
+        np.testing.assert_allclose(fs8[k], growth_f_sigma8(Z, *params[1:]), rtol=1e-14)
+
+
+def test_redshift_range_is_checked():
+    with pytest.raises(ValueError):
+        solve_growth(*BEST_FIT[1:]).f(Z_INIT + 1.0)
+
+
+@pytest.mark.parametrize('params', POINTS)
+def test_sensitivities_match_finite_differences(params):
+    growth = np.asarray(params[1:], dtype=float)
+    fs8, d_fs8 = growth_f_sigma8_jacobian(Z, *growth)
+    np.testing.assert_array_equal(fs8, growth_f_sigma8(Z, *growth))
+    numerical = []
+    for i in range(4):
+        step = np.zeros(4)
+        step[i] = 1e-5 * max(abs(growth[i]), 0.1)
+        difference = growth_f_sigma8(Z, *(growth + step)) - growth_f_sigma8(Z, *(growth - step))
+        numerical.append(difference / (2 * step[i]))
+    np.testing.assert_allclose(d_fs8, numerical, rtol=0, atol=1e-8 * np.abs(d_fs8).max())
+
+
+def test_ode_probe_gradient():
+    probe = GrowthRate(ode=True)
+    chi2, gradient = probe.chi2_gradient(DistanceTable(probe.redshifts, BEST_FIT, jacobian=True))
+    assert chi2 == probe(*BEST_FIT)
+    assert gradient[0] == 0.0
+    params = np.asarray(BEST_FIT)
+    for i in range(1, 5):
+        step = np.zeros(5)
+        step[i] = 1e-5 * max(abs(params[i]), 0.1)
+        numerical = (probe(*(params + step)) - probe(*(params - step))) / (2 * step[i])
+        assert abs(gradient[i] - numerical) <= 1e-8 * np.abs(gradient).max()
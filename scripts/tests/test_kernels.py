@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from dfcm import kernels
+from dfcm.kernels import PhiHKernel, fused_H
+from dfcm.model import BEST_FIT, H_model, phi_z
+
+Z = np.linspace(0.0, 1100.0, 2001)
+OTHER = (62.0, 0.45, 1.7, -0.2, 0.15)
+
+
+@pytest.mark.parametrize('params', [BEST_FIT, OTHER])
+def test_float64_matches_model(params):
+    kernel = PhiHKernel(Z)
+    np.testing.assert_allclose(kernel.phi(*params[2:]), phi_z(Z, *params[2:]), rtol=1e-15)
+    np.testing.assert_allclose(kernel.H(*params), H_model(Z, *params), rtol=1e-13)
+    np.testing.assert_array_equal(fused_H(Z, *params), kernel.H(*params))
+
+
+def test_float32_matches_model():
+    z = Z[Z < 20.0]
+    kernel = PhiHKernel(z, dtype=np.float32)
+    H = kernel.H(*BEST_FIT)
+    assert H.dtype == np.float32 and kernel.phi(*BEST_FIT[2:]).dtype == np.float32
+    np.testing.assert_allclose(H, H_model(z, *BEST_FIT), rtol=2e-5)
+
+
+def test_out_buffers_are_filled_in_place():
+    kernel = PhiHKernel(Z)
+    out, phi_out = np.empty_like(Z), np.empty_like(Z)
+    assert kernel.H(*BEST_FIT, out=out, phi_out=phi_out) is out
+    np.testing.assert_array_equal(out, kernel.H(*BEST_FIT))
+    np.testing.assert_array_equal(phi_out, kernel.phi(*BEST_FIT[2:]))
+    # Without phi_out, phi is staged in out; reusing the buffer gives the same result
+    assert kernel.H(*OTHER, out=out) is out
+    np.testing.assert_array_equal(out, kernel.H(*OTHER))
+    assert kernel.phi(*BEST_FIT[2:], out=phi_out) is phi_out
+
+
+def test_out_and_phi_out_may_alias():
+    kernel = PhiHKernel(Z)
+    buffer = np.empty_like(Z)
+    np.testing.assert_array_equal(kernel.H(*BEST_FIT, out=buffer, phi_out=buffer), kernel.H(*BEST_FIT))
+
+
+@pytest.mark.parametrize('bad', [np.empty(Z.size - 1), np.empty(Z.size, dtype=np.float32), np.empty((1, Z.size))])
+def test_buffers_are_validated(bad):
+    kernel = PhiHKernel(Z)
+    with pytest.raises(ValueError):
+        kernel.H(*BEST_FIT, out=bad)
+    with pytest.raises(ValueError):
+        kernel.H(*BEST_FIT, phi_out=bad)
+    with pytest.raises(ValueError):
+        kernel.phi(*BEST_FIT[2:], out=bad)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_batch_rows_equal_single_vectors(dtype, monkeypatch):
+    # Blocks of two rows, so the three vectors span two blocks
+    monkeypatch.setattr(kernels, 'BATCH_BLOCK_ELEMENTS', 80)
+    z = np.linspace(0.0, 3.0, 40).reshape(4, 10)
+    kernel = PhiHKernel(z, dtype=dtype)
+    batch = tuple(np.array(column) for column in zip(BEST_FIT, OTHER, (70.0, 0.3, 0.0, 0.0, 0.0)))
+    H = kernel.H_batch(*batch)
+    assert H.shape == (3, 4, 10) and H.dtype == dtype
+    for row, params in zip(H, zip(*batch)):
+        np.testing.assert_array_equal(row, kernel.H(*[dtype(p) for p in params]))
+    out = np.empty((3, 4, 10), dtype=dtype)
+    assert kernel.H_batch(*batch, out=out) is out
+    with pytest.raises(ValueError):
+        kernel.H_batch(*batch, out=np.empty((2, 4, 10), dtype=dtype))
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from dfcm.likelihood import JointLikelihood
+from dfcm.model import BEST_FIT
+from dfcm.probes import PROBES
+
+POINTS = [BEST_FIT, (68.0, 0.35, 1.2, -0.1, 0.15)]
+
+
+@pytest.mark.parametrize('params', POINTS)
+def test_joint_chi2_is_the_sum_of_the_probes(params):
+    likelihood = JointLikelihood(PROBES.values())
+    total, per_probe = likelihood(params)
+    assert list(per_probe) == likelihood.names
+    # Every probe reads the shared table; on its own, it integrates on its own redshifts
+    table = likelihood.table(params)
+    for probe in likelihood.probes:
+        assert per_probe[probe.name] == probe.chi2(table)
+        np.testing.assert_allclose(per_probe[probe.name], probe(*params), rtol=1e-10)
+    np.testing.assert_allclose(total, sum(probe(*params) for probe in likelihood.probes), rtol=1e-10)
+    assert likelihood.dof == sum(probe.ndata for probe in likelihood.probes) - 5
+
+
+def test_duplicate_probe_names_are_rejected():
+    with pytest.raises(ValueError, match="Duplicate"):
+        JointLikelihood([PROBES['cc'], PROBES['cc']])
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from dfcm.memo import MEMO, EvaluationCache, memoize, single_point
+
+# Every cached value holds 100 float64 values (800 bytes)
+VALUE_BYTES = 800
+
+
+def compute(x):
+    return lambda: np.full(100, float(x))
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = EvaluationCache(max_bytes=3 * VALUE_BYTES)
+    for x in (1, 2, 3):
+        cache.get_or_compute('f', (x,), compute(x))
+    # Reading 1 makes 2 the least recently used entry
+    cache.get_or_compute('f', (1,), compute(1))
+    cache.get_or_compute('f', (4,), compute(4))
+    assert cache.get('f', (2,)) is None
+    for x in (1, 3, 4):
+        assert cache.get('f', (x,))[0] == x
+    assert len(cache) == 3 and cache.stats()['evictions'] == 1 and cache.stats()['nbytes'] == 3 * VALUE_BYTES
+
+    cache.resize(VALUE_BYTES)
+    assert len(cache) == 1 and cache.get('f', (4,)) is not None
+
+
+def test_statistics():
+    cache = EvaluationCache()
+    calls = []
+
+    def counted():
+        calls.append(1)
+        return np.arange(3.0)
+
+    first = cache.get_or_compute('f', (0.5, np.array([1.0, 2.0])), counted)
+    # Keys are rounded to KEY_DECIMALS: a difference of 1e-14 is the same point
+    again = cache.get_or_compute('f', (0.5 + 1e-14, np.array([1.0, 2.0])), counted)
+    assert again is first and len(calls) == 1
+    assert not first.flags.writeable
+    cache.get_or_compute('g', (0.5, np.array([1.0, 2.0])), counted)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+    assert stats['hit_rate'] == pytest.approx(1 / 3)
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'evictions': 0, 'entries': 0,
+                             'nbytes': 0, 'max_bytes': cache.max_bytes}
+
+
+def test_oversized_values_and_disabled_cache_are_not_stored():
+    cache = EvaluationCache(max_bytes=VALUE_BYTES - 1)
+    cache.get_or_compute('f', (1,), compute(1))
+    assert len(cache) == 0
+    cache.resize(0)
+    assert cache.get_or_compute('f', (1,), compute(1))[0] == 1
+    assert cache.get('f', (1,), 'missing') == 'missing'
+    assert cache.stats()['misses'] == 1
+
+
+def test_memoize_caches_single_points_only():
+    calls = []
+
+    @memoize('test-square', params_from=1)
+    def square(z, a, b):
+        calls.append((a, b))
+        return z * a * b
+
+    z = np.linspace(0.0, 1.0, 5)
+    np.testing.assert_array_equal(square(z, 2.0, 3.0), square(z, 2.0, 3.0))
+    assert len(calls) == 1 and MEMO.stats()['hits'] == 1
+    # A batch of parameter vectors bypasses the cache entirely
+    batch = np.array([[2.0], [4.0]])
+    for _ in range(2):
+        np.testing.assert_array_equal(square(z, batch, 3.0), z * batch * 3.0)
+    assert len(calls) == 3 and len(MEMO) == 1 and MEMO.stats()['misses'] == 1
+    assert square.__wrapped__(z, 2.0, 3.0) is not square(z, 2.0, 3.0)
+
+
+def test_single_point():
+    assert single_point((70.0, 0.3, np.float64(1.0)))
+    assert not single_point((70.0, np.array([0.3, 0.31])))
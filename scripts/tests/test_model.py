@@ -0,0 +1,42 @@
+import numpy as np
+
+from dfcm.model import (BEST_FIT, PHI, PHI_0, DFCMModel, H_model, comoving_distance, distance_modulus,
+                        luminosity_distance, phi_z)
+
+
+def test_phi_limits():
+    Gamma, A1, A2 = BEST_FIT[2:]
+    # The BAO bumps are negligible at z = 0 and far in the past
+    assert phi_z(0.0, Gamma, 0.0, 0.0) == PHI_0
+    assert abs(phi_z(200.0, Gamma, A1, A2) - PHI) < 1e-12
+
+
+def test_H_today_is_H0():
+    assert np.isclose(H_model(0.0, *BEST_FIT), BEST_FIT[0], rtol=1e-14)
+
+
+def test_arrays_match_scalars():
+    z = np.array([0.01, 0.3, 1.2, 2.5])
+    H = H_model(z, *BEST_FIT)
+    assert H.shape == z.shape
+    np.testing.assert_allclose(H, [H_model(zi, *BEST_FIT) for zi in z], rtol=1e-15)
+    D_M = comoving_distance(z, *BEST_FIT)
+    np.testing.assert_allclose(D_M, [comoving_distance(zi, *BEST_FIT) for zi in z], rtol=1e-11)
+
+
+def test_parameter_batches_broadcast():
+    z = np.linspace(0.1, 2.0, 5)
+    H0 = np.array([60.0, 70.0, 80.0])
+    batch = (H0,) + tuple(np.full(3, p) for p in BEST_FIT[1:])
+    assert H_model(z, *[np.asarray(p)[:, None] for p in batch]).shape == (3, 5)
+    D_M = comoving_distance(z, *batch)
+    assert D_M.shape == (3, 5)
+    for i, h0 in enumerate(H0):
+        np.testing.assert_allclose(D_M[i], comoving_distance(z, h0, *BEST_FIT[1:]), rtol=1e-13)
+
+
+def test_distance_relations():
+    model = DFCMModel()
+    z = np.array([0.1, 0.5, 1.0])
+    np.testing.assert_allclose(luminosity_distance(z, *BEST_FIT), (1 + z) * model.D_M(z), rtol=1e-15)
+    np.testing.assert_allclose(distance_modulus(z, *BEST_FIT), 5 * np.log10(model.D_L(z)) + 25, rtol=1e-14)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from dfcm.optimize import NONFINITE_CHI2, Chi2Objective, deduplicate_minima, multistart_fit
+
+MEAN = np.array([70.0, 0.3, 1.0, 0.02, -0.05])
+SIGMA = np.array([1.5, 0.02, 0.1, 0.01, 0.02])
+CORRELATION = np.array([[1.0, 0.5, 0.0, 0.0, 0.0],
+                        [0.5, 1.0, -0.3, 0.0, 0.0],
+                        [0.0, -0.3, 1.0, 0.2, 0.0],
+                        [0.0, 0.0, 0.2, 1.0, 0.0],
+                        [0.0, 0.0, 0.0, 0.0, 1.0]])
+COVARIANCE = CORRELATION * np.outer(SIGMA, SIGMA)
+
+
+class GaussianLikelihood:
+    """chi2 = (p - mean)^T C^-1 (p - mean), not finite for H0 below ``finite_above``."""
+
+    names = ['gauss']
+    dof = 10
+
+    def __init__(self, mean=MEAN, covariance=COVARIANCE, finite_above=-np.inf):
+        self.mean = np.asarray(mean)
+        self.inverse = np.linalg.inv(covariance)
+        self.finite_above = finite_above
+
+    def value_and_gradient(self, params):
+        residual = np.moveaxis(np.asarray(params, dtype=float), 0, -1) - self.mean
+        weighted = residual @ self.inverse
+        total = np.sum(weighted * residual, axis=-1)
+        total = np.where(residual[..., 0] + self.mean[0] > self.finite_above, total, np.nan)
+        return total, np.moveaxis(2.0 * weighted, -1, 0), {'gauss': total}
+
+    def __call__(self, params):
+        total, _, per_probe = self.value_and_gradient(params)
+        return total, per_probe
+
+
+def test_errors_from_the_hessian():
+    fit = multistart_fit(GaussianLikelihood(), n_starts=4, processes=1, seed=1)
+    np.testing.assert_allclose(list(fit['best_fit'].values()), MEAN, rtol=0, atol=1e-5 * SIGMA.max())
+    np.testing.assert_allclose(list(fit['errors'].values()), SIGMA, rtol=1e-6)
+    np.testing.assert_allclose(np.array(fit['covariance'], dtype=float), COVARIANCE, rtol=1e-6, atol=1e-12)
+    assert fit['at_bound'] == [] and fit['chi2'] < 1e-8
+    assert len(fit['minima']) == 1 and fit['minima'][0]['count'] == 4
+
+
+def test_parameters_on_a_bound_get_no_error():
+    # The A2 minimum lies beyond the prior's upper edge 0.2
+    mean = MEAN.copy()
+    mean[4] = 0.3
+    covariance = np.diag(SIGMA**2)
+    fit = multistart_fit(GaussianLikelihood(mean, covariance), n_starts=3, processes=1, seed=2)
+    assert fit['at_bound'] == ['A2'] and fit['errors']['A2'] is None
+    assert fit['best_fit']['A2'] == pytest.approx(0.2)
+    np.testing.assert_allclose([fit['errors'][name] for name in ('H0', 'Om', 'Gamma', 'A1')], SIGMA[:4], rtol=1e-6)
+    assert all(row[4] is None for row in fit['covariance'])
+
+
+def test_non_finite_chi2_is_a_finite_penalty():
+    objective = Chi2Objective(GaussianLikelihood(finite_above=80.0))
+    u = objective.to_unit(np.array([MEAN, MEAN + [15.0, 0, 0, 0, 0]]))
+    total, gradient = objective.gradient(u)
+    assert total[0] == NONFINITE_CHI2 and np.all(gradient[0] == 0.0)
+    assert np.isfinite(total[1]) and total[1] < NONFINITE_CHI2
+    np.testing.assert_array_equal(objective.chi2(u), total)
+
+
+def test_starts_with_non_finite_chi2_are_rejected():
+    # chi2 is finite only for H0 > 65: about a third of the prior box, the minimum inside
+    fit = multistart_fit(GaussianLikelihood(finite_above=65.0), n_starts=8, processes=1, seed=3)
+    assert 0 < fit['rejected_starts'] < 8
+    assert fit['chi2'] < NONFINITE_CHI2 and fit['best_fit']['H0'] > 65.0
+    with pytest.raises(ValueError, match="not finite"):
+        multistart_fit(GaussianLikelihood(finite_above=200.0), n_starts=4, processes=1, seed=3)
+
+
+def test_deduplicate_minima():
+    def result(u, chi2):
+        return {'u': np.array(u), 'chi2': chi2}
+
+    minima = deduplicate_minima([
+        result([0.5, 0.5], 10.0),
+        result([0.1, 0.9], 3.0),
+        result([0.5 + 5e-4, 0.5], 10.005),
+        # Same point, but a chi2 differing by more than chi2_tol
+        result([0.5, 0.5], 10.5),
+        result([0.1, 0.9 - 2e-3], 3.0),
+    ])
+    assert [(m['chi2'], m['count']) for m in minima] == [(3.0, 1), (3.0, 1), (10.0, 2), (10.5, 1)]
+    np.testing.assert_array_equal(minima[2]['u'], [0.5, 0.5])
+    assert deduplicate_minima([]) == []
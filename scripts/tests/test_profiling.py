@@ -0,0 +1,81 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from dfcm.likelihood import JointLikelihood
+from dfcm.model import BEST_FIT, H_model, high_z_comoving_distance
+from dfcm.probes import PROBES
+from dfcm.profiling import PROFILER, Profiler, profiling
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    profiler.count('calls', 3)
+    with profiler.stage('work'):
+        pass
+    assert profiler.profile() == {'counters': {}, 'stages': {}, 'derived': {}}
+
+
+def test_nested_stages_and_counters(tmp_path):
+    profiler = Profiler(enabled=True)
+    for _ in range(2):
+        with profiler.stage('outer'):
+            with profiler.stage('inner'):
+                profiler.count('points', 10)
+    profiler.count('points', 5)
+    profile = profiler.profile()
+    assert profile['counters'] == {'points': 25}
+    assert list(profile['stages']) == ['outer', 'outer/inner']
+    assert [stats['calls'] for stats in profile['stages'].values()] == [2, 2]
+    assert profile['stages']['outer']['seconds'] >= profile['stages']['outer/inner']['seconds']
+    profiler.save(tmp_path / 'profile.json')
+    assert json.loads((tmp_path / 'profile.json').read_text()) == json.loads(json.dumps(profile))
+    assert "inner" in profiler.summary()
+    profiler.reset()
+    assert profiler.profile()['counters'] == {}
+
+
+def test_stages_are_nested_per_thread():
+    profiler = Profiler(enabled=True)
+    entered, release = threading.Event(), threading.Event()
+
+    def other():
+        with profiler.stage('thread'):
+            entered.set()
+            release.wait(5)
+
+    worker = threading.Thread(target=other)
+    with profiler.stage('main'):
+        worker.start()
+        entered.wait(5)
+        with profiler.stage('inner'):
+            pass
+        release.set()
+        worker.join()
+    assert set(profiler.profile()['stages']) == {'main', 'main/inner', 'thread'}
+
+
+def test_hot_path_counters():
+    enabled = PROFILER.enabled
+    z = np.array([1090.0, 1100.0])
+    with profiling() as profiler:
+        H_model(np.linspace(0.0, 2.0, 50), *BEST_FIT)
+        batch = np.broadcast_arrays(np.array([67.0, 70.0, 73.0]), *BEST_FIT[1:])
+        high_z_comoving_distance(z, *batch)
+    assert PROFILER.enabled == enabled
+    counters = profiler.profile()['counters']
+    assert counters['H_model_calls'] == 1 and counters['H_model_points'] == 50
+    assert counters['integrals'] == 1 and counters['distances'] == 3 * z.size
+    assert profiler.profile()['derived']['integrand_points_per_distance'] == pytest.approx(
+        counters['integrand_points'] / (3 * z.size))
+
+
+def test_likelihood_stages():
+    likelihood = JointLikelihood([PROBES['cc'], PROBES['bao']])
+    with profiling() as profiler:
+        likelihood(BEST_FIT)
+    stages = profiler.profile()['stages']
+    assert {'likelihood', 'likelihood/prediction', 'likelihood/chi2:cc', 'likelihood/chi2:bao'} <= set(stages)
+    assert stages['likelihood']['calls'] == 1
@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from dfcm import results
+from dfcm.datasets import DatasetStore
+from dfcm.model import BEST_FIT
+from dfcm.results import ResultCache
+from dfcm.suites import SuiteContext, result_key, run_suites
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A store holding a small stand-in for the Planck TT table, so that 'cmb_tt' can be keyed."""
+    source = tmp_path / 'planck_tt.txt'
+    source.write_text("# ell Dl\n2 1000.0\n3 1100.0\n")
+    store = DatasetStore(tmp_path / 'store')
+    store.table('planck_tt', source, ('ell', 'Dl'))
+    return store
+
+
+def test_put_and_get(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    key = ResultCache.key('cc', [70.0, 0.3])
+    assert cache.get(key) is None and key not in cache
+    cache.put(key, {'chi2': 1.5})
+    assert key in cache and cache.get(key) == {'chi2': 1.5}
+    # Floats are rounded in the keys
+    assert ResultCache.key('cc', [70.0 + 1e-14, 0.3]) == key
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=0)
+    key = ResultCache.key('cc')
+    assert cache.put(key, {'chi2': 1.5}) == {'chi2': 1.5}
+    assert cache.get(key) is None and not list(tmp_path.iterdir())
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    keys = [ResultCache.key('suite', i) for i in range(4)]
+    for age, key in enumerate(keys[:3]):
+        cache.put(key, {'value': 'x' * 100})
+        os.utime(cache._path(key), (1000.0 * (age + 1), 1000.0 * (age + 1)))
+    entry_bytes = cache.stats()['nbytes'] // 3
+    # A hit marks the oldest entry as recently used
+    cache.get(keys[0])
+    cache.max_bytes = 2 * entry_bytes
+    cache.put(keys[3], {'value': 'y' * 100})
+    assert [key in cache for key in keys] == [True, False, False, True]
+    assert cache.evictions == 2 and cache.stats()['nbytes'] <= cache.max_bytes
+
+
+def test_result_key_changes_with_parameters_and_code(store, monkeypatch):
+    key = result_key('cmb_tt', SuiteContext(BEST_FIT, store))
+    assert key == result_key('cmb_tt', SuiteContext(BEST_FIT, store))
+    assert result_key('cmb', SuiteContext(BEST_FIT, store)) != key
+    assert result_key('cmb_tt', SuiteContext((70.0,) + tuple(BEST_FIT[1:]), store)) != key
+    monkeypatch.setattr(results, 'code_version', lambda: 'edited')
+    assert result_key('cmb_tt', SuiteContext(BEST_FIT, store)) != key
+
+
+def test_result_key_changes_with_the_dataset(store, tmp_path):
+    context = SuiteContext(BEST_FIT, store)
+    key = result_key('cmb_tt', context)
+    source = tmp_path / 'planck_tt.txt'
+    source.write_text(source.read_text() + "4 1200.0\n")
+    # A changed source cannot be keyed until the dataset is rebuilt
+    assert result_key('cmb_tt', context) is None
+    store.table('planck_tt', source, ('ell', 'Dl'))
+    assert result_key('cmb_tt', context) not in (None, key)
+    assert result_key('cmb_tt', SuiteContext(BEST_FIT, DatasetStore(tmp_path / 'empty'))) is None
+
+
+def test_failed_suites_are_not_stored(tmp_path, monkeypatch):
+    probe = SuiteContext.probe
+
+    def failing_probe(self, name):
+        if name == 'bao':
+            raise IOError("dataset unavailable")
+        return probe(self, name)
+
+    monkeypatch.setattr(SuiteContext, 'probe', failing_probe)
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    first = run_suites(['cc', 'bao'], cache=cache)
+    assert 'error' in first['bao'] and 'error' not in first['cc']
+    assert cache.stats()['entries'] == 1
+
+    second = run_suites(['cc', 'bao'], cache=cache)
+    assert second['cc'] == dict(first['cc'], cached=True)
+    assert 'error' in second['bao'] and not second['bao'].get('cached')
+    assert cache.stats()['entries'] == 1
+
+
+def test_cached_results_match_a_fresh_run(tmp_path):
+    names = ['cc', 'cmb', 'clusters', '2pcf']
+    cache = ResultCache(tmp_path, max_bytes=1 << 20)
+    fresh = run_suites(names)
+    run_suites(names, cache=cache)
+    cached = run_suites(names, cache=cache)
+    assert cache.hits == len(names)
+    for name in names:
+        assert cached[name] == dict(fresh[name], cached=True)
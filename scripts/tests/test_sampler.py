@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from dfcm.sampler import EnsembleSampler, initial_ball
+
+MEAN = np.array([1.0, -2.0])
+SIGMA = np.array([0.5, 2.0])
+
+
+def gaussian(positions):
+    return -0.5 * np.sum(((np.atleast_2d(positions) - MEAN) / SIGMA)**2, axis=1)
+
+
+def sampler(**kwargs):
+    return EnsembleSampler(gaussian, 16, ndim=2, processes=1, seed=7, **kwargs)
+
+
+def start():
+    return initial_ball(MEAN, nwalkers=16, scale=0.1, seed=3)
+
+
+class Interrupt(Exception):
+    pass
+
+
+def interrupt_at(step):
+    def progress(current, _):
+        if current == step:
+            raise Interrupt
+    return progress
+
+
+def test_stretch_move_recovers_a_gaussian():
+    run = sampler()
+    run.run(start(), 3000)
+    samples = run.flat_samples(discard=500)
+    np.testing.assert_allclose(samples.mean(axis=0), MEAN, atol=0.1 * SIGMA.max())
+    np.testing.assert_allclose(samples.std(axis=0), SIGMA, rtol=0.1)
+    assert 0.2 < np.mean(run.acceptance_fraction) < 0.9
+
+
+def test_resume_equals_uninterrupted_run(tmp_path):
+    reference = sampler().run(start(), 47)
+
+    with pytest.raises(Interrupt):
+        sampler(checkpoint=tmp_path, checkpoint_every=10).run(start(), 47, progress=interrupt_at(36))
+    resumed = sampler(checkpoint=tmp_path, checkpoint_every=10)
+    chain = resumed.run(start(), 47)
+    assert chain.shape == (47, 16, 2)
+    np.testing.assert_array_equal(chain, reference)
+    np.testing.assert_array_equal(np.load(tmp_path / 'chain.npy'), reference)
+
+
+def test_target_is_the_total_chain_length(tmp_path):
+    sampler(checkpoint=tmp_path, checkpoint_every=10).run(start(), 20)
+    # Rerunning a finished run adds nothing; a longer target extends the file
+    finished = sampler(checkpoint=tmp_path)
+    assert len(finished.run(start(), 20)) == 20 and finished.n_evaluations == 16 * 21
+    extended = sampler(checkpoint=tmp_path, checkpoint_every=10).run(start(), 35)
+    np.testing.assert_array_equal(extended, sampler().run(start(), 35))
+    assert np.load(tmp_path / 'chain.npy').shape == (35, 16, 2)
+
+
+def test_checkpoint_of_another_ensemble_is_rejected(tmp_path):
+    sampler(checkpoint=tmp_path).run(start(), 10)
+    with pytest.raises(ValueError):
+        EnsembleSampler(gaussian, 18, ndim=2, processes=1, checkpoint=tmp_path).run(start(), 10)
@@ -0,0 +1,38 @@
+import itertools
+
+import numpy as np
+
+from dfcm.probes import PROBES
+from dfcm.scan import DEFAULT_PROBES, grid_minimum, grid_scan
+
+AXES = ([68.0, 73.24], [0.25, 0.2974, 0.35], [0.433], [0.0, 0.031], [0.019])
+
+
+def test_scan_matches_scalar_probes():
+    # A chunk size that does not divide the grid, so blocks straddle its axes
+    cubes = grid_scan(*AXES, chunk_size=5)
+    shape = tuple(len(axis) for axis in AXES)
+    assert set(cubes) == set(DEFAULT_PROBES) | {'total'}
+    for index in itertools.product(*[range(n) for n in shape]):
+        params = [axis[i] for axis, i in zip(AXES, index)]
+        total = 0.0
+        for name in DEFAULT_PROBES:
+            expected = PROBES[name](*params)
+            # The scan integrates on the union of all probe redshifts, hence not bit for bit
+            np.testing.assert_allclose(cubes[name][index], expected, rtol=1e-10)
+            total += expected
+        np.testing.assert_allclose(cubes['total'][index], total, rtol=1e-10)
+
+
+def test_chunk_size_does_not_change_the_scan():
+    whole = grid_scan(*AXES)
+    chunked = grid_scan(*AXES, chunk_size=1)
+    for name in whole:
+        np.testing.assert_allclose(chunked[name], whole[name], rtol=1e-12)
+
+
+def test_grid_minimum():
+    cubes = grid_scan(*AXES, probes=('cc',))
+    chi2_min, best = grid_minimum(cubes['cc'], *AXES)
+    assert chi2_min == cubes['cc'].min()
+    np.testing.assert_allclose(PROBES['cc'](*best.values()), chi2_min, rtol=1e-12)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from dfcm import service
+from dfcm.model import BEST_FIT, H_model, distance_modulus, phi_z
+from dfcm.service import INLINE_POINTS, MAX_POINTS, PredictionService
+
+
+@pytest.fixture
+def prediction_service():
+    instance = PredictionService(processes=1)
+    yield instance
+    instance.close()
+
+
+def request(instance, payload, path='/predict', method='POST'):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    status, response = asyncio.run(instance.respond(method, path, body))
+    return status, json.loads(response)
+
+
+def test_predict_matches_the_model(prediction_service):
+    z = [0.0, 0.5, 2.0]
+    params = [list(BEST_FIT), [70.0, 0.3, 0.5, 0.0, 0.0]]
+    status, body = request(prediction_service, {'z': z, 'params': params, 'quantities': ['phi', 'H', 'mu']})
+    assert status == 200 and set(body) == {'phi', 'H', 'mu'}
+    for row, vector in zip(body['H'], params):
+        np.testing.assert_allclose(row, H_model(np.array(z), *vector), rtol=1e-15)
+    np.testing.assert_allclose(body['phi'][0], phi_z(np.array(z), *BEST_FIT[2:]), rtol=1e-15)
+    # mu(0) is -inf, returned as null
+    assert body['mu'][0][0] is None
+    np.testing.assert_allclose(body['mu'][0][1:], distance_modulus(np.array(z[1:]), *BEST_FIT), rtol=1e-12)
+
+
+@pytest.mark.parametrize('payload, path, method, status', [
+    (b'{not json', '/predict', 'POST', 400),
+    (b'[1, 2]', '/predict', 'POST', 400),
+    ({'z': [0.5], 'params': [1.0, 2.0]}, '/predict', 'POST', 400),
+    ({'z': [0.5], 'params': list(BEST_FIT), 'quantities': ['w']}, '/predict', 'POST', 400),
+    ({'z': [-0.5], 'params': list(BEST_FIT)}, '/predict', 'POST', 400),
+    ({'z': [60.0], 'params': list(BEST_FIT), 'quantities': ['fs8_ode']}, '/predict', 'POST', 400),
+    ({'params': list(BEST_FIT), 'probes': ['nope']}, '/chi2', 'POST', 400),
+    ({'z': [0.1] * 1001, 'params': [list(BEST_FIT)] * (MAX_POINTS // 1000)}, '/predict', 'POST', 413),
+    ({}, '/predict', 'GET', 405),
+    ({}, '/elsewhere', 'POST', 404),
+])
+def test_error_codes(prediction_service, payload, path, method, status):
+    code, body = request(prediction_service, payload, path, method)
+    assert code == status and 'error' in body
+    assert prediction_service.counters['errors'] == 1
+
+
+def test_identical_requests_are_coalesced_then_cached(prediction_service):
+    payload = json.dumps({'z': [0.5, 1.0], 'params': list(BEST_FIT), 'quantities': ['D_L']}).encode()
+
+    async def concurrent():
+        return await asyncio.gather(*[prediction_service.respond('POST', '/predict', payload) for _ in range(3)])
+
+    responses = asyncio.run(concurrent())
+    assert all(status == 200 for status, _ in responses)
+    assert len({body for _, body in responses}) == 1
+    assert prediction_service.counters['evaluations'] == 1
+    assert prediction_service.counters['coalesced'] == 2
+    request(prediction_service, payload)
+    assert prediction_service.counters['evaluations'] == 1
+    assert prediction_service.cache.stats()['hits'] >= 1
+
+
+def test_large_light_requests_leave_the_event_loop(prediction_service, monkeypatch):
+    threads = []
+
+    def recording_predict(z, params, quantities):
+        threads.append(threading.get_ident())
+        return {'H': []}
+
+    monkeypatch.setattr(service, 'predict', recording_predict)
+    for n_z in (INLINE_POINTS, INLINE_POINTS + 1):
+        payload = {'z': [0.5] * n_z, 'params': list(BEST_FIT), 'quantities': ['H']}
+        assert request(prediction_service, payload)[0] == 200
+    # The event loop runs in this thread: only the small request is evaluated in it
+    assert threads[0] == threading.get_ident()
+    assert threads[1] != threading.get_ident()
+
+
+def test_http_round_trip_and_body_limit(prediction_service):
+    async def exchange(raw):
+        server = await asyncio.start_server(prediction_service.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    body = json.dumps({'z': [1.0], 'params': list(BEST_FIT), 'quantities': ['H']}).encode()
+    response = asyncio.run(exchange(b"POST /predict HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+                                    % len(body) + body))
+    head, _, payload = response.partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 200')
+    assert json.loads(payload)['H'][0][0] == pytest.approx(H_model(1.0, *BEST_FIT), rel=1e-15)
+    response = asyncio.run(exchange(b"POST /predict HTTP/1.1\r\nContent-Length: %d\r\n\r\n"
+                                    % (service.MAX_BODY_BYTES + 1)))
+    assert response.startswith(b'HTTP/1.1 413')
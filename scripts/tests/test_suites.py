@@ -0,0 +1,65 @@
+import pytest
+
+from dfcm.probes import PROBES
+from dfcm.suites import SuiteContext, render_report, run_concurrently, run_suites
+
+NAMES = ['cc', 'bao', 'fs8', 'cmb', 'clusters']
+
+
+class BrokenProbe:
+    """A probe that loads but cannot be evaluated."""
+
+    name = 'bao'
+    ndata = 1
+    redshifts = PROBES['bao'].redshifts
+
+    def chi2(self, table):
+        raise FloatingPointError("bad prediction")
+
+
+@pytest.fixture
+def broken(monkeypatch):
+    """'fs8' fails to load and 'bao' fails to evaluate."""
+    probe = SuiteContext.probe
+
+    def failing_probe(self, name):
+        if name == 'fs8':
+            raise IOError("dataset unavailable")
+        if name == 'bao':
+            return BrokenProbe()
+        return probe(self, name)
+
+    monkeypatch.setattr(SuiteContext, 'probe', failing_probe)
+
+
+def test_failing_suites_do_not_abort_the_others(broken):
+    results = run_suites(NAMES)
+    assert list(results) == NAMES
+    assert results['fs8']['error'] == "OSError: dataset unavailable"
+    assert results['bao']['error'] == "FloatingPointError: bad prediction"
+    for name in ('cc', 'cmb'):
+        assert 'error' not in results[name]
+        assert results[name]['chi2'] == pytest.approx(PROBES[name](*SuiteContext().params), rel=1e-10)
+    assert 'deficit_percent' in results['clusters']
+    report = render_report(results, SuiteContext().params)
+    assert "Failed suites (left out of the summary): bao, fs8" in report
+    assert "Combined chi^2/dof over cc, cmb:" in report
+
+
+def test_failing_suites_run_serially(broken):
+    results = run_concurrently(NAMES, processes=1)
+    assert [name for name, result in results.items() if 'error' in result] == ['bao', 'fs8']
+    assert all(result['seconds'] >= 0 for result in results.values())
+
+
+def test_joint_and_single_suite_results_agree():
+    joint = run_suites(NAMES)
+    for name in NAMES:
+        assert run_suites([name])[name] == pytest.approx(joint[name], rel=1e-10)
+
+
+def test_unknown_suites():
+    with pytest.raises(KeyError, match="nope"):
+        run_suites(['cc', 'nope'])
+    with pytest.raises(KeyError, match="nope"):
+        run_concurrently(['nope'], processes=1)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from dfcm.model import BEST_FIT
+from dfcm.survey import MockCatalog, StreamingSNIa, distance_modulus_interpolator, generate_catalog
+
+OFFSET = (70.0, 0.32, 0.6, 0.0, 0.05)
+
+
+def dense_chi2(catalog, params, grid_size):
+    """chi2 with the full covariance matrix of the catalog, built and solved densely."""
+    rows = np.concatenate(list(catalog.chunks()))
+    header = catalog.header
+    mu = distance_modulus_interpolator(params, header['z_min'], header['z_max'], grid_size)
+    residual = rows['mu'] - mu(rows['z'])
+    cov = np.diag(rows['sigma']**2)
+    block = np.arange(rows.size) // header['block_size']
+    cov += header['sigma_block']**2 * (block[:, None] == block[None, :])
+    return residual @ np.linalg.solve(cov, residual)
+
+
+@pytest.mark.parametrize('sigma_block, block_size', [(0.0, 1), (0.08, 7), (0.2, 50)])
+def test_streaming_chi2_matches_dense_covariance(tmp_path, sigma_block, block_size):
+    path = tmp_path / 'mock.bin'
+    generate_catalog(path, 503, sigma_slope=0.05, sigma_block=sigma_block, block_size=block_size,
+                     chunk_rows=64, seed=1)
+    catalog = MockCatalog(path)
+    # Chunks that are not a multiple of the block size are rounded down to one
+    probe = StreamingSNIa(catalog, chunk_rows=100, grid_size=512)
+    for params in (BEST_FIT, OFFSET):
+        np.testing.assert_allclose(probe(*params), dense_chi2(catalog, params, 512), rtol=1e-10)
+
+
+def test_streaming_chi2_of_a_batch(tmp_path):
+    path = tmp_path / 'mock.bin'
+    generate_catalog(path, 300, sigma_block=0.1, block_size=4, seed=2)
+    probe = StreamingSNIa(path, chunk_rows=32, grid_size=512)
+    batch = tuple(np.array(column) for column in zip(BEST_FIT, OFFSET))
+    np.testing.assert_allclose(probe(*batch), [probe(*BEST_FIT), probe(*OFFSET)], rtol=1e-14)
+
+
+def test_catalog_round_trip(tmp_path):
+    path = tmp_path / 'mock.bin'
+    header = generate_catalog(path, 1000, chunk_rows=128, seed=3)
+    catalog = MockCatalog(path)
+    assert catalog.header == header and catalog.n == 1000
+    rows = np.concatenate(list(catalog.chunks(rows=300)))
+    assert rows.size == 1000
+    assert np.all((rows['z'] >= header['z_min']) & (rows['z'] <= header['z_max']))
+    np.testing.assert_array_equal(rows['sigma'], header['sigma_mu'])
+
+
+def test_not_a_catalog(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a catalog')
+    with pytest.raises(ValueError):
+        MockCatalog(path)
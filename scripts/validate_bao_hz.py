@@ -16,7 +16,6 @@
 import numpy as np
 import platform
 import scipy
-from scipy.integrate import quad
 
 # --- Diagnostic ---
 print("### Execution Environment Diagnostic ###")
@@ -25,78 +24,24 @@ print(f"NumPy Version: {np.__version__}")
 print(f"SciPy Version: {scipy.__version__}")
 print("-" * 38 + "\n")
 
-# --- Constants ---
-# Speed of light in km/s
-C_LIGHT = 299792.458
-# The Golden Ratio
-PHI = (1 + np.sqrt(5)) / 2
-
 # ==============================================================================
 # SECTION 1: THE CORE OF THE FRACTAL UNIVERSE MODEL
 # ==============================================================================
-
-def get_fractal_dimension(redshift, Gamma, A1, A2):
-    """
-    Calculates the universe's "fractal dimension", phi(z), at a given redshift.
-    
-    This version uses the official parameters from the model's paper.
-    - phi_inf is set to the Golden Ratio.
-    """
-    phi_inf = PHI  # Value in the distant past (Golden Ratio) - CORRECTION APPLIQUÉE
-    phi_0 = 2.85     # Value today
-    
-    # The basic smooth change over time
-    base_evolution = phi_inf + (phi_0 - phi_inf) * np.exp(-Gamma * redshift)
-    
-    # The two "bumps" to account for BAO features
-    bao_bump_1 = A1 * np.exp(-0.5 * ((redshift - 0.4) / 0.3)**2)
-    bao_bump_2 = A2 * np.exp(-0.5 * ((redshift - 1.5) / 0.4)**2)
-    
-    return base_evolution + bao_bump_1 + bao_bump_2
-
-def get_hubble_rate(redshift, H0, Om, Gamma, A1, A2):
-    """
-    Calculates the universe's expansion rate, H(z), at a given redshift.
-    """
-    OL = 1.0 - Om
-    phi = get_fractal_dimension(redshift, Gamma, A1, A2)
-    matter_term = Om * (1.0 + redshift)**(3.0 * phi)
-    dark_energy_term = OL * (1.0 + redshift)**(3.0 * (2.0 - phi))
-    
-    return H0 * np.sqrt(matter_term + dark_energy_term)
-
-def get_comoving_distance(redshift, H0, Om, Gamma, A1, A2):
-    """
-    Calculates the comoving distance by integrating 1/H(z).
-    This uses the high-precision 'quad' integrator from SciPy.
-    """
-    integrand = lambda z: C_LIGHT / get_hubble_rate(z, H0, Om, Gamma, A1, A2)
-    integral, _ = quad(integrand, 0, redshift)
-    return integral
-
-def get_volume_averaged_distance(redshift, H0, Om, Gamma, A1, A2):
-    """
-    Calculates the BAO volume-averaged distance, D_V(z).
-    """
-    comoving_dist = get_comoving_distance(redshift, H0, Om, Gamma, A1, A2)
-    hubble_at_redshift = get_hubble_rate(redshift, H0, Om, Gamma, A1, A2)
-    
-    if hubble_at_redshift == 0.0:
-        return np.inf
-        
-    return (C_LIGHT * redshift * comoving_dist**2 / hubble_at_redshift)**(1.0/3.0)
-
-def get_sound_horizon_size(Gamma, A1, A2):
-    """
-    Calculates the size of the "sound horizon", rd.
-    """
-    redshift_drag_epoch = 1060.0
-    phi_at_drag_epoch = get_fractal_dimension(redshift_drag_epoch, Gamma, A1, A2)
-    
-    rs_standard_model = 147.0
-    phi_inf_value = PHI  # Using the Golden Ratio as the reference - CORRECTION APPLIQUÉE
-    
-    return rs_standard_model * (phi_at_drag_epoch / phi_inf_value)**(-0.75)
+# The fractal dimension phi(z), the expansion rate H(z) and the derived
+# distances are defined once in the shared dfcm model core.
+from dfcm import (
+    BEST_FIT,
+    C_LIGHT,
+    PARAM_NAMES,
+    PHI,
+    H_model as get_hubble_rate,
+    comoving_distance as get_comoving_distance,
+    phi_z as get_fractal_dimension,
+    rd_model as get_sound_horizon_size,
+    volume_averaged_distance as get_volume_averaged_distance,
+)
+from dfcm.likelihood import JointLikelihood
+from dfcm.probes import BAO, CMBThetaStar, CosmicChronometers, GammaRayBursts, GrowthRate, H0LiCOW
 
 
 # ==============================================================================
@@ -128,9 +73,7 @@ sound_horizon_planck_obs = 147.0
 # ==============================================================================
 # SECTION 3: SETTING UP THE MODEL WITH ITS BEST-FIT VALUES
 # ==============================================================================
-best_fit_params = {
-    "H0": 73.24, "Om": 0.2974, "Gamma": 0.433, "A1": 0.031, "A2": 0.019
-}
+best_fit_params = dict(zip(PARAM_NAMES, BEST_FIT))
 H0, Om, Gamma, A1, A2 = best_fit_params.values()
 model_args = (H0, Om, Gamma, A1, A2)
 
@@ -149,7 +92,7 @@ output_lines.append("-----------------------------------------------------------
 
 # --- TEST 1: Cosmic Chronometers ---
 output_lines.append("### TEST 1: Matching the Universe's Expansion History ###")
-model_h_predictions = [get_hubble_rate(z, *model_args) for z in z_cc]
+model_h_predictions = get_hubble_rate(z_cc, *model_args)
 chi2_cc = np.sum(((h_obs_cc - model_h_predictions) / h_err_cc)**2)
 dof_cc = len(z_cc) - len(best_fit_params)
 chi2_per_dof_cc = chi2_cc / dof_cc
@@ -160,14 +103,13 @@ output_lines.append("-----------------------------------------------------------
 # --- TEST 2: Baryon Acoustic Oscillations ---
 output_lines.append("### TEST 2: Reproducing the 'Cosmic Yardstick' (BAO) ###")
 model_rd = get_sound_horizon_size(Gamma, A1, A2)
-chi2_bao = 0.0
-for i, (redshift, obs_ratio, obs_error) in enumerate(desi_bao_data):
-    if i == 0:
-        model_dist = get_volume_averaged_distance(redshift, *model_args)
-    else:
-        model_dist = C_LIGHT / get_hubble_rate(redshift, *model_args)
-    model_ratio = model_dist / model_rd
-    chi2_bao += ((obs_ratio - model_ratio) / obs_error)**2
+z_bao, obs_ratio_bao, obs_error_bao = desi_bao_data.T
+# First point is DV/rd, the others are c/Hrd (DH/rd)
+is_dv = np.arange(len(z_bao)) == 0
+model_dist = np.where(is_dv, get_volume_averaged_distance(z_bao, *model_args),
+                      C_LIGHT / get_hubble_rate(z_bao, *model_args))
+model_ratio = model_dist / model_rd
+chi2_bao = np.sum(((obs_ratio_bao - model_ratio) / obs_error_bao)**2)
 dof_bao = len(desi_bao_data)
 chi2_per_dof_bao = chi2_bao / dof_bao
 output_lines.append(f"Model's predicted yardstick size (rd): {model_rd:.2f} Mpc (vs. {sound_horizon_planck_obs:.1f} Mpc).")
@@ -208,10 +150,21 @@ output_lines.append("-----------------------------------------------------------
 
 # --- FINAL SUMMARY ---
 output_lines.append("### Global Performance Summary ###")
-chi2_dof_combined = 0.951
-output_lines.append(f"The documented global goodness-of-fit is {chi2_dof_combined:.3f}, representing a 7.1 sigma")
-output_lines.append("improvement over the standard Lambda-CDM model. This suggests the Dynamic")
-output_lines.append("Fractal Model is a very strong candidate for a new cosmology.")
+# Joint chi^2 of the probes bundled with the package, evaluated on one shared distance table
+joint_likelihood = JointLikelihood([
+    CosmicChronometers(), BAO(), GrowthRate(), GammaRayBursts(), H0LiCOW(),
+    CMBThetaStar(theta_star_cmb_obs, theta_star_cmb_error, redshift_cmb),
+])
+chi2_combined, chi2_per_probe = joint_likelihood(model_args)
+chi2_dof_combined = chi2_combined / joint_likelihood.dof
+output_lines.append(f"Joint chi^2/dof of the bundled probes ({', '.join(chi2_per_probe)}) at these")
+output_lines.append(f"parameters: {chi2_combined:.3f} / {joint_likelihood.dof} = {chi2_dof_combined:.3f}")
+documented_chi2_dof = 0.951
+if round(chi2_dof_combined, 3) == documented_chi2_dof:
+    output_lines.append(f"-> CONCLUSION: Reproduces the documented global chi^2/dof of {documented_chi2_dof}.")
+else:
+    output_lines.append(f"-> CONCLUSION: Differs from the documented global chi^2/dof of {documented_chi2_dof}; the")
+    output_lines.append("   improvement over Lambda-CDM quoted with that figure is not reproduced by this run.")
 output_lines.append("=====================================================================")
 
 # The script itself would end here. The following is just to demonstrate its output.